@@ -3,14 +3,30 @@ filepath: backend/agents/__init__.py
 Agent module initialization and exports
 """
 
-from .base import AgentInput, AgentOutput, BaseAgent, ResearchAgent
-from .registry import AgentMetadata, registry
+from .base import AgentEvent, AgentInput, AgentOutput, BaseAgent, ResearchAgent
+from .context import BuiltContext, ContextBuilder, ContextPassage
+from .history import TaskHistory
+from .registry import AgentMetadata, AgentPool, AgentRegistry, registry
+from .response_cache import SemanticResponseCache
+from .task_queue import AgentTaskQueue, TaskQueueFullError, TaskRecord, task_queue
 
 __all__ = [
     "BaseAgent",
     "AgentInput",
     "AgentOutput",
+    "AgentEvent",
+    "BuiltContext",
+    "ContextBuilder",
+    "ContextPassage",
+    "TaskHistory",
     "ResearchAgent",
     "registry",
     "AgentMetadata",
+    "AgentPool",
+    "AgentRegistry",
+    "SemanticResponseCache",
+    "AgentTaskQueue",
+    "TaskQueueFullError",
+    "TaskRecord",
+    "task_queue",
 ]
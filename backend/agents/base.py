@@ -3,16 +3,37 @@ filepath: backend/agents/base.py
 Base agent class that defines the interface for all agents in the system.
 """
 
+import asyncio
+import logging
 import time
+from collections import deque
+from contextlib import aclosing
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 from pydantic import BaseModel, Field, validator
 
 from ..integrations import BaseIntegration, IntegrationToolInput, IntegrationToolOutput
 from ..llm import BaseLLM, LLMInput
 from ..memory import BaseMemory, MemoryRecord
-from ..utils import logger
+from .context import ContextBuilder, ContextPassage
+from .history import TaskHistory
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from .response_cache import SemanticResponseCache
 
 
 class AgentInput(BaseModel):
@@ -49,6 +70,7 @@ class AgentOutput(BaseModel):
     confidence: float = Field(default=0.0, ge=0.0, le=1.0)
     execution_time: float = Field(default=0.0, ge=0.0)
     reflection_notes: Optional[str] = None
+    cached: bool = False  # True when served from the response cache
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
     model_config = {
@@ -66,9 +88,19 @@ class AgentOutput(BaseModel):
     }
 
 
+class AgentEvent(BaseModel):
+    """Intermediate event emitted while an agent task is streaming"""
+
+    event: str  # e.g., memory, sources, token, result, error
+    data: Dict[str, Any] = {}
+
+
 class BaseAgent:
     """Base agent class that all specialized agents should inherit from"""
 
+    # Bump when an agent's behaviour changes so cached task results are not reused
+    version: str = "1"
+
     def __init__(
         self,
         name: str,
@@ -81,11 +113,23 @@ class BaseAgent:
         self.capabilities = capabilities
         self.config = config
         self.id = f"{name.lower().replace(' ', '-')}"
-        self._task_history: List[AgentOutput] = []
+        self.version = str(config.get("version", self.version))
+        self._task_history = TaskHistory(
+            capacity=config.get("history_size", 1000),
+            spill_path=config.get("history_path"),
+            scope=config.get("history_scope", self.id),
+        )
 
         # Add LLM and Memory instances
         self.llm: Optional[BaseLLM] = None
         self.memory: Optional[BaseMemory] = None
+        self.response_cache: Optional["SemanticResponseCache"] = None
+
+        # Fire-and-forget work (memory writes) and its failures
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._background_errors: Deque[Dict[str, Any]] = deque(
+            maxlen=config.get("max_background_errors", 100)
+        )
 
     def set_llm(self, llm_instance: BaseLLM):
         self.llm = llm_instance
@@ -93,6 +137,9 @@ class BaseAgent:
     def set_memory(self, memory_instance: BaseMemory):
         self.memory = memory_instance
 
+    def set_response_cache(self, cache: Optional["SemanticResponseCache"]):
+        self.response_cache = cache
+
     async def run(self, input_data: AgentInput) -> AgentOutput:
         """
         Run the agent with the given input
@@ -106,6 +153,66 @@ class BaseAgent:
         # TODO: Implement the run method in subclasses
         raise NotImplementedError("Subclasses must implement run()")
 
+    async def run_stream(self, input_data: AgentInput) -> AsyncIterator[AgentEvent]:
+        """
+        Run the agent and stream intermediate events
+
+        Agents without incremental output emit a single "result" event.
+
+        Parameters:
+            input_data: AgentInput - The input data for the agent task
+
+        Yields:
+            AgentEvent - Stage events, tokens and finally the result
+        """
+        result = await self.run(input_data)
+        yield AgentEvent(event="result", data=result.model_dump(mode="json"))
+
+    def history_stats(self) -> Dict[str, Any]:
+        """Rolling aggregates over the agent's recent task results"""
+        return self._task_history.stats()
+
+    def background_status(self) -> Dict[str, Any]:
+        """Pending background tasks and the most recent background failures.
+
+        Failures of writes the memory backend buffers and flushes on its own
+        are included as well.
+        """
+        errors = list(self._background_errors)
+        if self.memory is not None:
+            errors.extend(self.memory.background_errors())
+        return {
+            "pending": len(self._background_tasks),
+            "errors": sorted(errors, key=lambda error: error["timestamp"]),
+        }
+
+    async def drain_background(self, timeout: Optional[float] = None) -> None:
+        """Wait for pending background tasks, e.g. before shutdown"""
+        if self._background_tasks:
+            await asyncio.wait(set(self._background_tasks), timeout=timeout)
+
+    def _spawn_background(self, coro: Awaitable[Any], stage: str) -> asyncio.Task:
+        """Run ``coro`` off the request path; failures land in background_status"""
+        task = asyncio.create_task(coro, name=f"{self.id}:{stage}")
+        self._background_tasks.add(task)
+        task.add_done_callback(lambda t: self._on_background_done(t, stage))
+        return task
+
+    def _on_background_done(self, task: asyncio.Task, stage: str) -> None:
+        self._background_tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error(f"Background {stage} for agent {self.id} failed: {error}")
+            self._background_errors.append(
+                {
+                    "stage": stage,
+                    "error": str(error),
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+            )
+
     async def stop(self) -> bool:
         """
         Stop a running agent task
@@ -153,13 +260,26 @@ class BaseAgent:
                 "Answer may be too brief - consider providing more detail"
             )
 
-        # Add to task history
-        self._task_history.append(result)
+        # Compare against recent trends (O(1) rolling aggregates)
+        history = self._task_history
+        if len(history) >= 10:
+            if history.low_confidence_rate > 0.5:
+                reflection_points.append(
+                    f"Confidence has been low in {history.low_confidence_rate:.0%} of recent tasks"
+                )
+            if result.execution_time > 2 * history.mean_execution_time > 0:
+                reflection_points.append(
+                    f"Slower than the recent average of {history.mean_execution_time:.1f}s"
+                )
 
         if not reflection_points:
-            return "Task completed successfully with no significant issues"
+            notes = "Task completed successfully with no significant issues"
+        else:
+            notes = " | ".join(reflection_points)
 
-        return " | ".join(reflection_points)
+        # Add to task history
+        history.append(result, reflection_notes=notes)
+        return notes
 
 
 # Example specialized agent stub
@@ -172,6 +292,7 @@ class ResearchAgent(BaseAgent):
         config: Dict[str, Any] = {},
         llm: Optional[BaseLLM] = None,
         memory: Optional[BaseMemory] = None,
+        response_cache: Optional["SemanticResponseCache"] = None,
     ):
         super().__init__(
             name=name,
@@ -183,65 +304,241 @@ class ResearchAgent(BaseAgent):
             self.set_llm(llm)
         if memory:
             self.set_memory(memory)
+        if response_cache is None and config.get("response_cache"):
+            from .response_cache import SemanticResponseCache
+
+            response_cache = SemanticResponseCache.from_config(config["response_cache"])
+        self.set_response_cache(response_cache)
+        self._context_builder: Optional[ContextBuilder] = None
 
     async def run(self, input_data: AgentInput) -> AgentOutput:
         """Run research task using memory, tools, and LLM"""
+        self._check_dependencies()
+
+        start_time = time.time()
+        prompt = input_data.prompt
+        cached = await self._cached_response(input_data, start_time)
+        if cached:
+            return cached
+        context, sources, _ = await self._gather_context(input_data)
+
+        # 3. Synthesize Answer using LLM
+        llm_input = self._build_llm_input(prompt, context)
+
+        try:
+            llm_output = await self.llm.generate(llm_input)
+            answer = llm_output.text
+            confidence = 0.8  # TODO: Estimate confidence based on LLM output/sources
+        except Exception as e:
+            logger.error(f"Error generating response with LLM: {e}")
+            answer = "Error: Could not generate response."
+            confidence = 0.1
+
+        final_output = await self._finalize(
+            prompt, answer, sources, confidence, start_time
+        )
+        await self._cache_response(input_data, final_output)
+        return final_output
+
+    async def run_stream(self, input_data: AgentInput) -> AsyncIterator[AgentEvent]:
+        """Run research task, streaming stage events and LLM tokens"""
+        self._check_dependencies()
 
+        start_time = time.time()
+        prompt = input_data.prompt
+        cached = await self._cached_response(input_data, start_time)
+        if cached:
+            yield AgentEvent(event="result", data=cached.model_dump(mode="json"))
+            return
+        context, sources, memory_hits = await self._gather_context(input_data)
+        yield AgentEvent(event="memory", data={"hits": memory_hits})
+        yield AgentEvent(event="sources", data={"sources": list(set(sources))})
+
+        llm_input = self._build_llm_input(prompt, context)
+        answer = ""
+        confidence = 0.8
+        try:
+            # aclosing() stops generation as soon as the consumer goes away
+            async with aclosing(self.llm.stream(llm_input)) as stream:
+                async for chunk in stream:
+                    if chunk.finish_reason is not None or chunk.token_usage:
+                        # Final chunk carries the full text
+                        answer = chunk.text
+                        break
+                    yield AgentEvent(event="token", data={"text": chunk.text})
+        except Exception as e:
+            logger.error(f"Error streaming response with LLM: {e}")
+            yield AgentEvent(event="error", data={"message": str(e)})
+            answer = "Error: Could not generate response."
+            confidence = 0.1
+
+        final_output = await self._finalize(
+            prompt, answer, sources, confidence, start_time
+        )
+        await self._cache_response(input_data, final_output)
+        yield AgentEvent(event="result", data=final_output.model_dump(mode="json"))
+
+    def _use_cache(self, input_data: AgentInput) -> bool:
+        if self.response_cache is None:
+            return False
+        return (input_data.parameters or {}).get("use_cache", True)
+
+    async def _cached_response(
+        self, input_data: AgentInput, start_time: float
+    ) -> Optional[AgentOutput]:
+        """Answer from the semantic response cache when a close prompt exists"""
+        if not self._use_cache(input_data):
+            return None
+        scope = self.response_cache.scope(self.id, input_data)
+        try:
+            cached = await self.response_cache.lookup(scope, input_data.prompt)
+        except Exception as e:
+            logger.error(f"Error reading response cache: {e}")
+            return None
+        if cached is None:
+            return None
+        logger.info(f"Serving cached response for task '{input_data.prompt}'")
+        cached.execution_time = time.time() - start_time
+        return cached
+
+    async def _cache_response(
+        self, input_data: AgentInput, output: AgentOutput
+    ) -> None:
+        # Failed generations are never cached
+        if not self._use_cache(input_data) or output.confidence <= 0.1:
+            return
+        scope = self.response_cache.scope(self.id, input_data)
+        try:
+            await self.response_cache.store(scope, input_data.prompt, output)
+        except Exception as e:
+            logger.error(f"Error writing response cache: {e}")
+
+    def _check_dependencies(self) -> None:
         if not self.llm:
             raise RuntimeError("ResearchAgent requires an LLM instance.")
         if not self.memory:
             raise RuntimeError("ResearchAgent requires a Memory instance.")
 
-        start_time = time.time()
+    async def _gather_context(
+        self, input_data: AgentInput
+    ) -> Tuple[str, List[str], int]:
+        """Collect context and sources from memory and web search.
+
+        The web search starts alongside the memory lookup and is cancelled if
+        memory alone returns enough results, so the latency is that of the
+        slower of the two rather than their sum.
+
+        Returns the context text, the source URLs and the number of memory hits.
+        """
         prompt = input_data.prompt
         max_sources = (
             input_data.parameters.get("max_sources", 3) if input_data.parameters else 3
         )
 
-        # 1. Search Memory
+        web_task = asyncio.create_task(self._web_search(prompt, max_sources))
+        try:
+            # 1. Search Memory
+            memory_results = await self._search_memory(prompt, max_sources)
+            passages = [
+                ContextPassage(
+                    text=r.content, source=r.metadata.get("source") or None, key=r.id
+                )
+                for r in memory_results
+            ]
+
+            # 2. Use web results if memory is insufficient
+            if len(memory_results) < max_sources:
+                snippets, urls = await web_task
+                needed = max_sources - len(memory_results)
+                passages.extend(
+                    ContextPassage(text=snippet, source=url)
+                    for snippet, url in zip(snippets[:needed], urls[:needed])
+                )
+        finally:
+            web_task.cancel()
+
+        # 3. Pack the most relevant passages into the token budget
+        built = self._get_context_builder().build(
+            prompt, passages, token_budget=self._context_budget(input_data)
+        )
+        if built.dropped:
+            logger.info(
+                f"Context uses {built.passages} passages ({built.tokens} tokens), "
+                f"dropped {built.dropped}"
+            )
+        return built.text, built.sources, len(memory_results)
+
+    def _get_context_builder(self) -> ContextBuilder:
+        # Rebuilt when the LLM (and so its tokenizer) is swapped
+        if (
+            self._context_builder is None
+            or self._context_builder.count_tokens != self.llm.count_tokens
+        ):
+            self._context_builder = ContextBuilder(
+                self.llm.count_tokens,
+                dedup_threshold=self.config.get("context_dedup_threshold", 0.8),
+            )
+        return self._context_builder
+
+    def _context_budget(self, input_data: AgentInput) -> int:
+        """Context tokens allowed: configured budget, capped by the model window"""
+        parameters = input_data.parameters or {}
+        budget = parameters.get(
+            "context_token_budget", self.config.get("context_token_budget", 2048)
+        )
+        window = self.llm.context_window()
+        if window:
+            template = self.llm.count_tokens(
+                self._build_llm_input(input_data.prompt, "").prompt
+            )
+            budget = min(budget, window - template - self.llm.max_output_tokens())
+        return max(0, budget)
+
+    async def _search_memory(self, prompt: str, top_k: int) -> List[MemoryRecord]:
         try:
             memory_results = await self.memory.search(
-                query=prompt, top_k=max_sources, filter={"agent_id": self.id}
+                query=prompt, top_k=top_k, filter={"agent_id": self.id}
             )
             logger.info(f"Found {len(memory_results)} relevant records in memory.")
-            context = "\n".join([r.content for r in memory_results])
+            return memory_results
         except Exception as e:
             logger.error(f"Error searching memory: {e}")
-            memory_results = []
-            context = ""
-
-        # 2. (Placeholder) Use Web Search Tool if memory is insufficient
-        sources = [
-            r.metadata.get("source", "")
-            for r in memory_results
-            if r.metadata.get("source")
-        ]
-        if len(memory_results) < max_sources:
-            logger.info("Memory insufficient, performing web search (placeholder)...")
-            # TODO: Implement actual web search tool integration
-            # Assume web_search_tool is an instance of BaseIntegration providing 'search'
-            # web_search_result = await self.run_integration_tool('web_search', {'query': prompt, 'num_results': max_sources - len(memory_results)})
-            # if web_search_result.success:
-            #     context += "\n" + "\n".join(web_search_result.result['snippets'])
-            #     sources.extend(web_search_result.result['urls'])
-            # For now, add dummy web results
-            dummy_web_context = f"Web search placeholder for '{prompt}'. Found relevant info at example.com."
-            context += "\n" + dummy_web_context
-            sources.append("https://placeholder.example.com")
-
-        # 3. Synthesize Answer using LLM
+            return []
+
+    async def _web_search(
+        self, prompt: str, num_results: int
+    ) -> Tuple[List[str], List[str]]:
+        """Return ``(snippets, urls)`` from the web search integration"""
+        logger.info("Performing web search (placeholder)...")
+        # TODO: Implement actual web search tool integration
+        # Assume web_search_tool is an instance of BaseIntegration providing 'search'
+        # web_search_result = await self.run_integration_tool('web_search', {'query': prompt, 'num_results': num_results})
+        # if web_search_result.success:
+        #     return web_search_result.result['snippets'], web_search_result.result['urls']
+        # For now, return dummy web results
+        dummy_web_context = f"Web search placeholder for '{prompt}'. Found relevant info at example.com."
+        return [dummy_web_context], ["https://placeholder.example.com"]
+
+    def _build_llm_input(self, prompt: str, context: str) -> LLMInput:
         llm_prompt = f"Based on the following context, please answer the question: {prompt}\n\nContext:\n{context}"
-        llm_input = LLMInput(prompt=llm_prompt)
-
-        try:
-            llm_output = await self.llm.generate(llm_input)
-            answer = llm_output.text
-            confidence = 0.8  # TODO: Estimate confidence based on LLM output/sources
-        except Exception as e:
-            logger.error(f"Error generating response with LLM: {e}")
-            answer = "Error: Could not generate response."
-            confidence = 0.1
+        return LLMInput(prompt=llm_prompt)
 
+    async def _finalize(
+        self,
+        prompt: str,
+        answer: str,
+        sources: List[str],
+        confidence: float,
+        start_time: float,
+    ) -> AgentOutput:
+        """Build the reflected AgentOutput and hand the memory write off.
+
+        Reflection only inspects the output and the rolling task history, so it
+        runs before returning and the output is complete when the caller gets
+        it. The memory write runs as a tracked background task whose failures
+        are logged and kept in ``background_status``; set
+        ``inline_post_processing`` in the config to await it instead.
+        """
         # 4. Format Output and Store in Memory
         execution_time = time.time() - start_time
         final_output = AgentOutput(
@@ -250,24 +547,27 @@ class ResearchAgent(BaseAgent):
             confidence=confidence,
             execution_time=execution_time,
         )
-
-        # Store the result in memory
-        try:
-            memory_record = MemoryRecord(
-                id=f"task_{int(start_time)}_{self.id}",  # Example ID
-                content=f"Prompt: {prompt}\nAnswer: {answer}",
-                metadata={"source_urls": sources, "confidence": confidence},
-                agent_id=self.id,
-            )
-            await self.memory.add(memory_record)
-            logger.info(f"Stored result for task '{prompt}' in memory.")
-        except Exception as e:
-            logger.error(f"Error storing result in memory: {e}")
-
-        # Add reflection
         final_output.reflection_notes = await self.reflect(final_output)
+
+        memory_record = MemoryRecord(
+            id=f"task_{int(start_time)}_{self.id}",  # Example ID
+            content=f"Prompt: {prompt}\nAnswer: {answer}",
+            metadata={"source_urls": sources, "confidence": confidence},
+            agent_id=self.id,
+        )
+        if self.config.get("inline_post_processing", False):
+            try:
+                await self._store_result(memory_record)
+            except Exception as e:
+                logger.error(f"Error storing result in memory: {e}")
+        else:
+            self._spawn_background(self._store_result(memory_record), "memory_write")
         return final_output
 
+    async def _store_result(self, memory_record: MemoryRecord) -> None:
+        await self.memory.add(memory_record)
+        logger.info(f"Stored result {memory_record.id} in memory.")
+
     # Helper placeholder for running integration tools (to be implemented properly)
     async def run_integration_tool(
         self, tool_name: str, params: Dict[str, Any]
@@ -0,0 +1,158 @@
+"""
+filepath: backend/agents/context.py
+Token-budgeted assembly of retrieved passages into an LLM prompt context.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Callable, FrozenSet, List, Optional
+
+from pydantic import BaseModel
+
+from ..memory.bm25 import reciprocal_rank_fusion, tokenize
+
+
+class ContextPassage(BaseModel):
+    """Candidate text for the prompt context, in retrieval order"""
+
+    text: str
+    source: Optional[str] = None
+    key: Optional[str] = None  # Stable ID (e.g. memory record ID) for caching
+
+
+class BuiltContext(BaseModel):
+    """Packed context and what went into it"""
+
+    text: str
+    sources: List[str] = []
+    passages: int = 0
+    tokens: int = 0
+    dropped: int = 0  # Candidates left out as duplicates or over budget
+
+
+class ContextBuilder:
+    """Packs the most relevant passages into a fixed token budget.
+
+    Candidates are ranked by fusing their retrieval order with lexical overlap
+    against the query, then added greedily while they fit. Passages whose word
+    shingles overlap an already chosen one by ``dedup_threshold`` or more are
+    skipped. Token counts come from the model's tokenizer and are cached per
+    passage key, so the same memory record is never tokenized twice.
+    """
+
+    separator = "\n\n"
+
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int],
+        token_budget: int = 2048,
+        dedup_threshold: float = 0.8,
+        cache_size: int = 4096,
+    ):
+        self.count_tokens = count_tokens
+        self.token_budget = token_budget
+        self.dedup_threshold = dedup_threshold
+        self.cache_size = cache_size
+        self._token_counts: "OrderedDict[str, int]" = OrderedDict()
+        self._separator_tokens: Optional[int] = None
+
+    def build(
+        self,
+        query: str,
+        passages: List[ContextPassage],
+        token_budget: Optional[int] = None,
+    ) -> BuiltContext:
+        """Select and join passages for ``query`` within ``token_budget``"""
+        budget = self.token_budget if token_budget is None else token_budget
+        if self._separator_tokens is None:
+            self._separator_tokens = self.count_tokens(self.separator)
+
+        chosen: List[ContextPassage] = []
+        chosen_shingles: List[FrozenSet[str]] = []
+        used = 0
+        for passage in self._rank(query, passages):
+            shingles = self._shingles(passage.text)
+            if any(
+                self._jaccard(shingles, other) >= self.dedup_threshold
+                for other in chosen_shingles
+            ):
+                continue
+            cost = self._tokens(passage) + (self._separator_tokens if chosen else 0)
+            if used + cost > budget:
+                if chosen:
+                    continue
+                # Nothing fits yet: trim the best passage rather than send none
+                passage = self._truncate(passage, budget)
+                cost = self.count_tokens(passage.text)
+                if not passage.text or cost > budget:
+                    continue
+            chosen.append(passage)
+            chosen_shingles.append(shingles)
+            used += cost
+
+        sources: List[str] = []
+        for passage in chosen:
+            if passage.source and passage.source not in sources:
+                sources.append(passage.source)
+        return BuiltContext(
+            text=self.separator.join(p.text for p in chosen),
+            sources=sources,
+            passages=len(chosen),
+            tokens=used,
+            dropped=len(passages) - len(chosen),
+        )
+
+    def _rank(self, query: str, passages: List[ContextPassage]) -> List[ContextPassage]:
+        if len(passages) < 2:
+            return [p for p in passages if p.text.strip()]
+        query_terms = set(tokenize(query))
+        overlap = {}
+        for i, passage in enumerate(passages):
+            terms = set(tokenize(passage.text))
+            overlap[i] = len(query_terms & terms) / (len(query_terms) or 1)
+        retrieval_order = [str(i) for i in range(len(passages))]
+        lexical_order = [
+            str(i) for i in sorted(overlap, key=lambda i: overlap[i], reverse=True)
+        ]
+        fused = reciprocal_rank_fusion([retrieval_order, lexical_order])
+        return [passages[int(i)] for i, _ in fused if passages[int(i)].text.strip()]
+
+    def _tokens(self, passage: ContextPassage) -> int:
+        if passage.key:
+            # Length guards against a record re-added under the same ID
+            key = f"{passage.key}:{len(passage.text)}"
+        else:
+            key = hashlib.sha1(passage.text.encode("utf-8")).hexdigest()
+        count = self._token_counts.get(key)
+        if count is None:
+            count = self.count_tokens(passage.text)
+            self._token_counts[key] = count
+            while len(self._token_counts) > self.cache_size:
+                self._token_counts.popitem(last=False)
+        else:
+            self._token_counts.move_to_end(key)
+        return count
+
+    def _truncate(self, passage: ContextPassage, budget: int) -> ContextPassage:
+        text = passage.text
+        tokens = self._tokens(passage)
+        while text and tokens > budget:
+            # Shrink proportionally, with a margin for uneven token lengths
+            text = text[: int(len(text) * budget / tokens * 0.9)]
+            tokens = self.count_tokens(text)
+        return ContextPassage(text=text, source=passage.source)
+
+    @staticmethod
+    def _shingles(text: str, size: int = 3) -> FrozenSet[str]:
+        words = tokenize(text)
+        if len(words) <= size:
+            return frozenset([" ".join(words)])
+        return frozenset(
+            " ".join(words[i : i + size]) for i in range(len(words) - size + 1)
+        )
+
+    @staticmethod
+    def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+        if not a or not b:
+            return 0.0
+        return len(a & b) / len(a | b)
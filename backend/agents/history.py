@@ -0,0 +1,196 @@
+"""
+filepath: backend/agents/history.py
+Bounded, columnar history of agent task results with rolling aggregates.
+"""
+
+import logging
+import sqlite3
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .base import AgentOutput
+
+logger = logging.getLogger(__name__)
+
+
+class TaskHistory:
+    """Ring buffer of the last ``capacity`` task results.
+
+    Only the numeric columns (confidence, execution time, source count,
+    finish time) are kept in memory, in preallocated arrays. Running sums are
+    updated as results enter and leave the window, so the rolling aggregates
+    are O(1). Answers are written to an optional SQLite file keyed by
+    ``scope`` and ring slot, so the disk tier is bounded too. Histories that
+    share a file need distinct scopes, or they overwrite each other's slots.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1000,
+        spill_path: Optional[str] = None,
+        low_confidence_threshold: float = 0.7,
+        slow_threshold: float = 5.0,
+        scope: str = "",
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.low_confidence_threshold = low_confidence_threshold
+        self.slow_threshold = slow_threshold
+        self.scope = scope
+
+        self.confidence = np.zeros(capacity, dtype=np.float64)
+        self.execution_time = np.zeros(capacity, dtype=np.float64)
+        self.source_count = np.zeros(capacity, dtype=np.int32)
+        self.finished_at = np.zeros(capacity, dtype=np.float64)
+        self._next = 0  # Slot the next result goes into
+        self._size = 0
+        self.total = 0  # Results ever appended
+
+        self._sum_confidence = 0.0
+        self._sum_execution_time = 0.0
+        self._sum_sources = 0
+        self._low_confidence = 0
+        self._slow = 0
+
+        self._disk: Optional[sqlite3.Connection] = None
+        if spill_path:
+            self._disk = sqlite3.connect(spill_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS task_answers (scope TEXT, slot INTEGER, seq INTEGER, answer TEXT, reflection TEXT, PRIMARY KEY (scope, slot))"
+            )
+            self._disk.commit()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(
+        self, output: "AgentOutput", reflection_notes: Optional[str] = None
+    ) -> None:
+        """Record a result, evicting the oldest one when full"""
+        slot = self._next
+        if self._size == self.capacity:
+            self._account(slot, -1)
+        else:
+            self._size += 1
+
+        self.confidence[slot] = output.confidence
+        self.execution_time[slot] = output.execution_time
+        self.source_count[slot] = len(output.sources)
+        self.finished_at[slot] = time.time()
+        self._account(slot, 1)
+        self._next = (slot + 1) % self.capacity
+        self.total += 1
+
+        # Running float sums drift; re-derive them once per full cycle
+        if self.total % self.capacity == 0:
+            self._resync()
+
+        if self._disk:
+            try:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO task_answers (scope, slot, seq, answer, reflection) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        self.scope,
+                        slot,
+                        self.total,
+                        output.answer,
+                        reflection_notes or output.reflection_notes,
+                    ),
+                )
+                self._disk.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to spill task answer to disk: {e}")
+
+    @property
+    def mean_confidence(self) -> float:
+        return self._sum_confidence / self._size if self._size else 0.0
+
+    @property
+    def mean_execution_time(self) -> float:
+        return self._sum_execution_time / self._size if self._size else 0.0
+
+    @property
+    def mean_source_count(self) -> float:
+        return self._sum_sources / self._size if self._size else 0.0
+
+    @property
+    def low_confidence_rate(self) -> float:
+        return self._low_confidence / self._size if self._size else 0.0
+
+    @property
+    def slow_rate(self) -> float:
+        return self._slow / self._size if self._size else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Rolling aggregates over the current window"""
+        return {
+            "size": self._size,
+            "capacity": self.capacity,
+            "total": self.total,
+            "mean_confidence": self.mean_confidence,
+            "mean_execution_time": self.mean_execution_time,
+            "mean_source_count": self.mean_source_count,
+            "low_confidence_rate": self.low_confidence_rate,
+            "slow_rate": self.slow_rate,
+        }
+
+    def recent(self, n: int = 10) -> List[Dict[str, Any]]:
+        """The last ``n`` results, newest first, with answers if spilled"""
+        rows = []
+        for i in range(min(n, self._size)):
+            slot = (self._next - 1 - i) % self.capacity
+            row = {
+                "confidence": float(self.confidence[slot]),
+                "execution_time": float(self.execution_time[slot]),
+                "source_count": int(self.source_count[slot]),
+                "finished_at": float(self.finished_at[slot]),
+            }
+            if self._disk:
+                found = self._disk.execute(
+                    "SELECT answer, reflection FROM task_answers WHERE scope = ? AND slot = ?",
+                    (self.scope, slot),
+                ).fetchone()
+                if found:
+                    row["answer"], row["reflection_notes"] = found
+            rows.append(row)
+        return rows
+
+    def clear(self) -> None:
+        """Drop all results"""
+        self._next = 0
+        self._size = 0
+        self._resync()
+        if self._disk:
+            self._disk.execute(
+                "DELETE FROM task_answers WHERE scope = ?", (self.scope,)
+            )
+            self._disk.commit()
+
+    def close(self) -> None:
+        """Close the on-disk tier"""
+        if self._disk:
+            self._disk.close()
+            self._disk = None
+
+    def _account(self, slot: int, sign: int) -> None:
+        confidence = float(self.confidence[slot])
+        execution_time = float(self.execution_time[slot])
+        self._sum_confidence += sign * confidence
+        self._sum_execution_time += sign * execution_time
+        self._sum_sources += sign * int(self.source_count[slot])
+        self._low_confidence += sign * (confidence < self.low_confidence_threshold)
+        self._slow += sign * (execution_time > self.slow_threshold)
+
+    def _resync(self) -> None:
+        window = slice(0, self._size)
+        confidence = self.confidence[window]
+        execution_time = self.execution_time[window]
+        self._sum_confidence = float(confidence.sum())
+        self._sum_execution_time = float(execution_time.sum())
+        self._sum_sources = int(self.source_count[window].sum())
+        self._low_confidence = int((confidence < self.low_confidence_threshold).sum())
+        self._slow = int((execution_time > self.slow_threshold).sum())
@@ -3,12 +3,18 @@ filepath: backend/agents/registry.py
 Registry system for managing agent instances and types.
 """
 
-from typing import Dict, List, Type
+import asyncio
+import inspect
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Type
 
 from pydantic import BaseModel
 
 from .base import AgentInput, AgentOutput, BaseAgent
 
+logger = logging.getLogger(__name__)
+
 
 class AgentMetadata(BaseModel):
     """Metadata for registered agents"""
@@ -32,53 +38,304 @@ class AgentMetadata(BaseModel):
     }
 
 
+class AgentPool:
+    """Lazily built, shared instances of one agent type.
+
+    Instances are constructed on first use, up to ``size`` of them, and each
+    request is routed to the least busy one. ``max_concurrency`` caps how many
+    runs of this type may be in flight at once.
+    """
+
+    def __init__(
+        self,
+        agent_type: str,
+        name: str,
+        size: int = 1,
+        max_concurrency: Optional[int] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+    ):
+        self.agent_type = agent_type
+        self.name = name
+        self.size = max(1, size)
+        self.max_concurrency = max_concurrency
+        self.kwargs = kwargs or {}
+        self.agent_id = name.lower().replace(" ", "-")
+        self.agents: List[BaseAgent] = []
+        self._in_flight: List[int] = []
+        self._build_lock = asyncio.Lock()
+        self._slots: Optional[asyncio.Semaphore] = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "agent_type": self.agent_type,
+            "instances": len(self.agents),
+            "size": self.size,
+            "in_flight": sum(self._in_flight),
+            "max_concurrency": self.max_concurrency,
+        }
+
+
 class AgentRegistry:
-    """Global registry for managing agent types and instances"""
+    """Global registry for managing agent types and instances.
+
+    Heavy shared dependencies (LLM, memory) are registered once as factories
+    and built on first use, so only one copy exists however many agents use
+    them. Agent types registered as pools are constructed lazily and reused
+    across requests.
+    """
 
     def __init__(self):
         self._agent_types: Dict[str, Type[BaseAgent]] = {}
+        self._type_dependencies: Dict[str, Dict[str, str]] = {}
         self._agent_instances: Dict[str, BaseAgent] = {}
+        self._pools: Dict[str, AgentPool] = {}
+        self._dependency_factories: Dict[str, Callable[[], Any]] = {}
+        self._dependencies: Dict[str, Any] = {}
+        self._dependency_locks: Dict[str, asyncio.Lock] = {}
 
     def register_agent_type(
-        self, agent_type: str, agent_class: Type[BaseAgent]
+        self,
+        agent_type: str,
+        agent_class: Type[BaseAgent],
+        dependencies: Optional[Dict[str, str]] = None,
     ) -> None:
-        """Register a new agent type"""
+        """Register a new agent type
+
+        ``dependencies`` maps constructor arguments to registered dependency
+        names, e.g. ``{"llm": "llm", "memory": "memory"}``.
+        """
         if agent_type in self._agent_types:
             raise ValueError(f"Agent type {agent_type} already registered")
         self._agent_types[agent_type] = agent_class
+        self._type_dependencies[agent_type] = dependencies or {}
+
+    def register_dependency(self, name: str, factory: Callable[[], Any]) -> None:
+        """Register a shared dependency built on first use
+
+        ``factory`` may be a plain or async callable. Blocking factories (model
+        loading) run in a worker thread.
+        """
+        self._dependency_factories[name] = factory
+        self._dependencies.pop(name, None)
+
+    def set_dependency(self, name: str, instance: Any) -> None:
+        """Register an already constructed shared dependency"""
+        self._dependencies[name] = instance
+
+    async def get_dependency(self, name: str) -> Any:
+        """Return a shared dependency, building it once if needed"""
+        if name in self._dependencies:
+            return self._dependencies[name]
+        if name not in self._dependency_factories:
+            raise ValueError(f"Unknown dependency: {name}")
+        lock = self._dependency_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            if name not in self._dependencies:
+                factory = self._dependency_factories[name]
+                if inspect.iscoroutinefunction(factory):
+                    instance = await factory()
+                else:
+                    instance = await asyncio.to_thread(factory)
+                self._dependencies[name] = instance
+                logger.info(f"Initialized shared dependency '{name}'")
+        return self._dependencies[name]
 
     def create_agent(self, agent_type: str, name: str, **kwargs) -> BaseAgent:
-        """Create a new agent instance"""
+        """Create a new agent instance
+
+        Shared dependencies that are already built are injected unless passed
+        explicitly.
+        """
         if agent_type not in self._agent_types:
             raise ValueError(f"Unknown agent type: {agent_type}")
 
+        for arg, dependency in self._type_dependencies[agent_type].items():
+            if arg not in kwargs and dependency in self._dependencies:
+                kwargs[arg] = self._dependencies[dependency]
         agent_class = self._agent_types[agent_type]
         agent = agent_class(name=name, **kwargs)
         self._agent_instances[agent.id] = agent
         return agent
 
+    def register_pool(
+        self,
+        agent_type: str,
+        name: str,
+        size: int = 1,
+        max_concurrency: Optional[int] = None,
+        **kwargs,
+    ) -> str:
+        """Declare a lazily constructed pool of agents and return its agent ID"""
+        if agent_type not in self._agent_types:
+            raise ValueError(f"Unknown agent type: {agent_type}")
+        pool = AgentPool(agent_type, name, size, max_concurrency, kwargs)
+        self._pools[pool.agent_id] = pool
+        return pool.agent_id
+
+    def has_agent(self, agent_id: str) -> bool:
+        """Whether an agent or pool with this ID exists (built or not)"""
+        return agent_id in self._agent_instances or agent_id in self._pools
+
     def get_agent(self, agent_id: str) -> BaseAgent:
         """Get an agent instance by ID"""
-        if agent_id not in self._agent_instances:
+        if agent_id in self._agent_instances:
+            return self._agent_instances[agent_id]
+        pool = self._pools.get(agent_id)
+        if pool is not None and pool.agents:
+            return pool.agents[0]
+        if pool is not None:
+            raise ValueError(f"Agent not constructed yet: {agent_id}")
+        raise ValueError(f"Agent not found: {agent_id}")
+
+    def agent_version(self, agent_id: str) -> str:
+        """Version of an agent by ID, without constructing pooled agents"""
+        pool = self._pools.get(agent_id)
+        if pool is not None and not pool.agents:
+            config = pool.kwargs.get("config") or {}
+            return str(
+                config.get("version", self._agent_types[pool.agent_type].version)
+            )
+        return self.get_agent(agent_id).version
+
+    async def acquire(self, agent_id: str) -> BaseAgent:
+        """Get an agent by ID, constructing pooled agents on first use"""
+        pool = self._pools.get(agent_id)
+        if pool is None:
+            return self.get_agent(agent_id)
+        return pool.agents[await self._pick(pool)]
+
+    @asynccontextmanager
+    async def lease(self, agent_id: str) -> AsyncIterator[BaseAgent]:
+        """Hold an agent for one run, honouring the pool's concurrency limit"""
+        pool = self._pools.get(agent_id)
+        if pool is None:
+            yield self.get_agent(agent_id)
+            return
+        if pool._slots is not None:
+            await pool._slots.acquire()
+        try:
+            index = await self._pick(pool)
+            pool._in_flight[index] += 1
+            try:
+                yield pool.agents[index]
+            finally:
+                pool._in_flight[index] -= 1
+        finally:
+            if pool._slots is not None:
+                pool._slots.release()
+
+    def background_status(self, agent_id: str) -> Dict[str, Any]:
+        """Background work of every built instance of an agent, without building any"""
+        pool = self._pools.get(agent_id)
+        if pool is not None:
+            agents = list(pool.agents)
+        elif agent_id in self._agent_instances:
+            agents = [self._agent_instances[agent_id]]
+        else:
             raise ValueError(f"Agent not found: {agent_id}")
-        return self._agent_instances[agent_id]
+        statuses = [agent.background_status() for agent in agents]
+        # Pooled instances can share one memory backend, whose write errors
+        # would otherwise be listed once per instance
+        errors = {
+            (error["stage"], error["error"], error["timestamp"]): error
+            for status in statuses
+            for error in status["errors"]
+        }
+        return {
+            "instances": len(agents),
+            "pending": sum(status["pending"] for status in statuses),
+            "errors": sorted(errors.values(), key=lambda error: error["timestamp"]),
+        }
 
     def list_agents(self) -> List[AgentMetadata]:
         """List all registered agent instances"""
-        return [
+        agents = list(self._agent_instances.values())
+        agents.extend(agent for pool in self._pools.values() for agent in pool.agents)
+        metadata = [
             AgentMetadata(
                 name=agent.name,
                 description=agent.description,
                 capabilities=agent.capabilities,
                 agent_type=agent.__class__.__name__.lower().replace("agent", ""),
             )
-            for agent in self._agent_instances.values()
+            for agent in agents
         ]
+        # Pools not built yet are listed without constructing them
+        metadata.extend(
+            AgentMetadata(
+                name=pool.name,
+                description=(self._agent_types[pool.agent_type].__doc__ or "").strip(),
+                capabilities=[],
+                agent_type=pool.agent_type,
+            )
+            for pool in self._pools.values()
+            if not pool.agents
+        )
+        return metadata
 
     def list_agent_types(self) -> List[str]:
         """List available agent types"""
         return list(self._agent_types.keys())
 
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy and which shared dependencies are built"""
+        return {
+            "pools": {agent_id: pool.stats() for agent_id, pool in self._pools.items()},
+            "dependencies": {
+                name: name in self._dependencies
+                for name in set(self._dependency_factories) | set(self._dependencies)
+            },
+        }
+
+    async def close(self) -> None:
+        """Wait for agents' background work, then close shared dependencies"""
+        agents = list(self._agent_instances.values())
+        agents.extend(agent for pool in self._pools.values() for agent in pool.agents)
+        for agent in agents:
+            await agent.drain_background(timeout=10)
+        for name, dependency in list(self._dependencies.items()):
+            close = getattr(dependency, "close", None)
+            if close is None:
+                continue
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error closing dependency '{name}': {e}")
+
+    async def _pick(self, pool: AgentPool) -> int:
+        """Index of the least busy instance, building one if all are busy"""
+        if not pool.agents or (
+            min(pool._in_flight) > 0 and len(pool.agents) < pool.size
+        ):
+            async with pool._build_lock:
+                if not pool.agents or (
+                    min(pool._in_flight) > 0 and len(pool.agents) < pool.size
+                ):
+                    pool.agents.append(await self._build(pool))
+                    pool._in_flight.append(0)
+                    return len(pool.agents) - 1
+        return min(range(len(pool.agents)), key=pool._in_flight.__getitem__)
+
+    async def _build(self, pool: AgentPool) -> BaseAgent:
+        kwargs = dict(pool.kwargs)
+        # Instances share the pool's config, so each gets its own scope in a
+        # shared history file
+        config = kwargs.get("config") or {}
+        scope = config.get("history_scope", pool.name)
+        kwargs["config"] = {**config, "history_scope": f"{scope}#{len(pool.agents)}"}
+        for arg, dependency in self._type_dependencies[pool.agent_type].items():
+            if arg not in kwargs:
+                kwargs[arg] = await self.get_dependency(dependency)
+        agent = self._agent_types[pool.agent_type](name=pool.name, **kwargs)
+        logger.info(
+            f"Constructed pooled agent {agent.id} ({len(pool.agents) + 1}/{pool.size})"
+        )
+        return agent
+
 
 # Global registry instance
 registry = AgentRegistry()
@@ -86,4 +343,6 @@ registry = AgentRegistry()
 # Register built-in agent types
 from .base import ResearchAgent
 
-registry.register_agent_type("research", ResearchAgent)
+registry.register_agent_type(
+    "research", ResearchAgent, dependencies={"llm": "llm", "memory": "memory"}
+)
@@ -0,0 +1,207 @@
+"""
+filepath: backend/agents/response_cache.py
+Semantic cache of agent answers keyed by prompt embedding.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..memory.embedder import Embedder
+from .base import AgentInput, AgentOutput
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticResponseCache:
+    """Bounded cache returning a prior AgentOutput for close-enough prompts.
+
+    Prompts are embedded into one normalized matrix, so a lookup is a single
+    matrix-vector product over the live slots. Identical prompts (after
+    whitespace and case normalization) are answered from a hash index without
+    embedding. Entries expire after ``ttl`` seconds; when the cache is full the
+    least recently used entry is evicted. Entries are scoped by agent and task
+    parameters so answers never leak between differently configured runs.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        similarity_threshold: float = 0.92,
+        ttl: Optional[float] = 3600,
+        embedding_model_name: str = "all-MiniLM-L6-v2",
+        embedding_function: Optional[Callable[[List[str]], Any]] = None,
+    ):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.embedder = Embedder(
+            model_name=embedding_model_name,
+            embedding_function=embedding_function,
+            query_cache_size=max_entries,
+        )
+
+        self._vectors: Optional[np.ndarray] = None  # (max_entries, dim)
+        self._live = np.zeros(max_entries, dtype=bool)
+        self._scopes = np.full(max_entries, None, dtype=object)
+        self._keys: List[Optional[str]] = [None] * max_entries
+        self._outputs: List[Optional[AgentOutput]] = [None] * max_entries
+        self._expires_at = np.full(max_entries, np.inf)
+        self._last_used = np.zeros(max_entries)
+        self._slot_by_key: Dict[str, int] = {}
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SemanticResponseCache":
+        return cls(
+            max_entries=config.get("max_entries", 1024),
+            similarity_threshold=config.get("similarity_threshold", 0.92),
+            ttl=config.get("ttl", 3600),
+            embedding_model_name=config.get("embedding_model_name", "all-MiniLM-L6-v2"),
+            embedding_function=config.get("embedding_function"),
+        )
+
+    @staticmethod
+    def scope(agent_id: str, input_data: AgentInput) -> str:
+        """Cache partition for an agent and its task parameters"""
+        parameters = json.dumps(input_data.parameters or {}, sort_keys=True)
+        return f"{agent_id}\x00{parameters}"
+
+    @staticmethod
+    def key(scope: str, prompt: str) -> str:
+        normalized = " ".join(prompt.split()).casefold()
+        return hashlib.sha256(f"{scope}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    async def lookup(self, scope: str, prompt: str) -> Optional[AgentOutput]:
+        """Return a cached answer for ``prompt`` or None"""
+        now = time.monotonic()
+        slot = self._slot_by_key.get(self.key(scope, prompt))
+        if slot is not None and self._is_fresh(slot, now):
+            self.hits += 1
+            return self._touch(slot, now)
+
+        candidates = self._candidates(scope, now)
+        if len(candidates) == 0:
+            self.misses += 1
+            return None
+        vector = await self._embed(prompt)
+        if self._vectors is None or self._vectors.shape[1] != len(vector):
+            self.misses += 1
+            return None
+        # Slots may have changed while the embedding was computed
+        candidates = self._candidates(scope, time.monotonic())
+        if len(candidates) == 0:
+            self.misses += 1
+            return None
+        similarities = self._vectors[candidates] @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.semantic_hits += 1
+        logger.debug(f"Semantic cache hit (similarity {similarities[best]:.3f})")
+        return self._touch(int(candidates[best]), now)
+
+    async def store(self, scope: str, prompt: str, output: AgentOutput) -> None:
+        """Cache ``output`` as the answer to ``prompt``"""
+        vector = await self._embed(prompt)
+        if self._vectors is None or self._vectors.shape[1] != len(vector):
+            self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+            self._live[:] = False
+            self._slot_by_key.clear()
+
+        key = self.key(scope, prompt)
+        now = time.monotonic()
+        slot = self._slot_by_key.get(key)
+        if slot is None:
+            slot = self._free_slot(now)
+        self._vectors[slot] = vector
+        self._live[slot] = True
+        self._scopes[slot] = scope
+        self._keys[slot] = key
+        self._outputs[slot] = output
+        self._expires_at[slot] = now + self.ttl if self.ttl else np.inf
+        self._last_used[slot] = now
+        self._slot_by_key[key] = slot
+
+    def invalidate(self, agent_id: Optional[str] = None) -> int:
+        """Drop every entry, or only those belonging to ``agent_id``"""
+        prefix = f"{agent_id}\x00" if agent_id else ""
+        dropped = 0
+        for slot in np.flatnonzero(self._live):
+            if self._scopes[slot].startswith(prefix):
+                self._evict(slot)
+                dropped += 1
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit counters and occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": int(self._live.sum()),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    async def _embed(self, prompt: str) -> np.ndarray:
+        # The embedding model is blocking; keep it off the event loop
+        vectors = await asyncio.to_thread(self.embedder.embed_queries, [prompt])
+        return vectors[0]
+
+    def _candidates(self, scope: str, now: float) -> np.ndarray:
+        expired = np.flatnonzero(self._live & (self._expires_at <= now))
+        for slot in expired:
+            self._evict(slot)
+            self.expirations += 1
+        return np.flatnonzero(self._live & (self._scopes == scope))
+
+    def _is_fresh(self, slot: int, now: float) -> bool:
+        if self._expires_at[slot] > now:
+            return True
+        self._evict(slot)
+        self.expirations += 1
+        return False
+
+    def _touch(self, slot: int, now: float) -> AgentOutput:
+        self._last_used[slot] = now
+        return self._outputs[slot].model_copy(update={"cached": True})
+
+    def _free_slot(self, now: float) -> int:
+        free = np.flatnonzero(~self._live)
+        if len(free):
+            return int(free[0])
+        expired = np.flatnonzero(self._expires_at <= now)
+        if len(expired):
+            self.expirations += 1
+            slot = int(expired[0])
+        else:
+            self.evictions += 1
+            slot = int(np.argmin(self._last_used))
+        self._evict(slot)
+        return slot
+
+    def _evict(self, slot: int) -> None:
+        self._live[slot] = False
+        key = self._keys[slot]
+        if key is not None and self._slot_by_key.get(key) == slot:
+            del self._slot_by_key[key]
+        self._keys[slot] = None
+        self._scopes[slot] = None
+        self._outputs[slot] = None
+        self._expires_at[slot] = np.inf
@@ -0,0 +1,177 @@
+"""
+filepath: backend/agents/task_queue.py
+In-process asynchronous task queue for agent runs with per-agent concurrency
+limits and a TTL-evicted result store.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+from .base import AgentInput
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+
+class TaskRecord(BaseModel):
+    """State and result of a queued agent task"""
+
+    task_id: str
+    agent_id: str
+    status: str = "queued"  # e.g., queued, running, completed, failed, cancelled
+    result: Optional[Dict[str, Any]] = None
+    error_message: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class TaskQueueFullError(RuntimeError):
+    """Raised when too many tasks are already waiting or running"""
+
+
+class AgentTaskQueue:
+    """Runs agent tasks in the background and keeps their results for a while.
+
+    Submissions return immediately with a task ID. At most
+    ``max_concurrency_per_agent`` tasks run per agent at a time; the rest wait
+    in line. Finished results are kept for ``result_ttl`` seconds, and at most
+    ``max_results`` of them are retained.
+    """
+
+    def __init__(
+        self,
+        max_concurrency_per_agent: int = 2,
+        max_pending: int = 1000,
+        result_ttl: float = 3600.0,
+        max_results: int = 10000,
+    ):
+        self.max_concurrency_per_agent = max_concurrency_per_agent
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.max_results = max_results
+
+        self._active: Dict[str, TaskRecord] = {}
+        # Finished records in completion order: task_id -> (finished monotonic, record)
+        self._finished: "OrderedDict[str, tuple]" = OrderedDict()
+        self._done_events: Dict[str, asyncio.Event] = {}
+        self._runners: Dict[str, asyncio.Task] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def submit(self, agent_id: str, input_data: AgentInput) -> TaskRecord:
+        """Queue a task for an agent and return its record without waiting"""
+        if not registry.has_agent(agent_id):
+            raise ValueError(f"Agent not found: {agent_id}")
+        if len(self._active) >= self.max_pending:
+            raise TaskQueueFullError(
+                f"Task queue full ({self.max_pending} tasks pending)"
+            )
+        self._evict_expired()
+
+        record = TaskRecord(task_id=str(uuid.uuid4()), agent_id=agent_id)
+        self._active[record.task_id] = record
+        self._done_events[record.task_id] = asyncio.Event()
+        self._runners[record.task_id] = asyncio.create_task(
+            self._execute(record, input_data)
+        )
+        logger.info(f"Queued task {record.task_id} for agent {agent_id}")
+        return record
+
+    def get(self, task_id: str) -> Optional[TaskRecord]:
+        """Look up a task by ID; expired results are no longer available"""
+        self._evict_expired()
+        if task_id in self._active:
+            return self._active[task_id]
+        entry = self._finished.get(task_id)
+        return entry[1] if entry else None
+
+    async def wait(self, task_id: str, timeout: float) -> Optional[TaskRecord]:
+        """Long-poll: wait up to ``timeout`` seconds for the task to finish"""
+        event = self._done_events.get(task_id)
+        if event is not None and timeout > 0:
+            try:
+                await asyncio.wait_for(event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.get(task_id)
+
+    async def cancel(self, task_id: str) -> bool:
+        """Cancel a queued or running task"""
+        runner = self._runners.get(task_id)
+        if runner is None or runner.done():
+            return False
+        runner.cancel()
+        # A runner cancelled before its first step never reaches its finally
+        # block, so the record is retired here as well
+        record = self._active.get(task_id)
+        if record is not None:
+            record.status = "cancelled"
+            self._finish(record)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue occupancy per agent"""
+        running: Dict[str, int] = {}
+        queued: Dict[str, int] = {}
+        for record in self._active.values():
+            counts = running if record.status == "running" else queued
+            counts[record.agent_id] = counts.get(record.agent_id, 0) + 1
+        return {
+            "running": running,
+            "queued": queued,
+            "stored_results": len(self._finished),
+        }
+
+    async def _execute(self, record: TaskRecord, input_data: AgentInput) -> None:
+        semaphore = self._semaphores.setdefault(
+            record.agent_id, asyncio.Semaphore(self.max_concurrency_per_agent)
+        )
+        try:
+            async with semaphore:
+                # Pooled agents are built on first use inside the lease
+                async with registry.lease(record.agent_id) as agent:
+                    record.status = "running"
+                    record.started_at = datetime.utcnow()
+                    output = await agent.run(input_data)
+            record.result = output.model_dump(mode="json")
+            record.status = "completed"
+        except asyncio.CancelledError:
+            record.status = "cancelled"
+        except Exception as e:
+            logger.error(f"Task {record.task_id} failed: {e}")
+            record.status = "failed"
+            record.error_message = str(e)
+        finally:
+            self._finish(record)
+
+    def _finish(self, record: TaskRecord) -> None:
+        """Move a record from active to finished; no-op if already moved"""
+        if self._active.pop(record.task_id, None) is None:
+            return
+        record.finished_at = datetime.utcnow()
+        self._runners.pop(record.task_id, None)
+        self._finished[record.task_id] = (time.monotonic(), record)
+        event = self._done_events.pop(record.task_id, None)
+        if event:
+            event.set()
+
+    def _evict_expired(self) -> None:
+        # Oldest results are at the front, so eviction stops at the first
+        # entry that is still fresh.
+        cutoff = time.monotonic() - self.result_ttl
+        while self._finished:
+            task_id, (finished, _) = next(iter(self._finished.items()))
+            if finished >= cutoff and len(self._finished) <= self.max_results:
+                break
+            del self._finished[task_id]
+
+
+# Global task queue instance
+task_queue = AgentTaskQueue()
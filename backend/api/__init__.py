@@ -6,11 +6,15 @@ API package initialization and router collection.
 from fastapi import APIRouter
 
 from .agents import router as agents_router
+from .flows import router as flows_router
+from .tasks import router as tasks_router
 
 # Create main API router
 api_router = APIRouter()
 
 # Include all module routers
 api_router.include_router(agents_router)
+api_router.include_router(tasks_router)
+api_router.include_router(flows_router)
 
 # TODO: Add additional routers as they are created
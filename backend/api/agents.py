@@ -3,12 +3,20 @@ filepath: backend/api/agents.py
 API endpoints for managing and interacting with agents.
 """
 
+import json
+import logging
+from contextlib import aclosing
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from ..agents import AgentInput, TaskQueueFullError, registry, task_queue
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/agents", tags=["agents"])
 
 
@@ -109,17 +117,37 @@ async def create_agent(agent: AgentCreate):
     return new_agent
 
 
-@router.post("/{agent_name}/tasks")
-async def create_task(agent_name: str, task: dict):
-    """Create a new task for an agent (dummy endpoint)"""
+@router.post("/{agent_name}/tasks", status_code=202)
+async def create_task(agent_name: str, task: TaskRequest):
+    """Queue a task for an agent and return immediately
+
+    Poll ``GET /tasks/{task_id}`` (optionally with ``?wait=`` seconds) for the result.
+    """
+    input_data = AgentInput(prompt=task.prompt, parameters=task.parameters)
+    try:
+        record = await task_queue.submit(agent_name, input_data)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    except TaskQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
     return {
-        "task_id": "123e4567-e89b-12d3-a456-426614174000",
+        "task_id": record.task_id,
         "agent": agent_name,
-        "status": "accepted",
-        "created_at": datetime.now().isoformat(),
+        "status": record.status,
+        "created_at": record.created_at.isoformat(),
     }
 
 
+@router.get("/{agent_id}/background")
+async def get_agent_background(agent_id: str):
+    """Pending background memory writes and recent failures across the pool"""
+    try:
+        return registry.background_status(agent_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Agent not found")
+
+
 @router.post("/{agent_id}/run", response_model=TaskResponse)
 async def run_agent(agent_id: str, task: TaskRequest):
     """Run a task with a specific agent"""
@@ -146,6 +174,43 @@ async def run_agent(agent_id: str, task: TaskRequest):
     )
 
 
+@router.post("/{agent_id}/run/stream")
+async def run_agent_stream(agent_id: str, task: TaskRequest, request: Request):
+    """Run a task with a registered agent, streaming events as Server-Sent Events
+
+    Emits ``memory`` and ``sources`` stage events, one ``token`` event per LLM
+    delta and a final ``result`` event. Generation is cancelled when the client
+    disconnects.
+    """
+    if not registry.has_agent(agent_id):
+        raise HTTPException(status_code=404, detail="Agent not found")
+
+    input_data = AgentInput(prompt=task.prompt, parameters=task.parameters)
+
+    async def event_source() -> AsyncIterator[str]:
+        try:
+            # Pooled agents (and their LLM/memory) are built on first use
+            async with registry.lease(agent_id) as agent, aclosing(
+                agent.run_stream(input_data)
+            ) as events:
+                async for event in events:
+                    if await request.is_disconnected():
+                        logger.info(
+                            f"Client disconnected, cancelling run of {agent_id}"
+                        )
+                        break
+                    yield f"event: {event.event}\ndata: {json.dumps(event.data)}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming agent {agent_id}: {e}")
+            yield f"event: error\ndata: {json.dumps({'message': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # TODO: Add endpoint for stopping a running agent
 # TODO: Add endpoint for agent status updates
 # TODO: Add endpoint for agent configuration
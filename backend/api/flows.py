@@ -0,0 +1,127 @@
+"""
+filepath: backend/api/flows.py
+API endpoints for running orchestrated flows and following their progress.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from ..orchestration import Task, flow_state, orchestrator
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/flows", tags=["flows"])
+
+
+class FlowRequest(BaseModel):
+    tasks: List[Task]
+    flow_id: Optional[str] = None
+
+
+@router.post("/", status_code=202)
+async def start_flow(flow: FlowRequest):
+    """Start a flow of dependent agent tasks in the background"""
+    try:
+        flow_id = orchestrator.start_flow(flow.tasks, flow.flow_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"flow_id": flow_id, "status": "running"}
+
+
+@router.get("/", response_model=List[Dict[str, Any]])
+async def list_flows(
+    status: Optional[str] = None, limit: int = Query(100, ge=1, le=1000)
+):
+    """List recent flows, newest first"""
+    return flow_state.list_flows(status=status, limit=limit)
+
+
+@router.get("/incomplete", response_model=List[str])
+async def list_incomplete_flows():
+    """IDs of checkpointed flows that did not complete and can be resumed"""
+    if orchestrator.checkpoint is None:
+        return []
+    return orchestrator.checkpoint.incomplete_flows()
+
+
+@router.get("/{flow_id}")
+async def get_flow(flow_id: str):
+    """Get the status, task states and timings of a flow"""
+    status = await orchestrator.get_flow_status(flow_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Flow not found or expired")
+    return status
+
+
+@router.get("/{flow_id}/events")
+async def stream_flow_events(flow_id: str, request: Request):
+    """Stream a flow's events as Server-Sent Events until it finishes
+
+    Events already buffered for the flow are sent first, so a client that
+    connects late still sees how the flow got to its current state.
+    """
+    if flow_state.status(flow_id) is None:
+        raise HTTPException(status_code=404, detail="Flow not found or expired")
+
+    async def event_source() -> AsyncIterator[str]:
+        events = flow_state.subscribe(flow_id)
+        pending: Optional[asyncio.Future] = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(events.__anext__())
+                # Wake up periodically to notice disconnected clients
+                done, _ = await asyncio.wait({pending}, timeout=15)
+                if not done:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                try:
+                    event = pending.result()
+                except StopAsyncIteration:
+                    break
+                pending = None
+                yield f"event: {event.kind}\ndata: {json.dumps(event.model_dump())}\n\n"
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+                await asyncio.gather(pending, return_exceptions=True)
+            await events.aclose()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/{flow_id}/resume", status_code=202)
+async def resume_flow(flow_id: str):
+    """Resume a checkpointed flow, re-running only its unfinished tasks"""
+    if orchestrator.checkpoint is None:
+        raise HTTPException(status_code=400, detail="Flow checkpointing is disabled")
+    saved = orchestrator.checkpoint.get(flow_id)
+    if saved is None or not saved.tasks:
+        raise HTTPException(status_code=404, detail="No checkpoint for this flow")
+    try:
+        orchestrator.restart_flow(flow_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"flow_id": flow_id, "status": "running"}
+
+
+@router.delete("/{flow_id}")
+async def cancel_flow(flow_id: str):
+    """Cancel a running flow"""
+    if not await orchestrator.cancel_flow(flow_id):
+        raise HTTPException(
+            status_code=404, detail="Flow not found or already finished"
+        )
+    return {"flow_id": flow_id, "status": "cancelling"}
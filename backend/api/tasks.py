@@ -0,0 +1,34 @@
+"""
+filepath: backend/api/tasks.py
+API endpoints for polling queued agent tasks.
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+
+from ..agents import TaskRecord, task_queue
+
+router = APIRouter(prefix="/tasks", tags=["tasks"])
+
+
+@router.get("/{task_id}", response_model=TaskRecord)
+async def get_task(
+    task_id: str,
+    wait: float = Query(
+        0.0, ge=0.0, le=60.0, description="Long-poll timeout in seconds"
+    ),
+):
+    """Get the status and result of a queued task, optionally waiting for it"""
+    record = await task_queue.wait(task_id, timeout=wait)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Task not found or expired")
+    return record
+
+
+@router.delete("/{task_id}")
+async def cancel_task(task_id: str):
+    """Cancel a queued or running task"""
+    if not await task_queue.cancel(task_id):
+        raise HTTPException(
+            status_code=404, detail="Task not found or already finished"
+        )
+    return {"task_id": task_id, "status": "cancelling"}
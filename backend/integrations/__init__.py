@@ -3,6 +3,16 @@ filepath: backend/integrations/__init__.py
 Integrations module initialization.
 """
 
-from .base import BaseIntegration, IntegrationTool
+from .base import (
+    BaseIntegration,
+    IntegrationTool,
+    IntegrationToolInput,
+    IntegrationToolOutput,
+)
 
-__all__ = ["BaseIntegration", "IntegrationTool"]
+__all__ = [
+    "BaseIntegration",
+    "IntegrationTool",
+    "IntegrationToolInput",
+    "IntegrationToolOutput",
+]
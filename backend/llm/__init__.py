@@ -3,7 +3,41 @@ filepath: backend/llm/__init__.py
 LLM module initialization.
 """
 
+import importlib
+
 from .base import BaseLLM, LLMInput, LLMOutput
-from .llama_cpp import LlamaCPPLLM
+from .cache import CachedLLM, TieredCache
+from .executor import InferenceExecutor, InferenceQueueFullError
+from .scheduler import BaseBatchDecoder, ContinuousBatchScheduler, StepResult
+
+# llama-cpp-python is installed separately (it is built for the local GPU), so
+# the classes that need it are imported on first access
+_LLAMA_CPP_EXPORTS = {
+    "LlamaCPPLLM": ".llama_cpp",
+    "LlamaCPPBatchDecoder": ".llama_cpp",
+    "PrefixKVCache": ".prefix_cache",
+}
+
+
+def __getattr__(name: str):
+    if name in _LLAMA_CPP_EXPORTS:
+        module = importlib.import_module(_LLAMA_CPP_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-__all__ = ["BaseLLM", "LLMInput", "LLMOutput", "LlamaCPPLLM"]
+__all__ = [
+    "BaseLLM",
+    "LLMInput",
+    "LLMOutput",
+    "CachedLLM",
+    "TieredCache",
+    "LlamaCPPLLM",
+    "InferenceExecutor",
+    "InferenceQueueFullError",
+    "BaseBatchDecoder",
+    "ContinuousBatchScheduler",
+    "LlamaCPPBatchDecoder",
+    "PrefixKVCache",
+    "StepResult",
+]
@@ -3,8 +3,9 @@ filepath: backend/llm/base.py
 Base class for Large Language Model interactions.
 """
 
+import json
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterable, Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -41,11 +42,46 @@ class BaseLLM(ABC):
 
     @abstractmethod
     async def stream(self, input_data: LLMInput) -> AsyncIterable[LLMOutput]:
-        """Stream generated text"""
+        """Stream generated text.
+
+        Yields one LLMOutput per text delta, followed by a final LLMOutput with
+        the full text, token_usage and finish_reason set.
+        """
         # TODO: Implement streaming logic
         raise NotImplementedError
         yield  # Required for async generator
 
+    def count_tokens(self, text: str) -> int:
+        """Number of tokens ``text`` occupies in the model's context.
+
+        Providers with a tokenizer should override this; the default is a
+        rough four-characters-per-token estimate.
+        """
+        return max(1, len(text) // 4) if text else 0
+
+    def context_window(self) -> Optional[int]:
+        """Maximum context length in tokens, if known"""
+        return self.config.get("model_params", {}).get("n_ctx")
+
+    def max_output_tokens(self) -> int:
+        """Completion tokens a call may generate unless it overrides the limit"""
+        return self.config.get("generate_params", {}).get("max_tokens", 512)
+
+    def model_identity(self) -> str:
+        """Stable identifier of the model and its default settings.
+
+        Used as part of cache keys, so it must change whenever the same input
+        could produce a different output.
+        """
+        if self.config.get("model_identity"):
+            return self.config["model_identity"]
+        settings = json.dumps(self.config, sort_keys=True, default=str)
+        return f"{type(self).__name__}:{settings}"
+
+    async def close(self) -> None:
+        """Release resources held by the provider (worker threads, handles)"""
+        return None
+
 
 # TODO: Implement LlamaCPPLLM subclass
 # from llama_cpp import Llama
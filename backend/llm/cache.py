@@ -0,0 +1,280 @@
+"""
+filepath: backend/llm/cache.py
+Content-addressed cache for deterministic LLM generations.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterable, Dict, Optional, Tuple
+
+from .base import BaseLLM, LLMInput, LLMOutput
+
+logger = logging.getLogger(__name__)
+
+
+class TieredCache:
+    """Bounded LRU of serialized values with an optional SQLite tier.
+
+    Values are strings; callers serialize them. Entries may carry an expiry
+    time and are dropped when looked up after it. When ``path`` is set every
+    write also goes to ``table`` in a SQLite file, and entries found there are
+    promoted back into memory, so the cache survives restarts.
+    """
+
+    def __init__(
+        self, max_entries: int = 1024, path: Optional[str] = None, table: str = "cache"
+    ):
+        self.max_entries = max_entries
+        self.table = table
+        # key -> (serialized value, expires_at)
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        if path:
+            self._disk = sqlite3.connect(path, check_same_thread=False)
+            self._disk.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)"
+            )
+            self._disk.commit()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the serialized value for ``key`` or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                serialized, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return serialized
+                del self._entries[key]
+                self.expirations += 1
+        if self._disk:
+            row = await asyncio.to_thread(self._load_from_disk, key)
+            if row is not None and row[1] > now:
+                self.disk_hits += 1
+                with self._lock:
+                    self._insert(key, row[0], row[1])
+                return row[0]
+        self.misses += 1
+        return None
+
+    async def set(
+        self, key: str, serialized: str, expires_at: float = float("inf")
+    ) -> None:
+        """Store a serialized value under ``key`` until ``expires_at``"""
+        with self._lock:
+            self._insert(key, serialized, expires_at)
+        if self._disk:
+            await asyncio.to_thread(self._write_to_disk, key, serialized, expires_at)
+
+    def invalidate(self, prefix: str = "") -> None:
+        """Drop every entry whose key starts with ``prefix``"""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+            if self._disk:
+                self._disk.execute(
+                    f"DELETE FROM {self.table} WHERE substr(key, 1, ?) = ?",
+                    (len(prefix), prefix),
+                )
+                self._disk.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit counters and the overall hit ratio"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close the on-disk tier"""
+        with self._lock:
+            if self._disk:
+                self._disk.close()
+                self._disk = None
+
+    def _insert(self, key: str, serialized: str, expires_at: float) -> None:
+        self._entries[key] = (serialized, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load_from_disk(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            if not self._disk:
+                return None
+            return self._disk.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+
+    def _write_to_disk(self, key: str, serialized: str, expires_at: float) -> None:
+        with self._lock:
+            if not self._disk:
+                return
+            try:
+                self._disk.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, serialized, expires_at),
+                )
+                self._disk.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to write to cache table {self.table}: {e}")
+
+
+class CachedLLM(BaseLLM):
+    """BaseLLM wrapper that replays deterministic generations from a cache.
+
+    A call is cacheable when its effective temperature is 0 or it carries a
+    fixed ``seed``. The key is a SHA-256 of the model identity, prompt, system
+    prompt and parameters. Results live in a bounded in-memory LRU and, when
+    ``path`` is set, in a SQLite file that survives restarts. Identical
+    cacheable calls that arrive while one is running share its result.
+    """
+
+    def __init__(self, llm: BaseLLM, config: Optional[Dict[str, Any]] = None):
+        super().__init__(config or {})
+        self.llm = llm
+        self._identity = self.config.get("model_identity") or llm.model_identity()
+        self._cache = TieredCache(
+            max_entries=self.config.get("max_entries", 1024),
+            path=self.config.get("path"),
+            table="generation_cache",
+        )
+        self._inflight: Dict[str, "asyncio.Future[LLMOutput]"] = {}
+
+        self.coalesced = 0
+        self.bypassed = 0
+
+    def model_identity(self) -> str:
+        return self._identity
+
+    def count_tokens(self, text: str) -> int:
+        return self.llm.count_tokens(text)
+
+    def context_window(self) -> Optional[int]:
+        return self.llm.context_window()
+
+    def max_output_tokens(self) -> int:
+        return self.llm.max_output_tokens()
+
+    def is_deterministic(self, input_data: LLMInput) -> bool:
+        """Whether repeated calls with this input yield the same output"""
+        params = {
+            **self.llm.config.get("generate_params", {}),
+            **(input_data.parameters or {}),
+        }
+        return params.get("temperature") == 0 or params.get("seed") is not None
+
+    def key(self, input_data: LLMInput) -> str:
+        """Stable content hash of the input and model identity"""
+        payload = json.dumps(
+            {
+                "model": self._identity,
+                "prompt": input_data.prompt,
+                "system_prompt": input_data.system_prompt,
+                "parameters": input_data.parameters or {},
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def generate(self, input_data: LLMInput) -> LLMOutput:
+        """Return a cached output for deterministic inputs, else generate"""
+        if not self.is_deterministic(input_data):
+            self.bypassed += 1
+            return await self.llm.generate(input_data)
+
+        key = self.key(input_data)
+        cached = await self._lookup(key)
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            try:
+                return (await asyncio.shield(inflight)).model_copy()
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+            # The call we joined was cancelled; run our own
+            return await self.generate(input_data)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            output = await self.llm.generate(input_data)
+            future.set_result(output)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody may be waiting; don't log "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+        await self._store(key, output)
+        return output
+
+    async def stream(self, input_data: LLMInput) -> AsyncIterable[LLMOutput]:
+        """Replay a cached output as one delta, or stream and cache the result"""
+        if not self.is_deterministic(input_data):
+            self.bypassed += 1
+            async for chunk in self.llm.stream(input_data):
+                yield chunk
+            return
+
+        key = self.key(input_data)
+        cached = await self._lookup(key)
+        if cached is not None:
+            yield LLMOutput(text=cached.text)
+            yield cached
+            return
+
+        async for chunk in self.llm.stream(input_data):
+            if chunk.finish_reason is not None or chunk.token_usage:
+                # Only completed streams reach the final chunk
+                await self._store(key, chunk)
+            yield chunk
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit counters and the overall hit ratio"""
+        return {
+            **self._cache.stats(),
+            "coalesced": self.coalesced,
+            "bypassed": self.bypassed,
+        }
+
+    async def close(self) -> None:
+        """Close the on-disk tier and the wrapped LLM"""
+        self._cache.close()
+        await self.llm.close()
+
+    async def _lookup(self, key: str) -> Optional[LLMOutput]:
+        serialized = await self._cache.get(key)
+        return LLMOutput.model_validate_json(serialized) if serialized else None
+
+    async def _store(self, key: str, output: LLMOutput) -> None:
+        await self._cache.set(key, output.model_dump_json())
@@ -0,0 +1,172 @@
+"""
+filepath: backend/llm/executor.py
+Dedicated inference executor that keeps blocking model calls off the event loop.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_STREAM_END = object()
+
+
+class InferenceQueueFullError(RuntimeError):
+    """Raised when the inference queue stays full longer than the submit timeout"""
+
+
+class InferenceExecutor:
+    """Single-threaded worker that owns a model instance and serializes calls to it.
+
+    llama.cpp contexts are not thread-safe, so every call that touches the model
+    runs on the same worker thread. Callers await results from the event loop,
+    and at most ``max_pending`` calls may be queued or running at once; further
+    submissions wait for a free slot (up to ``submit_timeout`` seconds).
+    """
+
+    def __init__(
+        self,
+        max_pending: int = 8,
+        submit_timeout: Optional[float] = None,
+        thread_name: str = "llm-inference",
+    ):
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.max_pending = max_pending
+        self.submit_timeout = submit_timeout
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=thread_name)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+        self._rejected = 0
+        self._closed = False
+
+    def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn`` on the worker thread and block until it returns.
+
+        Intended for setup work (e.g. loading the model) outside the event loop.
+        """
+        self._ensure_open()
+        return self._pool.submit(fn, *args, **kwargs).result()
+
+    async def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Queue ``fn`` on the worker thread and await its result"""
+        self._ensure_open()
+        loop = asyncio.get_running_loop()
+        slots = await self._acquire_slot()
+
+        future = self._pool.submit(fn, *args, **kwargs)
+        # Release the slot only once the worker is actually done with the call,
+        # even if the awaiting coroutine is cancelled in the meantime.
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self._release_slot, slots)
+        )
+        return await asyncio.wrap_future(future, loop=loop)
+
+    async def stream(
+        self,
+        fn: Callable[..., Iterable[T]],
+        *args: Any,
+        buffer_size: int = 64,
+        **kwargs: Any,
+    ) -> AsyncIterator[T]:
+        """Run the iterator returned by ``fn`` on the worker thread.
+
+        Items are handed to the event loop through a queue of ``buffer_size``
+        entries; the worker blocks when the consumer falls behind. Closing the
+        async iterator early stops the producer after its current item.
+        """
+        self._ensure_open()
+        loop = asyncio.get_running_loop()
+        slots = await self._acquire_slot()
+        queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=buffer_size)
+        stop = threading.Event()
+
+        def _put(item: Any) -> None:
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def _produce() -> None:
+            if stop.is_set():
+                return
+            iterator = iter(fn(*args, **kwargs))
+            try:
+                for item in iterator:
+                    if stop.is_set():
+                        break
+                    _put(item)
+            except BaseException as e:
+                if not stop.is_set():
+                    _put(_StreamError(e))
+                return
+            finally:
+                close = getattr(iterator, "close", None)
+                if close:
+                    close()
+            if not stop.is_set():
+                _put(_STREAM_END)
+
+        future = self._pool.submit(_produce)
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self._release_slot, slots)
+        )
+        try:
+            while True:
+                item = await queue.get()
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, _StreamError):
+                    raise item.error
+                yield item
+        finally:
+            stop.set()
+            # Unblock a producer waiting on a full queue so it can observe stop.
+            while not queue.empty():
+                queue.get_nowait()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return current queue occupancy"""
+        return {
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "rejected": self._rejected,
+            "closed": self._closed,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work and release the worker thread"""
+        self._closed = True
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+        logger.info("Inference executor shut down")
+
+    async def _acquire_slot(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        slots = self._slots
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.submit_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            raise InferenceQueueFullError(
+                f"Inference queue full ({self.max_pending} pending requests)"
+            )
+        self._pending += 1
+        return slots
+
+    def _release_slot(self, slots: asyncio.Semaphore) -> None:
+        self._pending -= 1
+        slots.release()
+
+    def _ensure_open(self) -> None:
+        if self._closed:
+            raise RuntimeError("Inference executor has been shut down")
+
+
+class _StreamError:
+    """Wraps an exception raised by a streaming producer"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
@@ -3,12 +3,20 @@ filepath: backend/llm/llama_cpp.py
 Implementation of the BaseLLM interface using llama-cpp-python.
 """
 
+import codecs
+import json
 import logging
-from typing import Any, AsyncIterable, Dict, Optional
+import os
+from typing import Any, AsyncIterable, Dict, Iterator, List, Optional
 
+import llama_cpp
+import numpy as np
 from llama_cpp import Llama
 
 from .base import BaseLLM, LLMInput, LLMOutput
+from .executor import InferenceExecutor
+from .prefix_cache import PrefixKVCache
+from .scheduler import BaseBatchDecoder, ContinuousBatchScheduler, StepResult
 
 logger = logging.getLogger(__name__)
 
@@ -31,13 +39,35 @@ class LlamaCPPLLM(BaseLLM):
         )  # Use GPU for all layers by default
         self.model_params.setdefault("verbose", False)  # Adjust verbosity as needed
 
+        # All model calls go through a single worker thread that owns the Llama
+        # instance, so generation never blocks the event loop.
+        executor_params = config.get("executor_params", {})
+        self.stream_buffer_size = executor_params.get("stream_buffer_size", 64)
+        self.executor = InferenceExecutor(
+            max_pending=executor_params.get("max_pending", 8),
+            submit_timeout=executor_params.get("submit_timeout"),
+        )
+
         try:
-            self.model = Llama(model_path=self.model_path, **self.model_params)
+            self.model = self.executor.run_sync(
+                Llama, model_path=self.model_path, **self.model_params
+            )
             logger.info(f"Initialized Llama model from {self.model_path}")
         except Exception as e:
             logger.error(f"Failed to initialize Llama model: {e}")
             raise
 
+        # Reuse KV states for shared prompt prefixes (system wrapper, agent
+        # templates). Set "prefix_cache": False in the config to disable.
+        self.prefix_cache: Optional[PrefixKVCache] = None
+        prefix_cache_config = config.get("prefix_cache", {})
+        if prefix_cache_config is not False:
+            self.prefix_cache = PrefixKVCache(
+                capacity_bytes=prefix_cache_config.get("capacity_bytes", 1 << 30),
+                min_prefix_tokens=prefix_cache_config.get("min_prefix_tokens", 8),
+            )
+            self.model.set_cache(self.prefix_cache)
+
     async def generate(self, input_data: LLMInput) -> LLMOutput:
         """Generate text using the loaded llama.cpp model"""
         if not self.model:
@@ -49,8 +79,8 @@ class LlamaCPPLLM(BaseLLM):
         params.setdefault("max_tokens", 512)  # Default max tokens
 
         try:
-            completion = self.model.create_completion(
-                prompt=prompt, stream=False, **params
+            completion = await self.executor.submit(
+                self.model.create_completion, prompt=prompt, stream=False, **params
             )
 
             text = completion["choices"][0]["text"]
@@ -74,22 +104,155 @@ class LlamaCPPLLM(BaseLLM):
         params = {**self.generate_params, **(input_data.parameters or {})}
         params.setdefault("max_tokens", 512)
 
+        # Tokens are produced on the executor thread and handed over through a
+        # bounded queue; text is accumulated as a list and joined once.
+        chunks: List[str] = []
+        finish_reason = None
+        usage: Dict[str, int] = {}
         try:
-            stream = self.model.create_completion(prompt=prompt, stream=True, **params)
-
-            collected_text = ""
-            for chunk in stream:
-                delta = chunk["choices"][0]["text"]
-                collected_text += delta
-                yield LLMOutput(text=delta)  # Yield delta chunk
-
-            # Optionally yield a final message with full text and usage (if needed)
-            # logger.info("Stream finished")
-
+            async for chunk in self.executor.stream(
+                self._stream_completion,
+                prompt,
+                buffer_size=self.stream_buffer_size,
+                **params,
+            ):
+                if "usage" in chunk:
+                    usage = chunk["usage"]
+                    continue
+                choice = chunk["choices"][0]
+                delta = choice["text"]
+                finish_reason = choice.get("finish_reason") or finish_reason
+                if delta:
+                    chunks.append(delta)
+                    yield LLMOutput(text=delta)  # Yield delta chunk
         except Exception as e:
             logger.error(f"Error during Llama streaming: {e}")
             raise
 
+        # Final message carries the full text, usage and finish reason
+        yield LLMOutput(
+            text="".join(chunks).strip(),
+            token_usage=usage,
+            finish_reason=finish_reason,
+        )
+
+    def _stream_completion(
+        self, prompt: str, **params: Any
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream completion chunks, then one ``{"usage": ...}`` item.
+
+        Runs on the executor thread as part of the streaming job. Chunks do
+        not map one-to-one to tokens (llama.cpp holds text back around stop
+        sequences and multi-byte characters), so the completion is counted by
+        tokenizing its text once at the end.
+        """
+        text: List[str] = []
+        for chunk in self.model.create_completion(prompt=prompt, stream=True, **params):
+            text.append(chunk["choices"][0]["text"])
+            yield chunk
+        # Counted after the last chunk so time to first token is unaffected
+        prompt_tokens = len(self.model.tokenize(prompt.encode("utf-8"), special=True))
+        completion = "".join(text)
+        completion_tokens = (
+            len(self.model.tokenize(completion.encode("utf-8"), add_bos=False))
+            if completion
+            else 0
+        )
+        yield {
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            }
+        }
+
+    async def warm_prefix(
+        self, prompt_prefix: str, system_prompt: Optional[str] = None
+    ) -> None:
+        """Evaluate a shared prompt prefix once and store its KV state.
+
+        Later prompts starting with the same text resume from this state
+        instead of re-evaluating the prefix.
+        """
+        if not self.prefix_cache:
+            return
+        text = self._format_prompt(prompt_prefix, system_prompt)
+        # Cut the formatted prompt right after the prefix so the assistant
+        # marker is not part of the cached tokens.
+        text = text[: text.index(prompt_prefix) + len(prompt_prefix)]
+
+        def _warm() -> None:
+            tokens = self.model.tokenize(text.encode("utf-8"), special=True)
+            self.model.reset()
+            self.model.eval(tokens)
+            self.prefix_cache[tokens] = self.model.save_state()
+
+        await self.executor.submit(_warm)
+        logger.info(f"Warmed prefix cache with {len(text)} characters")
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return prefix KV-cache hit/miss statistics"""
+        if not self.prefix_cache:
+            return {"enabled": False}
+        return {"enabled": True, **self.prefix_cache.stats()}
+
+    def create_batch_scheduler(
+        self, max_batch_size: int = 4, max_queue_size: int = 256
+    ) -> ContinuousBatchScheduler:
+        """Build a continuous batching front-end that shares this model.
+
+        The scheduler decodes on this instance's executor thread, so it
+        interleaves safely with direct generate()/stream() calls.
+        """
+        decoder = self.executor.run_sync(
+            LlamaCPPBatchDecoder, self.model, max_batch_size
+        )
+        return ContinuousBatchScheduler(
+            decoder=decoder,
+            executor=self.executor,
+            config={
+                "generate_params": self.generate_params,
+                "max_queue_size": max_queue_size,
+                "model_identity": self.model_identity(),
+                "context_window": decoder.seq_ctx,
+            },
+            format_prompt=self._format_prompt,
+            count_tokens=self.count_tokens,
+        )
+
+    def count_tokens(self, text: str) -> int:
+        """Token count from the model's own tokenizer"""
+        if not text:
+            return 0
+        # Tokenizing only reads the vocabulary, so it is safe off the worker
+        return len(self.model.tokenize(text.encode("utf-8"), add_bos=False))
+
+    def context_window(self) -> Optional[int]:
+        return self.model.n_ctx()
+
+    def max_output_tokens(self) -> int:
+        return self.generate_params.get("max_tokens", 512)
+
+    def model_identity(self) -> str:
+        """Model file (path, size, mtime) plus load and generation settings"""
+        stat = os.stat(self.model_path)
+        settings = json.dumps(
+            {
+                "model_path": os.path.abspath(self.model_path),
+                "size": stat.st_size,
+                "mtime": int(stat.st_mtime),
+                "model_params": self.model_params,
+                "generate_params": self.generate_params,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return f"{type(self).__name__}:{settings}"
+
+    async def close(self) -> None:
+        """Release the inference worker thread"""
+        self.executor.shutdown(wait=False)
+
     def _format_prompt(
         self, user_prompt: str, system_prompt: Optional[str] = None
     ) -> str:
@@ -99,3 +262,182 @@ class LlamaCPPLLM(BaseLLM):
             return f"<|system|>{system_prompt}<|end|><|user|>{user_prompt}<|end|><|assistant|>"
         else:
             return user_prompt
+
+
+class LlamaCPPBatchDecoder(BaseBatchDecoder):
+    """Multi-sequence decoder on top of the low-level llama.cpp batch API.
+
+    Shares the weights of an already loaded ``Llama`` model but owns a separate
+    context with one KV-cache sequence per slot. Sampling (temperature, top-k,
+    top-p, stop strings) is done per sequence on the returned logits.
+    """
+
+    def __init__(self, model: Llama, max_batch_size: int = 4, seq_ctx: int = 0):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.seq_ctx = seq_ctx or model.n_ctx()
+        self.n_vocab = model.n_vocab()
+        self.n_batch = max(model.n_batch, max_batch_size)
+
+        ctx_params = llama_cpp.llama_context_default_params()
+        ctx_params.n_ctx = self.seq_ctx * max_batch_size
+        ctx_params.n_batch = self.n_batch
+        ctx_params.n_seq_max = max_batch_size
+        self.ctx = llama_cpp.llama_new_context_with_model(model.model, ctx_params)
+        if not self.ctx:
+            raise RuntimeError("Failed to create llama.cpp batch context")
+        self._batch = llama_cpp.llama_batch_init(self.n_batch, 0, max_batch_size)
+        self._slots: Dict[int, _SlotState] = {}
+
+    def start_sequence(
+        self, slot: int, prompt: str, params: Dict[str, Any]
+    ) -> StepResult:
+        """Prefill the prompt into the slot's KV sequence and sample a token"""
+        tokens = self.model.tokenize(prompt.encode("utf-8"), add_bos=True, special=True)
+        if len(tokens) >= self.seq_ctx:
+            raise ValueError(
+                f"Prompt has {len(tokens)} tokens, exceeds per-sequence context {self.seq_ctx}"
+            )
+        self._remove_kv(slot)
+        state = _SlotState(params=params, prompt_tokens=len(tokens))
+        self._slots[slot] = state
+
+        # Prefill in n_batch chunks; only the last prompt token needs logits.
+        for offset in range(0, len(tokens), self.n_batch):
+            chunk = tokens[offset : offset + self.n_batch]
+            self._fill_batch(
+                [
+                    (tok, offset + i, slot, offset + i == len(tokens) - 1)
+                    for i, tok in enumerate(chunk)
+                ]
+            )
+            self._decode()
+        state.position = len(tokens)
+        return self._sample(slot, self._batch.n_tokens - 1)
+
+    def decode_step(self, slots: List[int]) -> Dict[int, StepResult]:
+        """Feed each slot's last sampled token and sample the next ones"""
+        entries = [
+            (self._slots[slot].last_token, self._slots[slot].position, slot, True)
+            for slot in slots
+        ]
+        self._fill_batch(entries)
+        self._decode()
+        results = {}
+        for i, slot in enumerate(slots):
+            self._slots[slot].position += 1
+            results[slot] = self._sample(slot, i)
+        return results
+
+    def release_sequence(self, slot: int) -> Dict[str, int]:
+        """Drop the slot's KV cells and report its token usage"""
+        self._remove_kv(slot)
+        state = self._slots.pop(slot, None)
+        if state is None:
+            return {}
+        return {
+            "prompt_tokens": state.prompt_tokens,
+            "completion_tokens": state.completion_tokens,
+            "total_tokens": state.prompt_tokens + state.completion_tokens,
+        }
+
+    def close(self) -> None:
+        """Free the batch and the context"""
+        llama_cpp.llama_batch_free(self._batch)
+        llama_cpp.llama_free(self.ctx)
+
+    def _fill_batch(self, entries: List[tuple]) -> None:
+        batch = self._batch
+        batch.n_tokens = len(entries)
+        for i, (token, pos, seq_id, want_logits) in enumerate(entries):
+            batch.token[i] = token
+            batch.pos[i] = pos
+            batch.n_seq_id[i] = 1
+            batch.seq_id[i][0] = seq_id
+            batch.logits[i] = want_logits
+
+    def _decode(self) -> None:
+        status = llama_cpp.llama_decode(self.ctx, self._batch)
+        if status != 0:
+            raise RuntimeError(f"llama_decode failed with status {status}")
+
+    def _remove_kv(self, slot: int) -> None:
+        # Renamed across llama.cpp releases; prefer the newer memory API.
+        if hasattr(llama_cpp, "llama_memory_seq_rm"):
+            llama_cpp.llama_memory_seq_rm(
+                llama_cpp.llama_get_memory(self.ctx), slot, -1, -1
+            )
+        else:
+            llama_cpp.llama_kv_cache_seq_rm(self.ctx, slot, -1, -1)
+
+    def _sample(self, slot: int, batch_index: int) -> StepResult:
+        state = self._slots[slot]
+        params = state.params
+        logits = np.ctypeslib.as_array(
+            llama_cpp.llama_get_logits_ith(self.ctx, batch_index),
+            shape=(self.n_vocab,),
+        ).astype(np.float64)
+
+        temperature = float(params.get("temperature", 0.8))
+        if temperature <= 0:
+            token = int(np.argmax(logits))
+        else:
+            logits /= temperature
+            top_k = int(params.get("top_k", 40))
+            if 0 < top_k < self.n_vocab:
+                candidates = np.argpartition(-logits, top_k)[:top_k]
+            else:
+                candidates = np.arange(self.n_vocab)
+            probs = np.exp(logits[candidates] - logits[candidates].max())
+            probs /= probs.sum()
+            top_p = float(params.get("top_p", 0.95))
+            if top_p < 1.0:
+                order = np.argsort(-probs)
+                keep = np.searchsorted(np.cumsum(probs[order]), top_p) + 1
+                candidates, probs = candidates[order[:keep]], probs[order[:keep]]
+                probs /= probs.sum()
+            token = int(state.rng.choice(candidates, p=probs))
+
+        state.last_token = token
+        state.completion_tokens += 1
+
+        if token == self.model.token_eos():
+            return StepResult(finish_reason="stop")
+
+        text = state.decoder.decode(self.model.detokenize([token]))
+        state.text.append(text)
+        stop = params.get("stop") or []
+        if isinstance(stop, str):
+            stop = [stop]
+        if stop:
+            # Only the tail can complete a stop string.
+            tail = "".join(state.text[-8:])
+            for stop_str in stop:
+                index = tail.find(stop_str)
+                if index != -1:
+                    emitted = len(tail) - len(text)
+                    return StepResult(
+                        text=text[: max(0, index - emitted)], finish_reason="stop"
+                    )
+
+        if (
+            state.completion_tokens >= params.get("max_tokens", 512)
+            or state.position + 1 >= self.seq_ctx
+        ):
+            return StepResult(text=text, finish_reason="length")
+        return StepResult(text=text)
+
+
+class _SlotState:
+    """Per-slot decoding state for LlamaCPPBatchDecoder"""
+
+    def __init__(self, params: Dict[str, Any], prompt_tokens: int):
+        self.params = params
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = 0
+        self.position = 0
+        self.last_token = 0
+        self.text: List[str] = []
+        # Tokens can split multi-byte characters; decode incrementally.
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self.rng = np.random.default_rng(params.get("seed"))
@@ -0,0 +1,76 @@
+"""
+filepath: backend/llm/prefix_cache.py
+LRU cache of llama.cpp KV-cache states keyed by prompt token prefix.
+"""
+
+import logging
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from llama_cpp import Llama, LlamaRAMCache
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixKVCache(LlamaRAMCache):
+    """LlamaRAMCache with a minimum useful prefix length and hit/miss counters.
+
+    ``Llama.create_completion`` looks up the longest cached token prefix of the
+    prompt, restores that state and only evaluates the remaining tokens. After
+    each completion it stores the new state here; least recently used states
+    are evicted once ``capacity_bytes`` is exceeded.
+    """
+
+    def __init__(self, capacity_bytes: int = 1 << 30, min_prefix_tokens: int = 8):
+        super().__init__(capacity_bytes=capacity_bytes)
+        self.min_prefix_tokens = min_prefix_tokens
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reused_tokens = 0
+
+    def _find_longest_prefix_key(
+        self, key: Tuple[int, ...]
+    ) -> Optional[Tuple[int, ...]]:
+        best_len = self.min_prefix_tokens - 1
+        best_key = None
+        for cached_key in self.cache_state.keys():
+            prefix_len = Llama.longest_token_prefix(cached_key, key)
+            if prefix_len > best_len:
+                best_len = prefix_len
+                best_key = cached_key
+        return best_key
+
+    def __getitem__(self, key: Sequence[int]) -> Any:
+        key = tuple(key)
+        cached_key = self._find_longest_prefix_key(key)
+        if cached_key is None:
+            self.misses += 1
+            raise KeyError("Key not found")
+        self.hits += 1
+        self.reused_tokens += Llama.longest_token_prefix(cached_key, key)
+        value = self.cache_state[cached_key]
+        self.cache_state.move_to_end(cached_key)
+        return value
+
+    def __setitem__(self, key: Sequence[int], value: Any) -> None:
+        key = tuple(key)
+        if key in self.cache_state:
+            del self.cache_state[key]
+        self.cache_state[key] = value
+        while self.cache_size > self.capacity_bytes and len(self.cache_state) > 0:
+            self.cache_state.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current memory usage"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "reused_tokens": self.reused_tokens,
+            "evictions": self.evictions,
+            "entries": len(self.cache_state),
+            "size_bytes": self.cache_size,
+            "capacity_bytes": self.capacity_bytes,
+        }
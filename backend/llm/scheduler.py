@@ -0,0 +1,272 @@
+"""
+filepath: backend/llm/scheduler.py
+Continuous batching scheduler that merges concurrent generate() calls into
+shared decode steps.
+"""
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from .base import BaseLLM, LLMInput, LLMOutput
+from .executor import InferenceExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class StepResult(BaseModel):
+    """Token produced for one sequence during a prefill or decode step"""
+
+    text: str = ""
+    finish_reason: Optional[str] = None  # "stop", "length" or None while running
+
+
+class BaseBatchDecoder(ABC):
+    """Backend that can decode several independent sequences in one forward pass.
+
+    Slots are integers in ``range(max_batch_size)``; each slot holds at most one
+    sequence at a time. All methods are blocking and are called from the
+    inference executor's worker thread.
+    """
+
+    max_batch_size: int = 1
+
+    @abstractmethod
+    def start_sequence(
+        self, slot: int, prompt: str, params: Dict[str, Any]
+    ) -> StepResult:
+        """Prefill ``prompt`` into ``slot`` and sample the first token"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def decode_step(self, slots: List[int]) -> Dict[int, StepResult]:
+        """Advance every listed slot by one token in a single shared decode"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def release_sequence(self, slot: int) -> Dict[str, int]:
+        """Free the slot's KV cache and return its token usage"""
+        raise NotImplementedError
+
+
+@dataclass
+class _Sequence:
+    """Book-keeping for one request travelling through the scheduler"""
+
+    prompt: str
+    params: Dict[str, Any]
+    tokens: "asyncio.Queue[Optional[StepResult]]"
+    chunks: List[str] = field(default_factory=list)
+    slot: Optional[int] = None
+    finish_reason: Optional[str] = None
+    usage: Dict[str, int] = field(default_factory=dict)
+    cancelled: bool = False
+
+
+class ContinuousBatchScheduler(BaseLLM):
+    """BaseLLM that batches in-flight requests at the token level.
+
+    Queued requests join the running batch as soon as a slot frees up, and
+    finished sequences leave it immediately, so short answers never wait for
+    long ones. Each sequence keeps its own sampling parameters.
+    """
+
+    def __init__(
+        self,
+        decoder: BaseBatchDecoder,
+        executor: InferenceExecutor,
+        config: Optional[Dict[str, Any]] = None,
+        format_prompt: Optional[Callable[[str, Optional[str]], str]] = None,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ):
+        super().__init__(config or {})
+        self.decoder = decoder
+        self.executor = executor
+        self.max_batch_size = decoder.max_batch_size
+        self.default_params = self.config.get("generate_params", {})
+        self._format_prompt = format_prompt or (lambda prompt, _system: prompt)
+        self._count_tokens = count_tokens
+        self._queue: "asyncio.Queue[_Sequence]" = asyncio.Queue(
+            maxsize=self.config.get("max_queue_size", 256)
+        )
+        self._active: Dict[int, _Sequence] = {}
+        self._runner: Optional[asyncio.Task] = None
+
+        # Metrics
+        self._steps = 0
+        self._occupancy_sum = 0
+        self._tokens_generated = 0
+        self._decode_time = 0.0
+        self._completed = 0
+
+    async def generate(self, input_data: LLMInput) -> LLMOutput:
+        """Generate a full completion through the shared batch"""
+        sequence = await self._submit(input_data)
+        try:
+            while await sequence.tokens.get() is not None:
+                pass
+        except asyncio.CancelledError:
+            sequence.cancelled = True
+            raise
+        if sequence.finish_reason == "error":
+            raise RuntimeError("Batched generation failed")
+        return LLMOutput(
+            text="".join(sequence.chunks).strip(),
+            token_usage=sequence.usage,
+            finish_reason=sequence.finish_reason,
+        )
+
+    async def stream(self, input_data: LLMInput) -> AsyncIterable[LLMOutput]:
+        """Stream tokens for one request as the batch produces them"""
+        sequence = await self._submit(input_data)
+        try:
+            while True:
+                step = await sequence.tokens.get()
+                if step is None:
+                    break
+                if step.text:
+                    yield LLMOutput(text=step.text)
+            if sequence.finish_reason == "error":
+                raise RuntimeError("Batched generation failed")
+            yield LLMOutput(
+                text="".join(sequence.chunks).strip(),
+                token_usage=sequence.usage,
+                finish_reason=sequence.finish_reason,
+            )
+        finally:
+            # Consumer stopped early (disconnect, cancellation): drop the slot.
+            if sequence.finish_reason is None:
+                sequence.cancelled = True
+
+    def count_tokens(self, text: str) -> int:
+        if self._count_tokens is not None:
+            return self._count_tokens(text)
+        return super().count_tokens(text)
+
+    def context_window(self) -> Optional[int]:
+        return self.config.get("context_window")
+
+    def max_output_tokens(self) -> int:
+        return self.default_params.get("max_tokens", 512)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return queue depth and batch occupancy statistics"""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "active_sequences": len(self._active),
+            "max_batch_size": self.max_batch_size,
+            "batch_occupancy": len(self._active) / self.max_batch_size,
+            "mean_batch_occupancy": (
+                self._occupancy_sum / (self._steps * self.max_batch_size)
+                if self._steps
+                else 0.0
+            ),
+            "decode_steps": self._steps,
+            "tokens_generated": self._tokens_generated,
+            "tokens_per_second": (
+                self._tokens_generated / self._decode_time if self._decode_time else 0.0
+            ),
+            "completed_requests": self._completed,
+        }
+
+    async def _submit(self, input_data: LLMInput) -> _Sequence:
+        params = {**self.default_params, **(input_data.parameters or {})}
+        params.setdefault("max_tokens", 512)
+        sequence = _Sequence(
+            prompt=self._format_prompt(input_data.prompt, input_data.system_prompt),
+            params=params,
+            tokens=asyncio.Queue(),
+        )
+        await self._queue.put(sequence)
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+        return sequence
+
+    async def _run(self) -> None:
+        """Scheduling loop: admit, decode one step, retire; exit when idle"""
+        try:
+            while True:
+                await self._admit()
+                if not self._active:
+                    if self._queue.empty():
+                        return
+                    continue
+
+                slots = list(self._active)
+                started = time.perf_counter()
+                try:
+                    results = await self.executor.submit(
+                        self.decoder.decode_step, slots
+                    )
+                except Exception as e:
+                    logger.error(f"Batched decode step failed: {e}")
+                    for slot in slots:
+                        await self._retire(slot, finish_reason="error")
+                    continue
+                self._decode_time += time.perf_counter() - started
+                self._steps += 1
+                self._occupancy_sum += len(slots)
+
+                for slot, step in results.items():
+                    await self._deliver(slot, step)
+        except asyncio.CancelledError:
+            for slot in list(self._active):
+                self._active[slot].cancelled = True
+                await self._retire(slot, finish_reason="cancelled")
+            raise
+
+    async def _admit(self) -> None:
+        """Move queued sequences into free slots, prefilling each one"""
+        # Sequences cancelled while queued never get a slot.
+        for slot, sequence in list(self._active.items()):
+            if sequence.cancelled:
+                await self._retire(slot, finish_reason="cancelled")
+
+        free_slots = [s for s in range(self.max_batch_size) if s not in self._active]
+        while free_slots and not self._queue.empty():
+            sequence = self._queue.get_nowait()
+            if sequence.cancelled:
+                continue
+            slot = free_slots.pop(0)
+            sequence.slot = slot
+            self._active[slot] = sequence
+            try:
+                step = await self.executor.submit(
+                    self.decoder.start_sequence, slot, sequence.prompt, sequence.params
+                )
+            except Exception as e:
+                logger.error(f"Prefill failed for slot {slot}: {e}")
+                await self._retire(slot, finish_reason="error")
+                free_slots.append(slot)
+                continue
+            await self._deliver(slot, step)
+
+    async def _deliver(self, slot: int, step: StepResult) -> None:
+        sequence = self._active.get(slot)
+        if sequence is None:
+            return
+        if step.text:
+            sequence.chunks.append(step.text)
+            self._tokens_generated += 1
+            sequence.tokens.put_nowait(step)
+        if step.finish_reason or sequence.cancelled:
+            await self._retire(slot, finish_reason=step.finish_reason or "cancelled")
+
+    async def _retire(self, slot: int, finish_reason: str) -> None:
+        sequence = self._active.pop(slot, None)
+        if sequence is None:
+            return
+        try:
+            sequence.usage = await self.executor.submit(
+                self.decoder.release_sequence, slot
+            )
+        except Exception as e:
+            logger.error(f"Failed to release batch slot {slot}: {e}")
+        sequence.finish_reason = finish_reason
+        self._completed += 1
+        sequence.tokens.put_nowait(None)
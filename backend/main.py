@@ -12,13 +12,16 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import core modules
-from .agents import ResearchAgent, registry
+from .agents import registry
 
 # Import API router
 from .api import api_router
 from .api.agents import router as agents_router
+from .api.flows import router as flows_router
+from .api.tasks import router as tasks_router
 from .llm import LlamaCPPLLM
 from .memory import ChromaDBMemory
+from .orchestration import FlowCheckpointLog, TaskResultCache, orchestrator
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,74 +33,71 @@ async def lifespan(app: FastAPI):
     # Startup: Initialize LLM, Memory, and register Agents
     logger.info("Starting up application...")
 
-    # ### TEMPORARILY COMMENTED OUT FOR DEBUGGING ###
-    # # Initialize LLM
-    # llm_instance = None
-    # model_path = os.environ.get("MODEL_PATH")
-    # if model_path and os.path.isfile(model_path):
-    #     llm_config = {
-    #         "model_path": model_path,
-    #         "model_params": {"n_ctx": 4096, "n_gpu_layers": -1}, # Use GPU if available
-    #         "generate_params": {"temperature": 0.7, "top_p": 0.9},
-    #     }
-    #     try:
-    #         llm_instance = LlamaCPPLLM(config=llm_config)
-    #         logger.info(f"LLM initialized using model: {model_path}")
-    #     except Exception as e:
-    #         logger.error(
-    #             f"LLM initialization failed with model {model_path}: {e}. Agent functionality will be limited."
-    #         )
-    # elif model_path: # Path provided but not found
-    #     logger.warning(
-    #         f"MODEL_PATH environment variable set to '{model_path}', but file not found. LLM not initialized."
-    #     )
-    # else: # No path provided
-    #     logger.warning(
-    #         "MODEL_PATH environment variable not set. LLM not initialized."
-    #     )
-    #
-    # # Initialize Memory
-    # memory_instance = None
-    # memory_config = {
-    #     "persist_directory": ".chroma_db",
-    #     "collection_name": "research_agent_memory",
-    #     "embedding_model_name": "all-MiniLM-L6-v2", # Example embedding
-    # }
-    # try:
-    #     memory_instance = ChromaDBMemory(config=memory_config)
-    #     logger.info("Memory initialized.")
-    # except Exception as e:
-    #     logger.error(
-    #         f"Memory initialization failed: {e}. Agent functionality will be limited."
-    #     )
-    #     # memory_instance = None # Already None
-    #
-    # # Register ResearchAgent with LLM and Memory
-    # if llm_instance and memory_instance:
-    #     try:
-    #         research_agent = ResearchAgent(llm=llm_instance, memory=memory_instance)
-    #         # Note: We are not using the registry.create_agent method here directly,
-    #         # as we are manually instantiating with LLM/Memory.
-    #         # If using the registry's create_agent, it would need modification
-    #         # to handle dependency injection of LLM/Memory.
-    #         registry._agent_instances[research_agent.id] = (
-    #             research_agent  # Manual registration
-    #         )
-    #         logger.info(
-    #             f"Registered agent: {research_agent.name} with ID {research_agent.id}"
-    #         )
-    #     except Exception as e:
-    #         logger.error(f"Failed to register ResearchAgent: {e}")
-    # else:
-    #     logger.warning(
-    #         "LLM or Memory not available. Skipping ResearchAgent registration."
-    #     )
-    ### END TEMPORARY COMMENT ###
+    # Shared LLM and memory are registered as factories and built on the first
+    # agent request, so startup stays fast and only one model copy is loaded
+    # however many agent instances the pool creates.
+    model_path = os.environ.get("MODEL_PATH")
+    if model_path and os.path.isfile(model_path):
+        llm_config = {
+            "model_path": model_path,
+            "model_params": {"n_ctx": 4096, "n_gpu_layers": -1},  # Use GPU if available
+            "generate_params": {"temperature": 0.7, "top_p": 0.9},
+        }
+        memory_config = {
+            "persist_directory": ".chroma_db",
+            "collection_name": "research_agent_memory",
+            "embedding_model_name": "all-MiniLM-L6-v2",  # Example embedding
+        }
+        registry.register_dependency("llm", lambda: LlamaCPPLLM(config=llm_config))
+        registry.register_dependency(
+            "memory", lambda: ChromaDBMemory(config=memory_config)
+        )
+        agent_id = registry.register_pool(
+            "research",
+            name="Research Agent",
+            size=int(os.environ.get("RESEARCH_AGENT_POOL_SIZE", "2")),
+            max_concurrency=int(os.environ.get("RESEARCH_AGENT_MAX_CONCURRENCY", "8")),
+        )
+        logger.info(f"Registered lazy agent pool {agent_id} (model: {model_path})")
+    elif model_path:  # Path provided but not found
+        logger.warning(
+            f"MODEL_PATH environment variable set to '{model_path}', but file not found. LLM not initialized."
+        )
+    else:  # No path provided
+        logger.warning("MODEL_PATH environment variable not set. LLM not initialized.")
+
+    # Task results are memoized on disk so a retried flow reuses the outputs
+    # of tasks that already succeeded
+    result_cache_path = os.environ.get("TASK_RESULT_CACHE_PATH")
+    if result_cache_path:
+        orchestrator.result_cache = TaskResultCache(
+            ttl=float(os.environ.get("TASK_RESULT_CACHE_TTL", "3600")),
+            path=result_cache_path,
+        )
+
+    # Flows are checkpointed so work finished before a restart is not redone;
+    # flows that were still running when the process stopped are resumed
+    checkpoint_path = os.environ.get("FLOW_CHECKPOINT_PATH", ".flow_checkpoints.jsonl")
+    if checkpoint_path:
+        orchestrator.checkpoint = FlowCheckpointLog(checkpoint_path)
+        if os.environ.get("FLOW_RESUME_ON_STARTUP", "1") == "1":
+            resumed = orchestrator.resume_interrupted_flows()
+            if resumed:
+                logger.info(f"Resumed {len(resumed)} interrupted flows: {resumed}")
 
     yield
-    # Shutdown: Cleanup resources (if needed)
+    # Shutdown: stop flows first (checkpointed as interrupted, so they resume
+    # on the next startup), then flush agent background work and close
+    # shared dependencies
     logger.info("Shutting down application...")
-    # Add any cleanup logic here, e.g., closing connections
+    interrupted = await orchestrator.shutdown()
+    if interrupted:
+        logger.info(f"Interrupted {len(interrupted)} running flows: {interrupted}")
+    await registry.close()
+    if orchestrator.checkpoint:
+        orchestrator.checkpoint.close()
+    if orchestrator.result_cache:
+        orchestrator.result_cache.close()
 
 
 # Create FastAPI app with lifespan manager
@@ -120,6 +120,8 @@ app.add_middleware(
 # Include API routes
 app.include_router(api_router, prefix="/api")
 app.include_router(agents_router, prefix="/api/v1", tags=["agents"])
+app.include_router(tasks_router, prefix="/api/v1", tags=["tasks"])
+app.include_router(flows_router, prefix="/api/v1", tags=["flows"])
 
 
 # Root endpoint
@@ -3,7 +3,35 @@ filepath: backend/memory/__init__.py
 Memory module initialization.
 """
 
-from .base import BaseMemory, MemoryRecord
+from .base import SEARCH_MODES, BaseMemory, MemoryRecord
+from .bm25 import BM25Index, reciprocal_rank_fusion
 from .chroma_memory import ChromaDBMemory
+from .embedding_cache import EmbeddingCache
+from .io_executor import LatencyHistogram, MemoryIOExecutor, MemoryIOQueueFullError
+from .numpy_memory import NumpyMemory
+from .quantization import (
+    BaseQuantizer,
+    Int8Quantizer,
+    ProductQuantizer,
+    create_quantizer,
+)
+from .segment_memory import SegmentMemory
 
-__all__ = ["BaseMemory", "MemoryRecord", "ChromaDBMemory"]
+__all__ = [
+    "BaseMemory",
+    "MemoryRecord",
+    "SEARCH_MODES",
+    "BM25Index",
+    "reciprocal_rank_fusion",
+    "ChromaDBMemory",
+    "NumpyMemory",
+    "BaseQuantizer",
+    "Int8Quantizer",
+    "ProductQuantizer",
+    "create_quantizer",
+    "SegmentMemory",
+    "EmbeddingCache",
+    "LatencyHistogram",
+    "MemoryIOExecutor",
+    "MemoryIOQueueFullError",
+]
@@ -3,12 +3,33 @@ filepath: backend/memory/base.py
 Base class for agent memory systems.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
 
 from pydantic import BaseModel, Field
 
+# "vector": dense-embedding similarity, "keyword": lexical (BM25) only,
+# "hybrid": both rankings fused. Backends that only support vector search
+# raise ValueError for the other modes.
+SEARCH_MODES = ("vector", "keyword", "hybrid")
+
+# Comparison operators of Chroma-style ``where`` filters. A field that is
+# missing from a record matches no condition.
+FILTER_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda field, operand: field == operand,
+    "$ne": lambda field, operand: field != operand,
+    "$gt": lambda field, operand: field > operand,
+    "$gte": lambda field, operand: field >= operand,
+    "$lt": lambda field, operand: field < operand,
+    "$lte": lambda field, operand: field <= operand,
+    "$in": lambda field, operand: field in operand,
+    "$nin": lambda field, operand: field not in operand,
+}
+
+T = TypeVar("T")
+
 
 class MemoryRecord(BaseModel):
     """Represents a single record in the memory"""
@@ -29,6 +50,15 @@ class BaseMemory(ABC):
         # TODO: Implement add logic
         raise NotImplementedError
 
+    async def add_many(self, records: List[MemoryRecord]) -> None:
+        """Add several records to memory.
+
+        Backends that can write in bulk should override this; the default
+        falls back to one add() per record.
+        """
+        for record in records:
+            await self.add(record)
+
     @abstractmethod
     async def get(self, record_id: str) -> Optional[MemoryRecord]:
         """Retrieve a record by ID"""
@@ -37,12 +67,37 @@ class BaseMemory(ABC):
 
     @abstractmethod
     async def search(
-        self, query: str, top_k: int = 5, filter: Optional[Dict[str, Any]] = None
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
     ) -> List[MemoryRecord]:
         """Search memory for relevant records"""
         # TODO: Implement search logic (e.g., using ChromaDB embeddings)
         raise NotImplementedError
 
+    async def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
+    ) -> List[List[MemoryRecord]]:
+        """Search memory for several queries, returning results per query.
+
+        Backends that can query in bulk should override this; the default
+        runs one search() per query concurrently.
+        """
+        return list(
+            await asyncio.gather(
+                *(
+                    self.search(query, top_k=top_k, filter=filter, mode=mode)
+                    for query in queries
+                )
+            )
+        )
+
     @abstractmethod
     async def delete(self, record_id: str) -> bool:
         """Delete a record by ID"""
@@ -55,6 +110,110 @@ class BaseMemory(ABC):
         # TODO: Implement clear logic
         raise NotImplementedError
 
+    def background_errors(self) -> List[Dict[str, Any]]:
+        """Recent failures of writes the backend finished in the background.
+
+        Backends with write-behind buffering override this so the errors
+        reach the agent's ``background_status``.
+        """
+        return []
+
+    async def close(self) -> None:
+        """Flush buffered writes and release resources"""
+        return None
+
+
+def check_search_mode(mode: str, supported=("vector",)) -> None:
+    """Raise ValueError if ``mode`` is unknown or unsupported by a backend"""
+    if mode not in SEARCH_MODES:
+        raise ValueError(
+            f"Unknown search mode '{mode}', expected one of {SEARCH_MODES}"
+        )
+    if mode not in supported:
+        raise ValueError(f"Search mode '{mode}' is not supported by this backend")
+
+
+def evaluate_filter(
+    filter: Optional[Dict[str, Any]],
+    condition: Callable[[str, str, Any], T],
+    all_of: Callable[[List[T]], T],
+    any_of: Callable[[List[T]], T],
+) -> T:
+    """Fold a Chroma-style filter into one result.
+
+    ``filter`` maps keys to a value (shorthand for ``$eq``) or to a single
+    ``{"$op": operand}``, and nests clause lists under ``$and`` / ``$or``.
+    ``condition(key, op, operand)`` evaluates one comparison; ``all_of`` and
+    ``any_of`` combine clause results, so the same walk yields a bool for a
+    single record or a mask over a column. Raises ValueError on unknown
+    operators.
+    """
+    results = []
+    for key, value in (filter or {}).items():
+        if key in ("$and", "$or"):
+            clauses = [
+                evaluate_filter(clause, condition, all_of, any_of) for clause in value
+            ]
+            results.append(all_of(clauses) if key == "$and" else any_of(clauses))
+        elif key.startswith("$"):
+            raise ValueError(f"Unsupported filter operator: {key}")
+        else:
+            op, operand = filter_condition(key, value)
+            results.append(condition(key, op, operand))
+    return all_of(results)
+
+
+def check_filter(filter: Optional[Dict[str, Any]]) -> None:
+    """Raise ValueError if ``filter`` uses an unsupported operator"""
+    evaluate_filter(filter, lambda key, op, operand: True, all, any)
+
+
+def filter_condition(key: str, value: Any) -> Tuple[str, Any]:
+    """``(op, operand)`` of one field's filter value"""
+    if not isinstance(value, dict):
+        return "$eq", value
+    if len(value) != 1 or next(iter(value)) not in FILTER_OPERATORS:
+        raise ValueError(f"Unsupported filter operator for {key}: {value}")
+    return next(iter(value.items()))
+
+
+def compare(field: Any, op: str, operand: Any) -> bool:
+    """Apply one filter operator; missing fields and mismatched types never match"""
+    if field is None:
+        return False
+    try:
+        return bool(FILTER_OPERATORS[op](field, operand))
+    except TypeError:
+        return False
+
+
+def matches_filter(fields: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """Whether a record's fields satisfy a Chroma-style filter"""
+    return evaluate_filter(
+        filter,
+        lambda key, op, operand: compare(fields.get(key), op, operand),
+        all,
+        any,
+    )
+
+
+def required_equalities(filter: Optional[Dict[str, Any]]) -> List[Tuple[str, Any]]:
+    """``(key, value)`` equalities every match must satisfy (outside ``$or``).
+
+    Backends use these to narrow candidates with an index before evaluating
+    the full filter.
+    """
+    equalities = []
+    for key, value in (filter or {}).items():
+        if key == "$and":
+            for clause in value:
+                equalities.extend(required_equalities(clause))
+        elif not key.startswith("$"):
+            op, operand = filter_condition(key, value)
+            if op == "$eq":
+                equalities.append((key, operand))
+    return equalities
+
 
 # TODO: Implement ChromaDBMemory subclass
 # class ChromaDBMemory(BaseMemory):
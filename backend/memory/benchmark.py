@@ -0,0 +1,140 @@
+"""
+filepath: backend/memory/benchmark.py
+Recall/latency/footprint benchmark for quantized embedding search.
+
+Run from ``backend/``: ``python -m memory.benchmark --rows 100000 --dim 384``
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .embedder import normalize_rows, top_k_indices
+from .numpy_memory import resident_nbytes
+from .quantization import create_quantizer, quantized_top_k, recall_at_k
+
+DEFAULT_CONFIGS: List[Dict[str, Any]] = [
+    {"type": "int8", "rerank_factor": 1},
+    {"type": "int8", "rerank_factor": 4},
+    {"type": "pq", "rerank_factor": 1},
+    {"type": "pq", "rerank_factor": 4},
+    {"type": "pq", "rerank_factor": 16},
+    {"type": "pq", "rerank_factor": 16, "keep_full_precision": False},
+]
+
+
+def synthetic_embeddings(
+    rows: int, dim: int, clusters: int = 256, seed: int = 0
+) -> np.ndarray:
+    """Clustered, normalized vectors that resemble sentence embeddings"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=rows)
+    noise = rng.standard_normal((rows, dim)).astype(np.float32) * 0.6
+    return normalize_rows(centers[labels] + noise)
+
+
+def run_benchmark(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    top_k: int = 10,
+    configs: Optional[List[Dict[str, Any]]] = None,
+    train_size: int = 20000,
+) -> List[Dict[str, Any]]:
+    """Compare exact float32 search against each quantization config"""
+    candidates = np.arange(len(vectors))
+    started = time.perf_counter()
+    scores = queries @ vectors.T
+    exact = [top_k_indices(row, top_k) for row in scores]
+    exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+    results = [
+        {
+            "config": {"type": "float32"},
+            "bytes_per_vector": resident_nbytes(vectors) / len(vectors),
+            "mapped_bytes_per_vector": 0,
+            "compression": 1.0,
+            f"recall@{top_k}": 1.0,
+            "latency_ms": exact_ms,
+        }
+    ]
+
+    # Re-rank from a memory-mapped float32 copy, as NumpyMemory does
+    scratch = tempfile.TemporaryDirectory()
+    mapped = np.lib.format.open_memmap(
+        os.path.join(scratch.name, "vectors.npy"),
+        mode="w+",
+        dtype=np.float32,
+        shape=vectors.shape,
+    )
+    mapped[:] = vectors
+    mapped.flush()
+
+    trained: Dict[str, Any] = {}
+    for config in configs or DEFAULT_CONFIGS:
+        kind = config["type"]
+        if kind not in trained:
+            quantizer = create_quantizer(config)
+            quantizer.train(vectors[:train_size])
+            trained[kind] = (quantizer, quantizer.encode(vectors))
+        quantizer, codes = trained[kind]
+        keep = config.get("keep_full_precision", True)
+        started = time.perf_counter()
+        approx = quantized_top_k(
+            quantizer,
+            codes,
+            queries,
+            candidates,
+            top_k,
+            mapped if keep else None,
+            config.get("rerank_factor", 4),
+        )
+        latency_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        rerank_arrays = (mapped,) if keep else ()
+        bytes_per_vector = sum(
+            resident_nbytes(a) for a in (codes, *rerank_arrays)
+        ) / len(vectors)
+        results.append(
+            {
+                "config": config,
+                "bytes_per_vector": bytes_per_vector,
+                "mapped_bytes_per_vector": (
+                    sum(a.nbytes for a in rerank_arrays) / len(vectors)
+                ),
+                "compression": vectors.shape[1] * 4 / bytes_per_vector,
+                f"recall@{top_k}": recall_at_k(exact, approx, top_k),
+                "latency_ms": latency_ms,
+            }
+        )
+    del mapped
+    scratch.cleanup()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument(
+        "--embeddings", help="Path to an .npy embedding matrix to use instead"
+    )
+    args = parser.parse_args()
+
+    if args.embeddings:
+        vectors = normalize_rows(np.load(args.embeddings).astype(np.float32))
+    else:
+        vectors = synthetic_embeddings(args.rows + args.queries, args.dim)
+    queries, vectors = vectors[: args.queries], vectors[args.queries :]
+
+    for row in run_benchmark(vectors, queries, top_k=args.top_k):
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
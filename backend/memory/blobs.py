@@ -0,0 +1,81 @@
+"""
+filepath: backend/memory/blobs.py
+Variable-length strings stored as one memory-mapped byte blob plus offsets.
+"""
+
+import os
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+def load_blob(directory: str, name: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Memory-map ``<name>.bin`` and its ``<name>_offsets.npy`` index"""
+    path = os.path.join(directory, f"{name}.bin")
+    # np.memmap refuses zero-length files
+    if os.path.getsize(path) == 0:
+        data = np.empty(0, dtype=np.uint8)
+    else:
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+    offsets = np.load(os.path.join(directory, f"{name}_offsets.npy"), mmap_mode="r")
+    return data, offsets
+
+
+def write_blob(directory: str, name: str, items: Iterable[bytes]) -> None:
+    """Write encoded items as ``<name>.bin`` with a ``<name>_offsets.npy`` index"""
+    lengths = [0]
+    with open(os.path.join(directory, f"{name}.bin"), "wb") as f:
+        for item in items:
+            f.write(item)
+            lengths.append(len(item))
+    np.save(
+        os.path.join(directory, f"{name}_offsets.npy"),
+        np.cumsum(lengths, dtype=np.int64),
+    )
+
+
+class BlobColumn:
+    """Append-only column of strings.
+
+    Rows loaded from disk stay in a memory-mapped blob and are decoded only
+    when read; rows appended since are kept in a list.
+    """
+
+    def __init__(
+        self,
+        data: Optional[np.ndarray] = None,
+        offsets: Optional[np.ndarray] = None,
+    ):
+        self._data = data
+        self._offsets = offsets
+        self._base = 0 if offsets is None else len(offsets) - 1
+        self._tail: List[str] = []
+
+    @classmethod
+    def open(cls, directory: str, name: str) -> "BlobColumn":
+        return cls(*load_blob(directory, name))
+
+    def __len__(self) -> int:
+        return self._base + len(self._tail)
+
+    def __getitem__(self, row: int) -> str:
+        if row >= self._base:
+            return self._tail[row - self._base]
+        return self.raw(row).decode("utf-8")
+
+    def raw(self, row: int) -> bytes:
+        """Encoded bytes of one row"""
+        if row >= self._base:
+            return self._tail[row - self._base].encode("utf-8")
+        return bytes(self._data[self._offsets[row] : self._offsets[row + 1]])
+
+    def append(self, value: str) -> None:
+        self._tail.append(value)
+
+    def values(self) -> List[str]:
+        """Every row, decoded"""
+        return [self[row] for row in range(len(self))]
+
+    def write(self, directory: str, name: str, rows: Iterable[int]) -> None:
+        """Write the given rows as a new blob"""
+        write_blob(directory, name, (self.raw(row) for row in rows))
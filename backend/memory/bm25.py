@@ -0,0 +1,142 @@
+"""
+filepath: backend/memory/bm25.py
+Incrementally maintained BM25 inverted index and rank fusion helpers.
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .base import matches_filter
+
+# Compound tokens keep URLs, file names and error codes (E1234, api.v2/users)
+# intact; their alphanumeric parts are indexed as well.
+_COMPOUND_RE = re.compile(r"[0-9A-Za-z_]+(?:[\-\.:/@#][0-9A-Za-z_]+)*")
+_PART_RE = re.compile(r"[0-9A-Za-z_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens plus intact compound tokens"""
+    tokens = []
+    for match in _COMPOUND_RE.findall(text.lower()):
+        tokens.append(match)
+        parts = _PART_RE.findall(match)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[List[str]], k: int = 60
+) -> List[Tuple[str, float]]:
+    """Fuse ranked ID lists; each list contributes 1 / (k + rank)"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """Okapi BM25 over an in-memory inverted index.
+
+    Documents can be added, replaced and removed one at a time; term
+    statistics are kept up to date so no rebuild is ever needed. Scalar
+    metadata fields are stored per document for filtering.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_fields: Dict[str, Dict[str, Any]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def add(
+        self, doc_id: str, text: str, fields: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Index a document, replacing any previous version with the same ID"""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove(doc_id)
+            self._doc_terms[doc_id] = terms
+            self._doc_fields[doc_id] = {
+                k: v
+                for k, v in (fields or {}).items()
+                if isinstance(v, (str, int, float, bool))
+            }
+            self._doc_lengths[doc_id] = sum(terms.values())
+            self._total_length += self._doc_lengths[doc_id]
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_id: str) -> bool:
+        """Drop a document from the index"""
+        with self._lock:
+            return self._remove(doc_id)
+
+    def remove_where(self, filter: Dict[str, Any]) -> int:
+        """Drop every document whose fields match ``filter``"""
+        with self._lock:
+            doomed = [
+                doc_id
+                for doc_id, fields in self._doc_fields.items()
+                if matches_filter(fields, filter)
+            ]
+            for doc_id in doomed:
+                self._remove(doc_id)
+            return len(doomed)
+
+    def search(
+        self, query: str, top_k: int = 5, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, float]]:
+        """Return ``(doc_id, score)`` pairs for the best matching documents"""
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self._doc_terms)
+            if not n_docs or not terms:
+                return []
+            avg_length = self._total_length / n_docs
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(
+                    1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+                for doc_id, tf in postings.items():
+                    length = self._doc_lengths[doc_id]
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[doc_id] = (
+                        scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+                    )
+            if filter:
+                scores = {
+                    doc_id: score
+                    for doc_id, score in scores.items()
+                    if matches_filter(self._doc_fields[doc_id], filter)
+                }
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    def _remove(self, doc_id: str) -> bool:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return False
+        self._doc_fields.pop(doc_id, None)
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        return True
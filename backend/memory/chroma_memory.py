@@ -3,15 +3,17 @@ filepath: backend/memory/chroma_memory.py
 Implementation of the BaseMemory interface using ChromaDB.
 """
 
+import asyncio
 import logging
 import uuid
-from typing import Any, Dict, List, Optional
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
-import chromadb
-from chromadb.config import Settings
-from chromadb.utils import embedding_functions
-
-from .base import BaseMemory, MemoryRecord
+from .base import BaseMemory, MemoryRecord, check_search_mode
+from .bm25 import BM25Index, reciprocal_rank_fusion
+from .embedding_cache import EmbeddingCache
+from .io_executor import MemoryIOExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +29,51 @@ class ChromaDBMemory(BaseMemory):
             "embedding_model_name", "all-MiniLM-L6-v2"
         )
 
+        # Write-behind buffer: add() queues records and they are embedded and
+        # written together once write_batch_size is reached or after
+        # write_flush_interval seconds. A failed batch is retried up to
+        # write_max_retries times before it is dropped.
+        self.write_batch_size = config.get("write_batch_size", 256)
+        self.write_flush_interval = config.get("write_flush_interval", 0.5)
+        self.write_max_retries = config.get("write_max_retries", 3)
+        self._write_buffer: List[Tuple[str, str, Dict[str, Any]]] = []
+        self._write_attempts = 0  # Failed writes of the batch at the buffer head
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        # Failures of background flushes, reported through background_errors()
+        self._background_errors: Deque[Dict[str, Any]] = deque(
+            maxlen=config.get("max_background_errors", 100)
+        )
+
+        # All blocking Chroma and embedding calls run on this pool
+        io_params = config.get("io_params", {})
+        self.io = MemoryIOExecutor(
+            max_workers=io_params.get("max_workers", 4),
+            max_pending=io_params.get("max_pending", 64),
+            submit_timeout=io_params.get("submit_timeout"),
+        )
+
+        # Query embeddings are cached so repeated searches skip the model
+        self.query_cache = EmbeddingCache(
+            max_entries=config.get("query_cache_size", 4096),
+            spill_path=config.get("query_cache_path"),
+            namespace=self.embedding_model_name,
+        )
+
+        # BM25 index beside the vector store for keyword and hybrid search.
+        # "lazy" builds it from the collection on first use, "eager" at
+        # startup; False disables keyword search.
+        self.keyword_index_mode = config.get("keyword_index", "lazy")
+        self.keyword_index = BM25Index()
+        self._keyword_index_active = False
+        self._keyword_index_lock = asyncio.Lock()
+
         try:
+            # Imported lazily so other memory backends work without chromadb
+            import chromadb
+            from chromadb.config import Settings
+            from chromadb.utils import embedding_functions
+
             self.client = chromadb.PersistentClient(
                 path=self.persist_directory,
                 settings=Settings(anonymized_telemetry=False),  # Disable telemetry
@@ -53,46 +99,155 @@ class ChromaDBMemory(BaseMemory):
             logger.error(f"Failed to initialize ChromaDB client: {e}")
             raise
 
+        if self.keyword_index_mode == "eager":
+            self._load_keyword_index()
+
     async def add(self, record: MemoryRecord) -> None:
-        """Add a record to the ChromaDB collection"""
+        """Queue a record for the next batched write to ChromaDB"""
+        self._write_buffer.append(self._prepare_record(record))
+        if len(self._write_buffer) >= self.write_batch_size:
+            await self.flush()
+        else:
+            self._schedule_flush()
+
+    async def add_many(self, records: List[MemoryRecord]) -> None:
+        """Add records in bulk with one batched embedding call per flush"""
+        self._write_buffer.extend(self._prepare_record(r) for r in records)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Embed and write all buffered records.
+
+        A batch that fails to write goes back to the head of the buffer and is
+        retried in the background, and dropped after ``write_max_retries``
+        failed retries. Either way the error is raised to the caller.
+        """
+        async with self._flush_lock:
+            while self._write_buffer:
+                pending = self._write_buffer[: self.write_batch_size]
+                del self._write_buffer[: self.write_batch_size]
+                try:
+                    await self.io.run("add", self._write_batch, pending)
+                except Exception as e:
+                    self._write_attempts += 1
+                    if self._write_attempts > self.write_max_retries:
+                        logger.error(
+                            f"Dropping {len(pending)} records after "
+                            f"{self._write_attempts} failed writes to ChromaDB: {e}"
+                        )
+                        self._write_attempts = 0
+                    else:
+                        self._write_buffer[:0] = pending
+                        self._schedule_flush()
+                    raise
+                self._write_attempts = 0
+
+    async def close(self) -> None:
+        """Flush buffered writes"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
         try:
-            record_id = record.id or str(uuid.uuid4())
-            metadata = record.metadata or {}
-            metadata["timestamp"] = record.timestamp.isoformat()
-            if record.agent_id:
-                metadata["agent_id"] = record.agent_id
-
-            self.collection.add(
-                ids=[record_id], documents=[record.content], metadatas=[metadata]
+            await self.flush()
+        finally:
+            self.query_cache.close()
+            self.io.shutdown(wait=False)
+
+    def background_errors(self) -> List[Dict[str, Any]]:
+        """Recent failures of background flushes"""
+        return list(self._background_errors)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return query-embedding cache hit statistics"""
+        return self.query_cache.stats()
+
+    def io_stats(self) -> Dict[str, Any]:
+        """Return I/O pool occupancy and per-operation latency histograms"""
+        return self.io.stats()
+
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed queries, running the model only for cache misses"""
+        embeddings = self.query_cache.get_many(queries)
+        missing = [i for i, e in enumerate(embeddings) if e is None]
+        if missing:
+            computed = self.embedding_function([queries[i] for i in missing])
+            for i, embedding in zip(missing, computed):
+                embedding = [float(x) for x in embedding]
+                self.query_cache.put(queries[i], embedding)
+                embeddings[i] = embedding
+        return embeddings
+
+    def _prepare_record(self, record: MemoryRecord) -> Tuple[str, str, Dict[str, Any]]:
+        record_id = record.id or str(uuid.uuid4())
+        metadata = dict(record.metadata or {})
+        metadata["timestamp"] = record.timestamp.isoformat()
+        if record.agent_id:
+            metadata["agent_id"] = record.agent_id
+        return record_id, record.content, metadata
+
+    def _write_batch(self, batch: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+        ids = [record_id for record_id, _, _ in batch]
+        documents = [doc for _, doc, _ in batch]
+        metadatas = [meta for _, _, meta in batch]
+        # One batched model call for the whole flush
+        embeddings = self.embedding_function(documents)
+        max_batch = getattr(self.client, "max_batch_size", 0) or len(ids)
+        # Upsert replaces records by ID like the other backends, and retrying
+        # a partly written batch rewrites its first chunks instead of
+        # skipping them
+        for start in range(0, len(ids), max_batch):
+            end = start + max_batch
+            self.collection.upsert(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
             )
-            logger.debug(f"Added record {record_id} to ChromaDB")
+        if self._keyword_index_active:
+            for record_id, doc, meta in batch:
+                self.keyword_index.add(record_id, doc, meta)
+        logger.debug(f"Upserted {len(ids)} records to ChromaDB")
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.write_flush_interval)
+        # Keep retrying while failed batches are requeued
+        while self._write_buffer:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Background write to ChromaDB failed: {e}")
+                self._background_errors.append(
+                    {
+                        "stage": "memory write",
+                        "error": str(e),
+                        "timestamp": datetime.utcnow().isoformat(),
+                    }
+                )
+                await asyncio.sleep(self.write_flush_interval)
+
+    async def _flush_before_read(self) -> None:
+        """Write buffered records so reads see them; failed ones stay queued"""
+        try:
+            await self.flush()
         except Exception as e:
-            logger.error(f"Error adding record to ChromaDB: {e}")
-            # Optionally re-raise or handle
+            logger.warning(f"Reading while buffered writes are pending: {e}")
 
     async def get(self, record_id: str) -> Optional[MemoryRecord]:
         """Retrieve a record by ID from ChromaDB"""
+        await self._flush_before_read()
         try:
-            result = self.collection.get(
-                ids=[record_id], include=["metadatas", "documents"]
+            result = await self.io.run(
+                "get",
+                self.collection.get,
+                ids=[record_id],
+                include=["metadatas", "documents"],
             )
             if result and result["ids"]:
-                retrieved_id = result["ids"][0]
-                doc = result["documents"][0]
-                meta = result["metadatas"][0]
-
-                # Convert timestamp back
-                timestamp = datetime.fromisoformat(
-                    meta.pop("timestamp", datetime.utcnow().isoformat())
-                )
-                agent_id = meta.pop("agent_id", None)
-
-                return MemoryRecord(
-                    id=retrieved_id,
-                    content=doc,
-                    metadata=meta,
-                    timestamp=timestamp,
-                    agent_id=agent_id,
+                return self._to_record(
+                    result["ids"][0], result["documents"][0], result["metadatas"][0]
                 )
             return None
         except Exception as e:
@@ -100,47 +255,163 @@ class ChromaDBMemory(BaseMemory):
             return None
 
     async def search(
-        self, query: str, top_k: int = 5, filter: Optional[Dict[str, Any]] = None
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
     ) -> List[MemoryRecord]:
-        """Search ChromaDB for relevant records using embeddings"""
+        """Search ChromaDB by embeddings, BM25 keywords, or both fused"""
+        results = await self.search_many([query], top_k=top_k, filter=filter, mode=mode)
+        return results[0] if results else []
+
+    async def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
+    ) -> List[List[MemoryRecord]]:
+        """Search for several queries with one embedding batch and one query.
+
+        ``mode="keyword"`` answers from the BM25 index without running the
+        embedding model; ``mode="hybrid"`` fuses both rankings with
+        reciprocal rank fusion.
+        """
+        check_search_mode(
+            mode,
+            supported=(
+                ("vector", "keyword", "hybrid")
+                if self.keyword_index_mode
+                else ("vector",)
+            ),
+        )
+        if not queries:
+            return []
+        await self._flush_before_read()
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=top_k,
-                where=filter,  # Pass the filter directly to ChromaDB
-                include=["metadatas", "documents"],
+            if mode == "vector":
+                return await self._vector_search(queries, top_k, filter)
+
+            await self._ensure_keyword_index()
+            # Hybrid over-fetches both lists so fusion has candidates to reorder
+            fetch = top_k * 2 if mode == "hybrid" else top_k
+            keyword_hits = await self.io.run(
+                "keyword",
+                lambda: [
+                    self.keyword_index.search(q, top_k=fetch, filter=filter)
+                    for q in queries
+                ],
             )
+            keyword_rankings = [[doc_id for doc_id, _ in hits] for hits in keyword_hits]
+            if mode == "keyword":
+                return await self._fetch_ranked(keyword_rankings, {})
 
-            records = []
-            if results and results["ids"][0]:
-                for i in range(len(results["ids"][0])):
-                    record_id = results["ids"][0][i]
-                    doc = results["documents"][0][i]
-                    meta = results["metadatas"][0][i]
-
-                    timestamp = datetime.fromisoformat(
-                        meta.pop("timestamp", datetime.utcnow().isoformat())
-                    )
-                    agent_id = meta.pop("agent_id", None)
+            vector_results = await self._vector_search(queries, fetch, filter)
+            known = {r.id: r for records in vector_results for r in records}
+            fused = [
+                [
+                    doc_id
+                    for doc_id, _ in reciprocal_rank_fusion(
+                        [[r.id for r in records], ranking]
+                    )[:top_k]
+                ]
+                for records, ranking in zip(vector_results, keyword_rankings)
+            ]
+            return await self._fetch_ranked(fused, known)
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Error searching ChromaDB: {e}")
+            return [[] for _ in queries]
+
+    async def _vector_search(
+        self, queries: List[str], top_k: int, filter: Optional[Dict[str, Any]]
+    ) -> List[List[MemoryRecord]]:
+        query_embeddings = await self.io.run("embed", self._embed_queries, queries)
+        results = await self.io.run(
+            "query",
+            self.collection.query,
+            query_embeddings=query_embeddings,
+            n_results=top_k,
+            where=filter,  # Pass the filter directly to ChromaDB
+            include=["metadatas", "documents"],
+        )
 
+        per_query = []
+        for q in range(len(queries)):
+            records = []
+            if results and results["ids"][q]:
+                for i in range(len(results["ids"][q])):
                     records.append(
-                        MemoryRecord(
-                            id=record_id,
-                            content=doc,
-                            metadata=meta,
-                            timestamp=timestamp,
-                            agent_id=agent_id,
+                        self._to_record(
+                            results["ids"][q][i],
+                            results["documents"][q][i],
+                            results["metadatas"][q][i],
                         )
                     )
-            return records
-        except Exception as e:
-            logger.error(f"Error searching ChromaDB: {e}")
-            return []
+            per_query.append(records)
+        return per_query
+
+    async def _fetch_ranked(
+        self, rankings: List[List[str]], known: Dict[str, MemoryRecord]
+    ) -> List[List[MemoryRecord]]:
+        """Resolve ranked IDs to records with a single collection.get"""
+        missing = list({i for ranking in rankings for i in ranking if i not in known})
+        records = dict(known)
+        if missing:
+            result = await self.io.run(
+                "get",
+                self.collection.get,
+                ids=missing,
+                include=["metadatas", "documents"],
+            )
+            for record_id, doc, meta in zip(
+                result["ids"], result["documents"], result["metadatas"]
+            ):
+                records[record_id] = self._to_record(record_id, doc, meta)
+        return [[records[i] for i in ranking if i in records] for ranking in rankings]
+
+    async def _ensure_keyword_index(self) -> None:
+        if self._keyword_index_active:
+            return
+        async with self._keyword_index_lock:
+            if not self._keyword_index_active:
+                await self.io.run("index", self._load_keyword_index)
+
+    def _load_keyword_index(self) -> None:
+        # Writes made while loading are applied too; add() replaces by ID
+        self._keyword_index_active = True
+        result = self.collection.get(include=["documents", "metadatas"])
+        for record_id, doc, meta in zip(
+            result["ids"], result["documents"], result["metadatas"]
+        ):
+            self.keyword_index.add(record_id, doc or "", meta or {})
+        logger.info(f"Built keyword index with {len(self.keyword_index)} documents")
+
+    def _to_record(
+        self, record_id: str, doc: str, meta: Dict[str, Any]
+    ) -> MemoryRecord:
+        """Convert a Chroma row back into a MemoryRecord"""
+        # Convert timestamp back
+        timestamp = datetime.fromisoformat(
+            meta.pop("timestamp", datetime.utcnow().isoformat())
+        )
+        agent_id = meta.pop("agent_id", None)
+        return MemoryRecord(
+            id=record_id,
+            content=doc,
+            metadata=meta,
+            timestamp=timestamp,
+            agent_id=agent_id,
+        )
 
     async def delete(self, record_id: str) -> bool:
         """Delete a record by ID from ChromaDB"""
+        await self._flush_before_read()
         try:
-            self.collection.delete(ids=[record_id])
+            await self.io.run("delete", self.collection.delete, ids=[record_id])
+            self.keyword_index.remove(record_id)
             logger.debug(f"Deleted record {record_id} from ChromaDB")
             return True
         except Exception as e:
@@ -149,10 +420,14 @@ class ChromaDBMemory(BaseMemory):
 
     async def clear(self, agent_id: Optional[str] = None) -> None:
         """Clear memory in ChromaDB, optionally filtered by agent_id"""
+        await self._flush_before_read()
         try:
             if agent_id:
                 # Delete records associated with a specific agent
-                self.collection.delete(where={"agent_id": agent_id})
+                await self.io.run(
+                    "delete", self.collection.delete, where={"agent_id": agent_id}
+                )
+                self.keyword_index.remove_where({"agent_id": agent_id})
                 logger.info(f"Cleared memory for agent {agent_id} in ChromaDB")
             else:
                 # Clear the entire collection - Use with caution!
@@ -0,0 +1,72 @@
+"""
+filepath: backend/memory/embedder.py
+Local sentence-embedding helper shared by the in-process vector backends.
+"""
+
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+
+from .embedding_cache import EmbeddingCache
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so dot products are cosine similarities"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+class Embedder:
+    """Embeds documents and queries into normalized float32 matrices.
+
+    Uses ``embedding_function`` when given, otherwise loads a
+    SentenceTransformer model on first use. Query embeddings go through an
+    EmbeddingCache.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        embedding_function: Optional[Callable[[List[str]], Any]] = None,
+        query_cache_size: int = 4096,
+    ):
+        self.model_name = model_name
+        self._embedding_function = embedding_function
+        self.query_cache = EmbeddingCache(
+            max_entries=query_cache_size, namespace=model_name
+        )
+
+    def embed_documents(self, texts: Sequence[str]) -> np.ndarray:
+        return normalize_rows(np.asarray(self.embed(list(texts)), dtype=np.float32))
+
+    def embed_queries(self, queries: Sequence[str]) -> np.ndarray:
+        cached = self.query_cache.get_many(queries)
+        missing = [i for i, e in enumerate(cached) if e is None]
+        if missing:
+            computed = self.embed([queries[i] for i in missing])
+            for i, embedding in zip(missing, computed):
+                embedding = [float(x) for x in embedding]
+                self.query_cache.put(queries[i], embedding)
+                cached[i] = embedding
+        return normalize_rows(np.asarray(cached, dtype=np.float32))
+
+    def embed(self, texts: List[str]) -> Any:
+        if self._embedding_function is None:
+            # Imported lazily so the backend starts without the model loaded
+            from sentence_transformers import SentenceTransformer
+
+            model = SentenceTransformer(self.model_name)
+            self._embedding_function = lambda batch: model.encode(
+                batch, convert_to_numpy=True
+            )
+        return self._embedding_function(texts)
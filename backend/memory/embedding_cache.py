@@ -0,0 +1,130 @@
+"""
+filepath: backend/memory/embedding_cache.py
+Bounded, content-hash-keyed cache for text embeddings with optional on-disk spill.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """LRU cache from normalized text to embedding vector.
+
+    Keys are SHA-256 digests of the text after whitespace and case
+    normalization, so trivially different spellings of the same query share an
+    entry. Entries evicted from memory are written to an optional SQLite file
+    and promoted back on the next hit.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        spill_path: Optional[str] = None,
+        namespace: str = "",
+    ):
+        self.max_entries = max_entries
+        self.namespace = namespace
+        self._entries: "OrderedDict[str, array]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        if spill_path:
+            self._disk = sqlite3.connect(spill_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+            )
+            self._disk.commit()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        """Content hash used as the cache key"""
+        normalized = " ".join(text.split()).casefold()
+        return hashlib.sha256(
+            f"{self.namespace}\x00{normalized}".encode("utf-8")
+        ).hexdigest()
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Return cached embeddings, with None for every miss"""
+        return [self.get(text) for text in texts]
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """Return the cached embedding for ``text`` or None"""
+        key = self.key(text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector.tolist()
+
+            vector = self._load_from_disk(key)
+            if vector is not None:
+                self.disk_hits += 1
+                self._insert(key, vector)
+                return vector.tolist()
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, embedding: Sequence[float]) -> None:
+        """Store an embedding for ``text``"""
+        with self._lock:
+            self._insert(self.key(text), array("f", embedding))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit counters and the overall hit ratio"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close the on-disk tier"""
+        if self._disk:
+            self._disk.close()
+            self._disk = None
+
+    def _insert(self, key: str, vector: array) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self._spill(evicted_key, evicted)
+
+    def _spill(self, key: str, vector: array) -> None:
+        if not self._disk:
+            return
+        try:
+            self._disk.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                (key, vector.tobytes()),
+            )
+            self._disk.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to spill embedding to disk: {e}")
+
+    def _load_from_disk(self, key: str) -> Optional[array]:
+        if not self._disk:
+            return None
+        row = self._disk.execute(
+            "SELECT vector FROM embeddings WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        vector = array("f")
+        vector.frombytes(row[0])
+        return vector
@@ -0,0 +1,140 @@
+"""
+filepath: backend/memory/io_executor.py
+Thread pool for blocking memory-store and embedding calls, with per-operation
+latency histograms.
+"""
+
+import asyncio
+import bisect
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upper bucket bounds in milliseconds; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = [0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class MemoryIOQueueFullError(RuntimeError):
+    """Raised when the memory I/O queue stays full past the submit timeout"""
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate percentiles"""
+
+    def __init__(self, buckets_ms: List[float] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, latency_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets_ms, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets_ms[i] if i < len(self.buckets_ms) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+            "buckets_ms": self.buckets_ms,
+            "counts": list(self.counts),
+        }
+
+
+class MemoryIOExecutor:
+    """Runs blocking memory operations on a dedicated thread pool.
+
+    At most ``max_pending`` operations may be queued or running; callers beyond
+    that wait for a slot, up to ``submit_timeout`` seconds.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        submit_timeout: Optional[float] = None,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.submit_timeout = submit_timeout
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="memory-io"
+        )
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    async def run(
+        self, operation: str, fn: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        """Run ``fn`` on the pool and record its latency under ``operation``"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.submit_timeout)
+        except asyncio.TimeoutError:
+            raise MemoryIOQueueFullError(
+                f"Memory I/O queue full ({self.max_pending} pending operations)"
+            )
+
+        loop = asyncio.get_running_loop()
+        histogram = self._histograms.setdefault(operation, LatencyHistogram())
+        slots = self._slots
+        self._pending += 1
+
+        def _timed() -> T:
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                loop.call_soon_threadsafe(histogram.observe, elapsed_ms)
+
+        future = self._pool.submit(_timed)
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self._release_slot, slots)
+        )
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool occupancy and latency histograms per operation"""
+        return {
+            "max_workers": self.max_workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "operations": {
+                name: histogram.snapshot()
+                for name, histogram in self._histograms.items()
+            },
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads"""
+        self._pool.shutdown(wait=wait)
+
+    def _release_slot(self, slots: asyncio.Semaphore) -> None:
+        self._pending -= 1
+        slots.release()
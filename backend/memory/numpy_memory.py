@@ -0,0 +1,809 @@
+"""
+filepath: backend/memory/numpy_memory.py
+In-process vector memory backed by a contiguous NumPy embedding matrix.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base import (
+    BaseMemory,
+    MemoryRecord,
+    check_search_mode,
+    compare,
+    evaluate_filter,
+)
+from .blobs import BlobColumn
+from .embedder import Embedder, top_k_indices
+from .io_executor import MemoryIOExecutor
+from .quantization import BaseQuantizer, create_quantizer, quantized_top_k, recall_at_k
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = "snapshot"
+EMBEDDINGS_FILE = "embeddings.npy"
+COLUMNS_FILE = "columns.json"
+CODES_FILE = "codes.npy"
+QUANTIZER_FILE = "quantizer.npz"
+RERANK_VECTORS_FILE = "rerank_vectors.f32"
+# Rows of the linked re-rank file that make up a snapshot's float32 matrix
+RERANK_ROWS_FILE = "rerank_rows.npz"
+
+# Rows copied at a time when the float32 matrix moves between RAM and disk
+COPY_BLOCK_ROWS = 65536
+
+
+def resident_nbytes(array: Optional[np.ndarray]) -> int:
+    """Bytes an array holds in process memory; memory-mapped files count as 0"""
+    if array is None or isinstance(array, np.memmap):
+        return 0
+    return array.nbytes
+
+
+class NumpyMemory(BaseMemory):
+    """Memory provider that keeps everything in process.
+
+    Embeddings live in one L2-normalized float32 matrix so cosine similarity is
+    a single matrix-vector product. Metadata is stored column-wise, and boolean
+    masks for equality filters (e.g. ``{"agent_id": ...}``) are cached and
+    extended incrementally as records are added.
+
+    When ``persist_directory`` is set, the store is written as a snapshot of
+    ``.npy`` arrays and string blobs: IDs, contents, metadata and timestamps
+    are memory-mapped and decoded per row on read, and scalar metadata columns
+    are saved dictionary-encoded, so startup parses no per-record JSON. The
+    snapshot is rewritten on ``flush()``, on ``close()`` and, while there are
+    unsaved changes, every ``persist_interval`` seconds.
+
+    With ``quantization`` configured, embeddings are additionally encoded as
+    int8 or product-quantization codes once ``train_size`` records exist.
+    Searches then scan the codes and re-rank the best ``top_k *
+    rerank_factor`` rows on float32. The float32 matrix used for re-ranking
+    moves to a memory-mapped file (in ``persist_directory`` or a temporary
+    file), so only the codes stay resident; snapshots hard-link that file
+    rather than copying it. ``keep_full_precision: False`` drops it entirely. If sampled recall stays below ``min_recall`` even at
+    ``max_rerank_factor``, quantization is abandoned and search stays exact.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.persist_directory: Optional[str] = config.get("persist_directory")
+        self.embedder = Embedder(
+            model_name=config.get("embedding_model_name", "all-MiniLM-L6-v2"),
+            embedding_function=config.get("embedding_function"),
+            query_cache_size=config.get("query_cache_size", 4096),
+        )
+        self._initial_capacity = config.get("initial_capacity", 1024)
+
+        self._vectors: Optional[np.ndarray] = None  # (capacity, dim)
+        self._dim: Optional[int] = None
+        self._size = 0
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids = BlobColumn()
+        self._contents = BlobColumn()
+        self._metadata = BlobColumn()  # JSON per row
+        self._timestamps = BlobColumn()
+        self._columns: Dict[str, np.ndarray] = {}  # scalar metadata columns
+        self._row_by_id: Dict[str, int] = {}
+        self._mask_cache: Dict[Tuple[str, Any], np.ndarray] = {}
+
+        quantization = config.get("quantization") or {}
+        self._quantization = quantization
+        self._quantizer: Optional[BaseQuantizer] = (
+            create_quantizer(quantization) if quantization else None
+        )
+        self._codes: Optional[np.ndarray] = None  # (capacity, code_size)
+        self.train_size = quantization.get("train_size", 4096)
+        self.rerank_factor = quantization.get("rerank_factor", 4)
+        self.keep_full_precision = quantization.get("keep_full_precision", True)
+        # Re-rank depth is raised until sampled recall@10 reaches min_recall
+        self.min_recall = quantization.get("min_recall", 0.95)
+        self.max_rerank_factor = quantization.get("max_rerank_factor", 64)
+        self.measured_recall: Optional[float] = None
+        self._training = False
+        # Backing file of the memory-mapped float32 tier, once quantized
+        self._rerank_path: Optional[str] = None
+        self._vectors_on_disk = False
+
+        io_params = config.get("io_params", {})
+        self.io = MemoryIOExecutor(
+            max_workers=io_params.get("max_workers", 2),
+            max_pending=io_params.get("max_pending", 64),
+        )
+
+        # Unsaved changes are persisted this many seconds after they happen
+        self.persist_interval = config.get("persist_interval", 30.0)
+        self._dirty = False
+        self._persist_lock = asyncio.Lock()
+        self._persist_task: Optional[asyncio.Task] = None
+
+        if self.persist_directory:
+            os.makedirs(self.persist_directory, exist_ok=True)
+            self._load()
+        if self._needs_training():
+            self._install_codes(self._fit_quantizer(self._size), self._size)
+        logger.info(f"Initialized NumpyMemory with {len(self._row_by_id)} records")
+
+    async def add(self, record: MemoryRecord) -> None:
+        """Embed and append a single record"""
+        await self.add_many([record])
+
+    async def add_many(self, records: List[MemoryRecord]) -> None:
+        """Embed records in one batch and append them to the matrix"""
+        if not records:
+            return
+        try:
+            vectors = await self.io.run(
+                "embed", self.embedder.embed_documents, [r.content for r in records]
+            )
+            codes = (
+                self._quantizer.encode(vectors)
+                if self._codes is not None
+                else [None] * len(vectors)
+            )
+            for record, vector, code in zip(records, vectors, codes):
+                self._append(record, vector, code)
+            self._mark_dirty()
+            if self._needs_training():
+                self._training = True
+                try:
+                    size = self._size
+                    codes = await self.io.run("quantize", self._fit_quantizer, size)
+                    self._install_codes(codes, size)
+                finally:
+                    self._training = False
+        except Exception as e:
+            logger.error(f"Error adding {len(records)} records to NumpyMemory: {e}")
+
+    async def get(self, record_id: str) -> Optional[MemoryRecord]:
+        """Retrieve a record by ID"""
+        row = self._row_by_id.get(record_id)
+        return self._to_record(row) if row is not None else None
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
+    ) -> List[MemoryRecord]:
+        """Vectorized cosine top-k search"""
+        results = await self.search_many([query], top_k=top_k, filter=filter, mode=mode)
+        return results[0] if results else []
+
+    async def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
+    ) -> List[List[MemoryRecord]]:
+        """Score all queries against the matrix in one product"""
+        check_search_mode(mode)
+        if not queries:
+            return []
+        if self._size == 0:
+            return [[] for _ in queries]
+        mask = self._filter_mask(filter)
+        try:
+            query_vectors = await self.io.run(
+                "embed", self.embedder.embed_queries, queries
+            )
+            # Hand the worker fixed-size views so concurrent appends are safe
+            vectors = self._vectors[: len(mask)] if self._vectors is not None else None
+            if self._codes is not None:
+                rows_per_query = await self.io.run(
+                    "query",
+                    quantized_top_k,
+                    self._quantizer,
+                    self._codes[: len(mask)],
+                    query_vectors,
+                    np.flatnonzero(mask),
+                    top_k,
+                    vectors,
+                    self.rerank_factor,
+                )
+            else:
+                rows_per_query = await self.io.run(
+                    "query", self._top_k_rows, vectors, query_vectors, mask, top_k
+                )
+        except Exception as e:
+            logger.error(f"Error searching NumpyMemory: {e}")
+            return [[] for _ in queries]
+        return [[self._to_record(row) for row in rows] for rows in rows_per_query]
+
+    async def delete(self, record_id: str) -> bool:
+        """Tombstone a record; its row is reclaimed on the next persist"""
+        row = self._row_by_id.pop(record_id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._mark_dirty()
+        return True
+
+    async def clear(self, agent_id: Optional[str] = None) -> None:
+        """Clear memory, optionally only for one agent"""
+        if agent_id:
+            rows = np.flatnonzero(self._filter_mask({"agent_id": agent_id}))
+            for row in rows:
+                self._row_by_id.pop(self._ids[row], None)
+            self._alive[rows] = False
+            logger.info(f"Cleared memory for agent {agent_id} in NumpyMemory")
+        else:
+            self._reset()
+            logger.warning("Cleared all records from NumpyMemory")
+        self._mark_dirty()
+
+    async def flush(self) -> None:
+        """Persist unsaved changes to ``persist_directory``, if configured"""
+        if not self.persist_directory:
+            return
+        async with self._persist_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            try:
+                await self.io.run("persist", self.persist)
+            except Exception:
+                self._dirty = True
+                raise
+
+    async def close(self) -> None:
+        """Persist to disk (if configured) and stop the I/O pool"""
+        if self._persist_task and not self._persist_task.done():
+            self._persist_task.cancel()
+        await self.flush()
+        self.io.shutdown(wait=False)
+        if self._rerank_path and not self.persist_directory:
+            self._vectors = None
+            os.remove(self._rerank_path)
+            self._rerank_path = None
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """Resident bytes of the float32 matrix and codes, and mapped bytes"""
+        vector_bytes = resident_nbytes(self._vectors)
+        code_bytes = resident_nbytes(self._codes)
+        mapped_bytes = sum(
+            a.nbytes for a in (self._vectors, self._codes) if isinstance(a, np.memmap)
+        )
+        return {
+            "records": len(self._row_by_id),
+            "quantization": self._quantizer.kind if self._quantizer else None,
+            "quantizer_trained": self._codes is not None,
+            "vector_bytes": vector_bytes,
+            "code_bytes": code_bytes,
+            "mapped_bytes": mapped_bytes,
+            "compression_ratio": (
+                4 * self._dim / self._quantizer.code_size
+                if self._codes is not None
+                else 1.0
+            ),
+            "rerank_factor": self.rerank_factor,
+            "measured_recall": self.measured_recall,
+        }
+
+    def persist(self) -> None:
+        """Write live records to ``persist_directory``, dropping tombstones.
+
+        The snapshot is built in a staging directory and swapped in, so a
+        crash leaves either the old or the new snapshot intact.
+        """
+        if not self.persist_directory:
+            raise ValueError("persist_directory is not configured")
+        # Rows below ``size`` never change, so appends may continue meanwhile
+        size, vectors, codes = self._size, self._vectors, self._codes
+        live = np.flatnonzero(self._alive[:size])
+
+        snapshot = os.path.join(self.persist_directory, SNAPSHOT_DIR)
+        staging, previous = snapshot + ".tmp", snapshot + ".old"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        if not self._link_rerank_vectors(vectors, staging, live):
+            # Copied in blocks so a memory-mapped matrix is never loaded whole
+            n_vectors = len(live) if vectors is not None else 0
+            out = np.lib.format.open_memmap(
+                os.path.join(staging, EMBEDDINGS_FILE),
+                mode="w+",
+                dtype=np.float32,
+                shape=(n_vectors, self._dim or 0),
+            )
+            for start in range(0, n_vectors, COPY_BLOCK_ROWS):
+                rows = live[start : start + COPY_BLOCK_ROWS]
+                out[start : start + len(rows)] = vectors[rows]
+            out.flush()
+            del out
+        if codes is not None:
+            np.save(os.path.join(staging, CODES_FILE), codes[live])
+            with open(os.path.join(staging, QUANTIZER_FILE), "wb") as f:
+                np.savez(
+                    f,
+                    kind=np.array(self._quantizer.kind),
+                    rerank_factor=np.array(self.rerank_factor),
+                    **self._quantizer.state(),
+                )
+
+        for name, column in self._blob_columns().items():
+            column.write(staging, name, live)
+        columns = []
+        for key, column in list(self._columns.items()):
+            values, codes_by_value = [], {}
+            value_codes = np.full(len(live), -1, dtype=np.int32)
+            for i, value in enumerate(column[live]):
+                if value is None:
+                    continue
+                # Type is part of the key so True and 1 stay distinct
+                code = codes_by_value.setdefault((type(value), value), len(values))
+                if code == len(values):
+                    values.append(value)
+                value_codes[i] = code
+            file_name = f"column_{len(columns)}.npy"
+            np.save(os.path.join(staging, file_name), value_codes)
+            columns.append({"key": key, "file": file_name, "values": values})
+        with open(os.path.join(staging, COLUMNS_FILE), "w", encoding="utf-8") as f:
+            json.dump(columns, f)
+
+        shutil.rmtree(previous, ignore_errors=True)
+        if os.path.exists(snapshot):
+            os.replace(snapshot, previous)
+        os.replace(staging, snapshot)
+        # Open memory maps of the old snapshot stay valid after unlink on POSIX
+        shutil.rmtree(previous, ignore_errors=True)
+        logger.info(f"Persisted {len(live)} records to {self.persist_directory}")
+
+    @staticmethod
+    def _top_k_rows(
+        vectors: np.ndarray, query_vectors: np.ndarray, mask: np.ndarray, top_k: int
+    ) -> List[np.ndarray]:
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return [np.empty(0, dtype=np.int64) for _ in query_vectors]
+        # Score only candidate rows when the filter is selective
+        if len(candidates) < len(vectors) // 2:
+            scores = query_vectors @ vectors[candidates].T
+            return [candidates[top_k_indices(row, top_k)] for row in scores]
+        scores = query_vectors @ vectors.T
+        scores[:, ~mask] = -np.inf
+        k = min(top_k, len(candidates))
+        return [top_k_indices(row, k) for row in scores]
+
+    def _filter_mask(self, filter: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Boolean mask of live rows matching a Chroma-style filter"""
+        size = self._size
+        return self._alive[:size] & evaluate_filter(
+            filter,
+            self._condition_mask,
+            lambda masks: functools.reduce(
+                np.logical_and, masks, np.ones(size, dtype=bool)
+            ),
+            lambda masks: functools.reduce(
+                np.logical_or, masks, np.zeros(size, dtype=bool)
+            ),
+        )
+
+    def _condition_mask(self, key: str, op: str, operand: Any) -> np.ndarray:
+        if op == "$eq":
+            return self._equality_mask(key, operand)
+        if op == "$in":
+            return functools.reduce(
+                np.logical_or,
+                [self._equality_mask(key, value) for value in operand],
+                np.zeros(self._size, dtype=bool),
+            )
+        column = self._columns.get(key)
+        if column is None:
+            return np.zeros(self._size, dtype=bool)
+        return np.fromiter(
+            (compare(value, op, operand) for value in column[: self._size]),
+            dtype=bool,
+            count=self._size,
+        )
+
+    def _equality_mask(self, key: str, value: Any) -> np.ndarray:
+        cache_key = (key, value)
+        mask = self._mask_cache.get(cache_key)
+        if mask is None:
+            column = self._columns.get(key)
+            if column is None:
+                mask = np.zeros(self._size, dtype=bool)
+            else:
+                mask = np.asarray(column[: self._size] == value, dtype=bool)
+            self._mask_cache[cache_key] = mask
+        return mask[: self._size]
+
+    def _append(
+        self, record: MemoryRecord, vector: np.ndarray, code: Optional[np.ndarray]
+    ) -> None:
+        if record.id in self._row_by_id:
+            # Re-adding an ID replaces the previous version
+            self._alive[self._row_by_id[record.id]] = False
+        self._ensure_capacity(self._size + 1, vector.shape[0])
+        row = self._size
+        if self._vectors is not None:
+            self._vectors[row] = vector
+        if self._codes is not None:
+            self._codes[row] = code
+        self._alive[row] = True
+        self._size += 1
+
+        metadata = dict(record.metadata or {})
+        if record.agent_id:
+            metadata["agent_id"] = record.agent_id
+        self._ids.append(record.id)
+        self._contents.append(record.content)
+        self._metadata.append(json.dumps(metadata))
+        self._timestamps.append(record.timestamp.isoformat())
+        self._row_by_id[record.id] = row
+        self._set_columns(row, metadata)
+
+    def _set_columns(self, row: int, metadata: Dict[str, Any]) -> None:
+        capacity = len(self._alive)
+        for key, value in metadata.items():
+            if not isinstance(value, (str, int, float, bool)):
+                continue
+            column = self._columns.get(key)
+            if column is None:
+                column = np.full(capacity, None, dtype=object)
+                self._columns[key] = column
+            column[row] = value
+        # Keep cached filter masks in step with the new row
+        for (key, value), mask in list(self._mask_cache.items()):
+            if len(mask) <= row:
+                grown = np.zeros(max(capacity, row + 1), dtype=bool)
+                grown[: len(mask)] = mask
+                mask = grown
+                self._mask_cache[(key, value)] = mask
+            mask[row] = metadata.get(key) == value
+
+    def _ensure_capacity(self, needed: int, dim: int) -> None:
+        if self._dim is not None and self._dim != dim:
+            raise ValueError(
+                f"Embedding dimension {dim} does not match stored {self._dim}"
+            )
+        self._dim = dim
+        capacity = len(self._alive)
+        stores_vectors = self._codes is None or self.keep_full_precision
+        # Once codes exist the float32 tier is only read to re-rank, so it
+        # grows on disk rather than in RAM
+        vectors_on_disk = self._codes is not None and self.keep_full_precision
+        arrays = [a for a in (self._vectors, self._codes) if a is not None]
+        # Memory-mapped arrays from disk are read-only; copy on first write
+        writable = bool(arrays) and all(a.flags.writeable for a in arrays)
+        if needed <= capacity and writable:
+            return
+        new_capacity = max(needed, capacity * 2, self._initial_capacity)
+        if vectors_on_disk:
+            self._vectors = self._spill_vectors(new_capacity)
+        elif stores_vectors:
+            self._vectors = self._grown(self._vectors, (new_capacity, dim), np.float32)
+        if self._codes is not None:
+            self._codes = self._grown(
+                self._codes,
+                (new_capacity, self._quantizer.code_size),
+                self._quantizer.code_dtype,
+            )
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[: self._size] = self._alive[: self._size]
+        self._alive = alive
+        for key, column in self._columns.items():
+            grown = np.full(new_capacity, None, dtype=object)
+            grown[: len(column)] = column
+            self._columns[key] = grown
+
+    def _grown(
+        self, array: Optional[np.ndarray], shape: Tuple[int, int], dtype: Any
+    ) -> np.ndarray:
+        grown = np.zeros(shape, dtype=dtype)
+        if array is not None:
+            grown[: self._size] = array[: self._size]
+        return grown
+
+    def _spill_vectors(self, capacity: int) -> np.memmap:
+        """The float32 matrix as a writable memory-mapped file of ``capacity`` rows"""
+        if self._rerank_path is None:
+            if self.persist_directory:
+                self._rerank_path = os.path.join(
+                    self.persist_directory, RERANK_VECTORS_FILE
+                )
+            else:
+                fd, self._rerank_path = tempfile.mkstemp(suffix=".f32")
+                os.close(fd)
+        # Growing our own file keeps its rows; anything else is copied in
+        previous = None if self._vectors_on_disk else self._vectors
+        if not self._vectors_on_disk and os.path.exists(self._rerank_path):
+            # The old file may still be linked from a snapshot, so it is
+            # replaced rather than truncated
+            os.remove(self._rerank_path)
+        with open(self._rerank_path, "r+b" if self._vectors_on_disk else "wb") as f:
+            f.truncate(capacity * self._dim * np.dtype(np.float32).itemsize)
+        spilled = np.memmap(
+            self._rerank_path, dtype=np.float32, mode="r+", shape=(capacity, self._dim)
+        )
+        if previous is not None:
+            for start in range(0, self._size, COPY_BLOCK_ROWS):
+                end = min(start + COPY_BLOCK_ROWS, self._size)
+                spilled[start:end] = previous[start:end]
+        self._vectors_on_disk = True
+        return spilled
+
+    def _needs_training(self) -> bool:
+        return (
+            self._quantizer is not None
+            and self._codes is None
+            and not self._training
+            and len(self._row_by_id) >= self.train_size
+        )
+
+    def _fit_quantizer(self, size: int) -> Optional[np.ndarray]:
+        """Train the quantizer on live rows and encode the first ``size`` rows.
+
+        Returns None when the codes cannot reach ``min_recall``.
+        """
+        vectors = np.asarray(self._vectors[:size])
+        live = np.flatnonzero(self._alive[:size])
+        sample = live[: self.train_size]
+        self._quantizer.train(vectors[sample])
+        codes = self._quantizer.encode(vectors)
+        if not self._calibrate(vectors, codes, live):
+            return None
+        logger.info(
+            f"Trained {self._quantizer.kind} quantizer on {len(sample)} records "
+            f"(rerank_factor={self.rerank_factor}, recall@10={self.measured_recall})"
+        )
+        return codes
+
+    def _install_codes(self, codes: Optional[np.ndarray], size: int) -> None:
+        if codes is None:
+            logger.warning(
+                f"{self._quantizer.kind} quantization reached recall@10 "
+                f"{self.measured_recall:.3f}, below min_recall {self.min_recall}; "
+                "falling back to exact float32 search"
+            )
+            self._quantizer = None
+            return
+        # Rows appended while the quantizer was training are encoded here
+        full = np.zeros((len(self._alive), codes.shape[1]), dtype=codes.dtype)
+        full[:size] = codes
+        if self._size > size:
+            full[size : self._size] = self._quantizer.encode(
+                np.asarray(self._vectors[size : self._size])
+            )
+        self._codes = full
+        self._dirty = True
+        if self.keep_full_precision:
+            self._vectors = self._spill_vectors(len(self._alive))
+        else:
+            self._vectors = None
+
+    def _calibrate(
+        self, vectors: np.ndarray, codes: np.ndarray, live: np.ndarray, k: int = 10
+    ) -> bool:
+        """Estimate recall@k on sampled rows, deepening the re-rank if needed.
+
+        Returns whether the codes reach ``min_recall``.
+        """
+        rng = np.random.default_rng(0)
+        queries = vectors[rng.choice(live, size=min(64, len(live)), replace=False)]
+        mask = np.zeros(len(vectors), dtype=bool)
+        mask[live] = True
+        exact = self._top_k_rows(vectors, queries, mask, k)
+        rerank_vectors = vectors if self.keep_full_precision else None
+        while True:
+            approx = quantized_top_k(
+                self._quantizer,
+                codes,
+                queries,
+                live,
+                k,
+                rerank_vectors,
+                self.rerank_factor,
+            )
+            self.measured_recall = recall_at_k(exact, approx, k)
+            if (
+                self.measured_recall >= self.min_recall
+                or rerank_vectors is None
+                or self.rerank_factor >= self.max_rerank_factor
+            ):
+                break
+            self.rerank_factor = min(self.rerank_factor * 2, self.max_rerank_factor)
+        return self.measured_recall >= self.min_recall
+
+    def _to_record(self, row: int) -> MemoryRecord:
+        metadata = json.loads(self._metadata[row])
+        agent_id = metadata.pop("agent_id", None)
+        return MemoryRecord(
+            id=self._ids[row],
+            content=self._contents[row],
+            metadata=metadata,
+            timestamp=datetime.fromisoformat(self._timestamps[row]),
+            agent_id=agent_id,
+        )
+
+    def _reset(self) -> None:
+        self._vectors = None
+        self._dim = None
+        self._codes = None
+        self._vectors_on_disk = False
+        if self._quantization:
+            # Quantization abandoned for low recall gets another try
+            self._quantizer = create_quantizer(self._quantization)
+        self._size = 0
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids, self._contents = BlobColumn(), BlobColumn()
+        self._metadata, self._timestamps = BlobColumn(), BlobColumn()
+        self._columns = {}
+        self._row_by_id = {}
+        self._mask_cache = {}
+
+    def _blob_columns(self) -> Dict[str, BlobColumn]:
+        return {
+            "ids": self._ids,
+            "docs": self._contents,
+            "meta": self._metadata,
+            "timestamps": self._timestamps,
+        }
+
+    def _mark_dirty(self) -> None:
+        """Note unsaved changes and schedule a persist if none is pending"""
+        self._dirty = True
+        if (
+            self.persist_directory
+            and self.persist_interval
+            and (self._persist_task is None or self._persist_task.done())
+        ):
+            self._persist_task = asyncio.create_task(self._persist_loop())
+
+    async def _persist_loop(self) -> None:
+        while self._dirty:
+            await asyncio.sleep(self.persist_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Periodic persist of NumpyMemory failed: {e}")
+
+    def _load(self) -> None:
+        snapshot = os.path.join(self.persist_directory, SNAPSHOT_DIR)
+        if not os.path.isdir(snapshot):
+            # A crash between the two renames in persist() leaves only this
+            snapshot += ".old"
+            if not os.path.isdir(snapshot):
+                return
+        vectors = self._load_vectors(snapshot)
+        columns = {
+            name: BlobColumn.open(snapshot, name)
+            for name in ("ids", "docs", "meta", "timestamps")
+        }
+        n_rows = len(columns["ids"])
+        codes = self._load_codes(snapshot, n_rows)
+        if codes is None or len(vectors):
+            if n_rows != len(vectors):
+                raise ValueError(
+                    f"Snapshot has {n_rows} records but {EMBEDDINGS_FILE} has {len(vectors)}"
+                )
+
+        if not n_rows:
+            return
+        self._dim = vectors.shape[1]
+        self._vectors = vectors if len(vectors) else None
+        self._codes = codes
+        if codes is not None and self._vectors is None and self.keep_full_precision:
+            logger.warning(
+                "Persisted store has no float32 embeddings; searching codes only"
+            )
+            self.keep_full_precision = False
+        if codes is not None and not self.keep_full_precision:
+            self._vectors = None
+        self._size = n_rows
+        self._alive = np.ones(n_rows, dtype=bool)
+        self._ids = columns["ids"]
+        self._contents = columns["docs"]
+        self._metadata = columns["meta"]
+        self._timestamps = columns["timestamps"]
+        self._row_by_id = {
+            record_id: row for row, record_id in enumerate(self._ids.values())
+        }
+        with open(os.path.join(snapshot, COLUMNS_FILE), encoding="utf-8") as f:
+            for column in json.load(f):
+                value_codes = np.load(os.path.join(snapshot, column["file"]))
+                # Code -1 (no scalar value) picks the trailing None
+                lookup = np.empty(len(column["values"]) + 1, dtype=object)
+                lookup[:-1] = column["values"]
+                self._columns[column["key"]] = lookup[value_codes]
+
+    def _link_rerank_vectors(
+        self, vectors: Optional[np.ndarray], staging: str, live: np.ndarray
+    ) -> bool:
+        """Hard-link the on-disk re-rank tier into the snapshot instead of copying it.
+
+        Rows below the current size never change, so the link stays valid
+        while appends continue. Returns False when the vectors are not in such
+        a file or the file system has no hard links; the caller copies them.
+        """
+        if not (isinstance(vectors, np.memmap) and self._vectors_on_disk):
+            return False
+        vectors.flush()
+        try:
+            os.link(self._rerank_path, os.path.join(staging, RERANK_VECTORS_FILE))
+        except OSError as e:
+            logger.warning(f"Copying float32 vectors into the snapshot: {e}")
+            return False
+        with open(os.path.join(staging, RERANK_ROWS_FILE), "wb") as f:
+            np.savez(f, rows=live, dim=np.array(self._dim))
+        return True
+
+    def _load_vectors(self, snapshot: str) -> np.ndarray:
+        """The snapshot's float32 matrix, adopting a linked re-rank tier"""
+        rows_path = os.path.join(snapshot, RERANK_ROWS_FILE)
+        if not os.path.exists(rows_path):
+            return np.load(os.path.join(snapshot, EMBEDDINGS_FILE), mmap_mode="r")
+        with np.load(rows_path) as state:
+            rows, dim = state["rows"], int(state["dim"])
+        linked = os.path.join(snapshot, RERANK_VECTORS_FILE)
+        self._rerank_path = os.path.join(self.persist_directory, RERANK_VECTORS_FILE)
+        if not len(rows) or (self._quantizer and not self.keep_full_precision):
+            # Nothing to re-rank with; the tier file is no longer needed
+            if os.path.exists(self._rerank_path):
+                os.remove(self._rerank_path)
+            self._rerank_path = None
+            return np.zeros((0, dim), dtype=np.float32)
+        self._vectors_on_disk = True
+        if np.array_equal(rows, np.arange(len(rows))):
+            # The snapshot's rows lead the file, so it stays the tier as is and
+            # new rows are appended after them
+            if not (
+                os.path.exists(self._rerank_path)
+                and os.path.samefile(linked, self._rerank_path)
+            ):
+                if os.path.exists(self._rerank_path):
+                    os.remove(self._rerank_path)
+                os.link(linked, self._rerank_path)
+            return np.memmap(
+                self._rerank_path, dtype=np.float32, mode="r+", shape=(len(rows), dim)
+            )
+        # Tombstoned rows are dropped by copying the live ones to a new file;
+        # the next persist releases the old one
+        source = np.memmap(linked, dtype=np.float32, mode="r")
+        source = source.reshape(-1, dim)
+        if os.path.exists(self._rerank_path):
+            os.remove(self._rerank_path)
+        with open(self._rerank_path, "wb") as f:
+            f.truncate(len(rows) * dim * np.dtype(np.float32).itemsize)
+        vectors = np.memmap(
+            self._rerank_path, dtype=np.float32, mode="r+", shape=(len(rows), dim)
+        )
+        for start in range(0, len(rows), COPY_BLOCK_ROWS):
+            block = rows[start : start + COPY_BLOCK_ROWS]
+            vectors[start : start + len(block)] = source[block]
+        vectors.flush()
+        self._dirty = True
+        return vectors
+
+    def _load_codes(self, snapshot: str, n_rows: int) -> Optional[np.ndarray]:
+        codes_path = os.path.join(snapshot, CODES_FILE)
+        quantizer_path = os.path.join(snapshot, QUANTIZER_FILE)
+        if self._quantizer is None or not os.path.exists(codes_path):
+            return None
+        with np.load(quantizer_path) as state:
+            if str(state["kind"]) != self._quantizer.kind:
+                raise ValueError(
+                    f"Persisted codes use {state['kind']} quantization but "
+                    f"{self._quantizer.kind} is configured"
+                )
+            self._quantizer.load_state(dict(state))
+            # Keep the re-rank depth chosen by calibration at training time
+            self.rerank_factor = max(self.rerank_factor, int(state["rerank_factor"]))
+        codes = np.load(codes_path, mmap_mode="r")
+        if len(codes) != n_rows:
+            raise ValueError(
+                f"Snapshot has {n_rows} records but {CODES_FILE} has {len(codes)}"
+            )
+        return codes
@@ -0,0 +1,296 @@
+"""
+filepath: backend/memory/quantization.py
+Compressed embedding codes (int8 scalar and product quantization) for the
+in-process vector backends.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .embedder import top_k_indices
+
+logger = logging.getLogger(__name__)
+
+# Rows scored per block so approximate scoring never materializes a float32
+# copy of the whole code matrix.
+SCORE_BLOCK_ROWS = 65536
+# Rows decoded at a time when product-quantized rows are scored with a matmul
+PQ_DECODE_ROWS = 4096
+# From this many queries on, decoding a block once and scoring it with BLAS is
+# cheaper than one table lookup per query and sub-vector
+PQ_DECODE_MIN_QUERIES = 16
+
+
+class BaseQuantizer(ABC):
+    """Encodes normalized float32 embeddings into compact codes.
+
+    Quantizers are trained once on a sample of embeddings; afterwards
+    ``scores`` approximates the inner product between float32 queries and
+    encoded rows without decoding them.
+    """
+
+    kind: str = ""
+
+    @property
+    @abstractmethod
+    def is_trained(self) -> bool:
+        """Whether ``train`` has been called"""
+
+    @abstractmethod
+    def train(self, vectors: np.ndarray) -> None:
+        """Fit the quantizer to a sample of embeddings"""
+
+    @abstractmethod
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Encode ``(n, dim)`` float32 vectors to ``(n, code_size)`` codes"""
+
+    @abstractmethod
+    def _score_block(self, query_vectors: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate ``(n_queries, n_rows)`` scores for one block of codes"""
+
+    @abstractmethod
+    def state(self) -> Dict[str, np.ndarray]:
+        """Arrays needed to rebuild the trained quantizer"""
+
+    @abstractmethod
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        """Restore a trained quantizer from ``state()`` output"""
+
+    @property
+    @abstractmethod
+    def code_size(self) -> int:
+        """Bytes per encoded vector"""
+
+    @property
+    @abstractmethod
+    def code_dtype(self) -> np.dtype:
+        """NumPy dtype of the codes"""
+
+    def scores(self, query_vectors: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate inner products between queries and every code row"""
+        out = np.empty((len(query_vectors), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            end = start + SCORE_BLOCK_ROWS
+            out[:, start:end] = self._score_block(query_vectors, codes[start:end])
+        return out
+
+
+class Int8Quantizer(BaseQuantizer):
+    """Symmetric per-dimension int8 scalar quantization (4x smaller)"""
+
+    kind = "int8"
+
+    def __init__(self, clip_percentile: float = 99.9):
+        self.clip_percentile = clip_percentile
+        self._scale: Optional[np.ndarray] = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self._scale is not None
+
+    @property
+    def code_size(self) -> int:
+        return 0 if self._scale is None else len(self._scale)
+
+    @property
+    def code_dtype(self) -> np.dtype:
+        return np.dtype(np.int8)
+
+    def train(self, vectors: np.ndarray) -> None:
+        # Clip rare outliers so they don't waste the range of every other row
+        bound = np.percentile(np.abs(vectors), self.clip_percentile, axis=0)
+        bound[bound == 0] = 1.0
+        self._scale = (bound / 127.0).astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.rint(vectors / self._scale)
+        return np.clip(codes, -127, 127).astype(np.int8)
+
+    def _score_block(self, query_vectors: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        return (query_vectors * self._scale) @ codes.T.astype(np.float32)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"scale": self._scale}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        self._scale = np.asarray(state["scale"], dtype=np.float32)
+
+
+class ProductQuantizer(BaseQuantizer):
+    """Product quantization with 8-bit codes per sub-vector.
+
+    The embedding is split into ``n_subvectors`` slices and each slice is
+    replaced by the index of its nearest centroid, so a vector costs
+    ``n_subvectors`` bytes. A few queries are scored with per-slice lookup
+    tables over contiguous code columns; larger batches decode blocks of rows
+    and score them with one matrix product. By default one byte covers four
+    dimensions (16x smaller than float32).
+    """
+
+    kind = "pq"
+
+    def __init__(
+        self,
+        n_subvectors: Optional[int] = None,
+        n_centroids: int = 256,
+        train_iterations: int = 20,
+        seed: int = 0,
+    ):
+        if n_centroids > 256:
+            raise ValueError("ProductQuantizer supports at most 256 centroids")
+        self.n_subvectors = n_subvectors
+        self.n_centroids = n_centroids
+        self.train_iterations = train_iterations
+        self.seed = seed
+        self._codebooks: Optional[np.ndarray] = None  # (m, ksub, dsub)
+
+    @property
+    def is_trained(self) -> bool:
+        return self._codebooks is not None
+
+    @property
+    def code_size(self) -> int:
+        return 0 if self._codebooks is None else self._codebooks.shape[0]
+
+    @property
+    def code_dtype(self) -> np.dtype:
+        return np.dtype(np.uint8)
+
+    def train(self, vectors: np.ndarray) -> None:
+        dim = vectors.shape[1]
+        m = self.n_subvectors or max(1, dim // 4)
+        if dim % m:
+            raise ValueError(
+                f"Embedding dimension {dim} is not divisible by n_subvectors={m}"
+            )
+        self.n_subvectors = m
+        k = min(self.n_centroids, len(vectors))
+        rng = np.random.default_rng(self.seed)
+        slices = vectors.reshape(len(vectors), m, dim // m)
+        self._codebooks = np.stack(
+            [self._kmeans(slices[:, j], k, rng) for j in range(m)]
+        ).astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        m, _, dsub = self._codebooks.shape
+        slices = vectors.reshape(len(vectors), m, dsub)
+        codes = np.empty((len(vectors), m), dtype=np.uint8)
+        for j in range(m):
+            codes[:, j] = self._assign(slices[:, j], self._codebooks[j])
+        return codes
+
+    def _score_block(self, query_vectors: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        m, _, dsub = self._codebooks.shape
+        out = np.zeros((len(query_vectors), len(codes)), dtype=np.float32)
+        if len(query_vectors) >= PQ_DECODE_MIN_QUERIES:
+            slices = np.arange(m)
+            for start in range(0, len(codes), PQ_DECODE_ROWS):
+                end = start + PQ_DECODE_ROWS
+                decoded = self._codebooks[slices, codes[start:end]]
+                out[:, start:end] = query_vectors @ decoded.reshape(-1, m * dsub).T
+            return out
+        # tables[q, j, c] = <query slice j, centroid c of slice j>
+        tables = np.einsum(
+            "qjd,jcd->qjc",
+            query_vectors.reshape(len(query_vectors), m, dsub),
+            self._codebooks,
+        ).astype(np.float32)
+        # Column-major codes make each slice's lookup a contiguous gather
+        columns = np.ascontiguousarray(codes.T)
+        for q in range(len(query_vectors)):
+            for j in range(m):
+                out[q] += np.take(tables[q, j], columns[j])
+        return out
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"codebooks": self._codebooks}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        self._codebooks = np.asarray(state["codebooks"], dtype=np.float32)
+        self.n_subvectors = self._codebooks.shape[0]
+
+    def _kmeans(
+        self, points: np.ndarray, k: int, rng: np.random.Generator
+    ) -> np.ndarray:
+        centroids = points[rng.choice(len(points), size=k, replace=False)].copy()
+        for _ in range(self.train_iterations):
+            assignment = self._assign(points, centroids)
+            counts = np.bincount(assignment, minlength=k)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, points)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+            # Re-seed empty clusters from random points
+            empty = np.flatnonzero(~filled)
+            if len(empty):
+                centroids[empty] = points[rng.choice(len(points), size=len(empty))]
+        # With fewer than n_centroids training points every slice gets k
+        # centroids, all real, rather than padding that _assign could pick
+        return centroids
+
+    @staticmethod
+    def _assign(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        distances = np.sum(centroids**2, axis=1)[None, :] - 2.0 * points @ centroids.T
+        return np.argmin(distances, axis=1).astype(np.uint8)
+
+
+QUANTIZERS = {"int8": Int8Quantizer, "pq": ProductQuantizer}
+
+
+def create_quantizer(config: Dict[str, Any]) -> BaseQuantizer:
+    """Build a quantizer from a ``{"type": "int8" | "pq", ...}`` config"""
+    kind = config.get("type", "int8")
+    if kind == "int8":
+        return Int8Quantizer(clip_percentile=config.get("clip_percentile", 99.9))
+    if kind == "pq":
+        return ProductQuantizer(
+            n_subvectors=config.get("n_subvectors"),
+            n_centroids=config.get("n_centroids", 256),
+            train_iterations=config.get("train_iterations", 20),
+        )
+    raise ValueError(
+        f"Unknown quantization type {kind!r}; expected one of {list(QUANTIZERS)}"
+    )
+
+
+def quantized_top_k(
+    quantizer: BaseQuantizer,
+    codes: np.ndarray,
+    query_vectors: np.ndarray,
+    candidates: np.ndarray,
+    top_k: int,
+    vectors: Optional[np.ndarray] = None,
+    rerank_factor: int = 4,
+) -> List[np.ndarray]:
+    """Top-k rows among ``candidates`` scored on codes, re-ranked on float32.
+
+    When ``vectors`` is given, the best ``top_k * rerank_factor`` rows by
+    approximate score are re-scored exactly before the final cut.
+    """
+    if len(candidates) == 0:
+        return [np.empty(0, dtype=np.int64) for _ in query_vectors]
+    approx = quantizer.scores(query_vectors, codes[candidates])
+    rerank = vectors is not None and rerank_factor > 1
+    shortlist = top_k * rerank_factor if rerank else top_k
+    results = []
+    for q, row_scores in enumerate(approx):
+        rows = candidates[top_k_indices(row_scores, shortlist)]
+        if rerank:
+            exact = vectors[rows] @ query_vectors[q]
+            rows = rows[top_k_indices(exact, top_k)]
+        results.append(rows)
+    return results
+
+
+def recall_at_k(exact: List[np.ndarray], approx: List[np.ndarray], k: int) -> float:
+    """Mean fraction of the exact top-k rows found in the approximate top-k"""
+    if not exact:
+        return 1.0
+    hits = [
+        len(set(e[:k].tolist()) & set(a[:k].tolist())) / max(1, min(k, len(e)))
+        for e, a in zip(exact, approx)
+    ]
+    return float(np.mean(hits))
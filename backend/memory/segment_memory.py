@@ -0,0 +1,721 @@
+"""
+filepath: backend/memory/segment_memory.py
+Vector memory stored as append-only, memory-mapped segment files.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from functools import cached_property
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .base import (
+    BaseMemory,
+    MemoryRecord,
+    check_filter,
+    check_search_mode,
+    matches_filter,
+    required_equalities,
+)
+from .blobs import load_blob, write_blob
+from .embedder import Embedder, top_k_indices
+from .io_executor import MemoryIOExecutor
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "MANIFEST.json"
+TOMBSTONES_FILE = "tombstones.log"
+ACTIVE_LOG_FILE = "active.jsonl"  # Used until the first seal names a new log
+
+
+def sorted_ids(ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """IDs as a sorted fixed-width byte array and the row each came from"""
+    keys = np.array([record_id.encode("utf-8") for record_id in ids], dtype=bytes)
+    order = np.argsort(keys, kind="stable")
+    return keys[order], order.astype(np.int64)
+
+
+def best_matches(
+    scores: np.ndarray,
+    rows: np.ndarray,
+    top_k: int,
+    filter: Optional[Dict[str, Any]] = None,
+    fields: Optional[Callable[[int], Dict[str, Any]]] = None,
+) -> List[Tuple[float, int]]:
+    """Best ``(score, row)`` pairs, at most ``top_k``, whose fields match ``filter``.
+
+    Candidates are checked in score order and the window widens until
+    ``top_k`` of them match or every row has been checked, so a selective
+    filter still fills the result.
+    """
+    if not filter:
+        return [(float(scores[i]), int(rows[i])) for i in top_k_indices(scores, top_k)]
+    matches: List[Tuple[float, int]] = []
+    checked: Set[int] = set()
+    fetch = top_k
+    while len(matches) < top_k and len(checked) < len(scores):
+        for i in top_k_indices(scores, fetch):
+            if i in checked:
+                continue
+            checked.add(i)
+            if matches_filter(fields(int(rows[i])), filter):
+                matches.append((float(scores[i]), int(rows[i])))
+                if len(matches) == top_k:
+                    break
+        fetch *= 4
+    return matches
+
+
+class Segment:
+    """Immutable, memory-mapped block of records.
+
+    Files per segment: ``vectors.npy`` (float32, normalized), ``ids``/``docs``/
+    ``meta`` blobs with ``*_offsets.npy`` index arrays, ``agent_codes.npy``
+    with ``agents.json`` for fast agent filtering, and ``id_keys.npy`` /
+    ``id_rows.npy``, the IDs in sorted order with their row numbers, for
+    binary-search lookups. Files are memory-mapped on first use and nothing is
+    decoded on open.
+    """
+
+    def __init__(self, path: str, size: Optional[int] = None):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.size = len(self.vectors) if size is None else size
+        self._id_keys: Optional[np.ndarray] = None
+        self._id_rows: Optional[np.ndarray] = None
+
+    @cached_property
+    def vectors(self) -> np.ndarray:
+        return np.load(os.path.join(self.path, "vectors.npy"), mmap_mode="r")
+
+    @cached_property
+    def agent_codes(self) -> np.ndarray:
+        return np.load(os.path.join(self.path, "agent_codes.npy"), mmap_mode="r")
+
+    @cached_property
+    def _blobs(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        return {name: load_blob(self.path, name) for name in ("ids", "docs", "meta")}
+
+    @cached_property
+    def _agent_index(self) -> Dict[Optional[str], int]:
+        with open(os.path.join(self.path, "agents.json"), encoding="utf-8") as f:
+            return {agent: code for code, agent in enumerate(json.load(f))}
+
+    @classmethod
+    def write(
+        cls,
+        path: str,
+        ids: List[str],
+        contents: List[str],
+        metadata: List[Dict[str, Any]],
+        vectors: np.ndarray,
+    ) -> "Segment":
+        """Write a new segment directory and open it read-only"""
+        tmp_path = path + ".tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, "vectors.npy"), np.asarray(vectors, np.float32))
+        write_blob(tmp_path, "ids", (i.encode("utf-8") for i in ids))
+        write_blob(tmp_path, "docs", (c.encode("utf-8") for c in contents))
+        write_blob(tmp_path, "meta", (json.dumps(m).encode("utf-8") for m in metadata))
+
+        agents: List[Optional[str]] = []
+        codes: Dict[Optional[str], int] = {}
+        agent_codes = np.empty(len(ids), dtype=np.int32)
+        for row, meta in enumerate(metadata):
+            agent_id = meta.get("agent_id")
+            if agent_id not in codes:
+                codes[agent_id] = len(agents)
+                agents.append(agent_id)
+            agent_codes[row] = codes[agent_id]
+        np.save(os.path.join(tmp_path, "agent_codes.npy"), agent_codes)
+        with open(os.path.join(tmp_path, "agents.json"), "w", encoding="utf-8") as f:
+            json.dump(agents, f)
+        id_keys, id_rows = sorted_ids(ids)
+        np.save(os.path.join(tmp_path, "id_keys.npy"), id_keys)
+        np.save(os.path.join(tmp_path, "id_rows.npy"), id_rows)
+
+        os.replace(tmp_path, path)
+        return cls(path, len(ids))
+
+    def blob(self, name: str, row: int) -> str:
+        data, offsets = self._blobs[name]
+        return bytes(data[offsets[row] : offsets[row + 1]]).decode("utf-8")
+
+    def ids(self) -> List[str]:
+        return [self.blob("ids", row) for row in range(self.size)]
+
+    def metadata(self, row: int) -> Dict[str, Any]:
+        return json.loads(self.blob("meta", row))
+
+    def rows_of(self, record_ids: List[str]) -> List[np.ndarray]:
+        """Rows holding each ID, found by binary search in the sorted ID index"""
+        if self._id_keys is None:
+            if os.path.exists(os.path.join(self.path, "id_keys.npy")):
+                self._id_rows = np.load(
+                    os.path.join(self.path, "id_rows.npy"), mmap_mode="r"
+                )
+                self._id_keys = np.load(
+                    os.path.join(self.path, "id_keys.npy"), mmap_mode="r"
+                )
+            else:
+                # Segments written before the index existed
+                self._id_keys, self._id_rows = sorted_ids(self.ids())
+        keys = self._id_keys
+        encoded = [record_id.encode("utf-8") for record_id in record_ids]
+        # Longer IDs cannot be present and would be truncated by the cast
+        fits = [len(key) <= keys.dtype.itemsize for key in encoded]
+        probe = np.array(
+            [key if fit else b"" for key, fit in zip(encoded, fits)], dtype=keys.dtype
+        )
+        starts = np.searchsorted(keys, probe, side="left")
+        ends = np.searchsorted(keys, probe, side="right")
+        return [
+            np.asarray(self._id_rows[start:end]) if fit else np.empty(0, np.int64)
+            for start, end, fit in zip(starts, ends, fits)
+        ]
+
+    def agent_mask(self, agent_id: Any) -> np.ndarray:
+        code = self._agent_index.get(agent_id)
+        if code is None:
+            return np.zeros(self.size, dtype=bool)
+        return np.asarray(self.agent_codes) == code
+
+
+class SegmentMemory(BaseMemory):
+    """Memory provider built on append-only, memory-mapped segments.
+
+    New records are appended to an active log and kept in RAM until
+    ``segment_size`` of them accumulate, then sealed into an immutable segment.
+    Opening the store only memory-maps existing segments, so restart time does
+    not grow with the number of records; IDs are looked up by binary search in
+    each segment's sorted ID index. Re-adding or deleting an ID tombstones
+    every earlier copy of it; tombstones are appended to a log and
+    ``compact()`` merges small segments and drops deleted rows.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.directory = config.get("persist_directory", ".segment_memory")
+        self.segment_size = config.get("segment_size", 8192)
+        self.compaction_min_size = config.get("compaction_min_size", 8192)
+        self.compaction_interval = config.get("compaction_interval", 300.0)
+        self.embedder = Embedder(
+            model_name=config.get("embedding_model_name", "all-MiniLM-L6-v2"),
+            embedding_function=config.get("embedding_function"),
+            query_cache_size=config.get("query_cache_size", 4096),
+        )
+        io_params = config.get("io_params", {})
+        self.io = MemoryIOExecutor(
+            max_workers=io_params.get("max_workers", 2),
+            max_pending=io_params.get("max_pending", 64),
+        )
+
+        self.segments: List[Segment] = []
+        self._next_segment = 1
+        # segment name -> deleted row numbers
+        self._tombstones: Dict[str, Set[int]] = {}
+        self._deleted_masks: Dict[str, np.ndarray] = {}
+
+        # Unsealed records, and id -> position in ``_active``
+        self._active: List[Dict[str, Any]] = []
+        self._active_vectors: List[np.ndarray] = []
+        self._active_rows: Dict[str, int] = {}
+        self._active_log = ACTIVE_LOG_FILE
+        self._compaction_task: Optional[asyncio.Task] = None
+        # Writes are serialized by _write_lock; _state_lock guards the swap of
+        # segments, deleted masks and the active buffer against concurrent reads
+        self._write_lock = asyncio.Lock()
+        self._state_lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._open()
+        logger.info(
+            f"Opened SegmentMemory at {self.directory} with {len(self.segments)} segments"
+        )
+
+    async def add(self, record: MemoryRecord) -> None:
+        """Append a single record"""
+        await self.add_many([record])
+
+    async def add_many(self, records: List[MemoryRecord]) -> None:
+        """Embed records in one batch and append them to the active segment"""
+        if not records:
+            return
+        try:
+            vectors = await self.io.run(
+                "embed", self.embedder.embed_documents, [r.content for r in records]
+            )
+            async with self._write_lock:
+                await self.io.run("append", self._append, records, vectors)
+        except Exception as e:
+            logger.error(f"Error adding {len(records)} records to SegmentMemory: {e}")
+
+    async def get(self, record_id: str) -> Optional[MemoryRecord]:
+        """Retrieve a record by ID"""
+        return await self.io.run("get", self._get, record_id)
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
+    ) -> List[MemoryRecord]:
+        """Brute-force cosine search across all segments"""
+        results = await self.search_many([query], top_k=top_k, filter=filter, mode=mode)
+        return results[0] if results else []
+
+    async def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
+    ) -> List[List[MemoryRecord]]:
+        """Score all queries against every segment in one pass"""
+        check_search_mode(mode)
+        check_filter(filter)
+        if not queries:
+            return []
+        try:
+            query_vectors = await self.io.run(
+                "embed", self.embedder.embed_queries, queries
+            )
+            return await self.io.run(
+                "query", self._search_vectors, query_vectors, top_k, filter
+            )
+        except Exception as e:
+            logger.error(f"Error searching SegmentMemory: {e}")
+            return [[] for _ in queries]
+
+    async def delete(self, record_id: str) -> bool:
+        """Remove the record and tombstone every sealed copy of it"""
+        async with self._write_lock:
+            return await self.io.run("delete", self._delete_ids, {record_id})
+
+    async def clear(self, agent_id: Optional[str] = None) -> None:
+        """Tombstone every record, optionally only those of one agent"""
+        async with self._write_lock:
+            await self.io.run("delete", self._clear, agent_id)
+        logger.info(
+            f"Cleared SegmentMemory{f' for agent {agent_id}' if agent_id else ''}"
+        )
+
+    async def flush(self) -> None:
+        """Seal the active records into a segment"""
+        async with self._write_lock:
+            await self.io.run("seal", self._seal)
+
+    def start_background_compaction(self) -> None:
+        """Periodically merge small segments while the event loop runs"""
+        if self._compaction_task is None or self._compaction_task.done():
+            self._compaction_task = asyncio.create_task(self._compaction_loop())
+
+    async def compact(self) -> int:
+        """Merge segments smaller than ``compaction_min_size``; returns merged count"""
+        async with self._write_lock:
+            return await self.io.run("compact", self._compact)
+
+    async def close(self) -> None:
+        """Seal active records, stop compaction and the I/O pool"""
+        if self._compaction_task and not self._compaction_task.done():
+            self._compaction_task.cancel()
+        await self.flush()
+        self.io.shutdown(wait=False)
+
+    # Storage internals (run on the I/O pool)
+
+    def _open(self) -> None:
+        manifest_path = os.path.join(self.directory, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            self._next_segment = manifest["next_segment"]
+            self._active_log = manifest.get("active_log", ACTIVE_LOG_FILE)
+            # Stores written before sizes were recorded read them from vectors.npy
+            sizes = manifest.get("sizes") or [None] * len(manifest["segments"])
+            self.segments = [
+                Segment(os.path.join(self.directory, name), size)
+                for name, size in zip(manifest["segments"], sizes)
+            ]
+
+        tombstones_path = os.path.join(self.directory, TOMBSTONES_FILE)
+        if os.path.exists(tombstones_path):
+            with open(tombstones_path, encoding="utf-8") as f:
+                for line in f:
+                    name, row = line.split()
+                    self._tombstones.setdefault(name, set()).add(int(row))
+        for segment in self.segments:
+            self._refresh_deleted_mask(segment)
+
+        active_path = os.path.join(self.directory, self._active_log)
+        if os.path.exists(active_path):
+            with open(active_path, encoding="utf-8") as f:
+                for number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(
+                            f"Skipping unreadable line {number} in {active_path}"
+                        )
+                        continue
+                    self._active_vectors.append(
+                        np.asarray(entry.pop("vector"), dtype=np.float32)
+                    )
+                    self._active.append(entry)
+        self._reindex_active()
+
+        # A crash between a seal's manifest swap and the removal of the old
+        # log leaves that log behind; its records are already in a segment
+        for name in os.listdir(self.directory):
+            if self._is_active_log(name) and name != self._active_log:
+                os.remove(os.path.join(self.directory, name))
+
+    def _get(self, record_id: str) -> Optional[MemoryRecord]:
+        with self._state_lock:
+            row = self._active_rows.get(record_id)
+            if row is not None:
+                return self._entry_to_record(self._active[row])
+        locations = self._sealed_locations([record_id])[record_id]
+        if not locations:
+            return None
+        segment, row = locations[-1]
+        return self._segment_record(segment, row)
+
+    def _append(self, records: List[MemoryRecord], vectors: np.ndarray) -> None:
+        entries = []
+        for record in records:
+            metadata = dict(record.metadata or {})
+            if record.agent_id:
+                metadata["agent_id"] = record.agent_id
+            entries.append(
+                {
+                    "id": record.id,
+                    "content": record.content,
+                    "metadata": metadata,
+                    "timestamp": record.timestamp.isoformat(),
+                }
+            )
+        # Re-adding an ID replaces every earlier version of it
+        self._delete_ids({e["id"] for e in entries})
+
+        with open(
+            os.path.join(self.directory, self._active_log), "a", encoding="utf-8"
+        ) as f:
+            for entry, vector in zip(entries, vectors):
+                f.write(json.dumps({**entry, "vector": vector.tolist()}) + "\n")
+        with self._state_lock:
+            for entry, vector in zip(entries, vectors):
+                row = self._active_rows.get(entry["id"])
+                if row is None:
+                    self._active_rows[entry["id"]] = len(self._active)
+                    self._active.append(entry)
+                    self._active_vectors.append(vector)
+                else:
+                    # The same ID twice in one batch: the later one wins
+                    self._active[row], self._active_vectors[row] = entry, vector
+        if len(self._active) >= self.segment_size:
+            self._seal()
+
+    def _seal(self) -> None:
+        if not self._active:
+            return
+        name = f"seg-{self._next_segment:06d}"
+        segment = Segment.write(
+            os.path.join(self.directory, name),
+            ids=[e["id"] for e in self._active],
+            contents=[e["content"] for e in self._active],
+            metadata=[
+                {**e["metadata"], "timestamp": e["timestamp"], "id": e["id"]}
+                for e in self._active
+            ],
+            vectors=np.stack(self._active_vectors),
+        )
+        self._refresh_deleted_mask(segment)
+        self._next_segment += 1
+        sealed_log = self._active_log
+        segments = self.segments + [segment]
+        # One manifest swap adds the segment and retires the log holding its
+        # records, so a crash can never leave both live
+        self._write_manifest(segments, f"active-{self._next_segment:06d}.jsonl")
+        with self._state_lock:
+            self.segments = segments
+            self._active, self._active_vectors, self._active_rows = [], [], {}
+        self._remove_log(sealed_log)
+        logger.info(f"Sealed segment {name} with {segment.size} records")
+
+    def _compact(self) -> int:
+        small = [s for s in self.segments if s.size < self.compaction_min_size]
+        if len(small) < 2:
+            return 0
+        ids, contents, metadata, vectors = [], [], [], []
+        small_names = {s.name for s in small}
+        for segment in small:
+            live = np.flatnonzero(~self._deleted_masks[segment.name])
+            for row in live:
+                ids.append(segment.blob("ids", row))
+                contents.append(segment.blob("docs", row))
+                metadata.append(segment.metadata(row))
+            vectors.append(np.asarray(segment.vectors[live]))
+
+        name = f"seg-{self._next_segment:06d}"
+        merged = Segment.write(
+            os.path.join(self.directory, name),
+            ids=ids,
+            contents=contents,
+            metadata=metadata,
+            vectors=np.concatenate(vectors),
+        )
+        self._refresh_deleted_mask(merged)
+        self._next_segment += 1
+        # Keep the merged segment where the first small one was so newer
+        # segments still win on duplicate IDs
+        segments: List[Segment] = []
+        for segment in self.segments:
+            if segment.name not in small_names:
+                segments.append(segment)
+            elif merged not in segments:
+                segments.append(merged)
+        self._write_manifest(segments, self._active_log)
+        with self._state_lock:
+            self.segments = segments
+            for name in small_names:
+                self._tombstones.pop(name, None)
+                self._deleted_masks.pop(name, None)
+        self._rewrite_tombstones()
+        for segment in small:
+            # Open mmaps stay valid after unlink on POSIX
+            shutil.rmtree(segment.path, ignore_errors=True)
+        logger.info(f"Compacted {len(small)} segments into {merged.name}")
+        return len(small)
+
+    def _clear(self, agent_id: Optional[str]) -> None:
+        keep = [
+            bool(agent_id) and e["metadata"].get("agent_id") != agent_id
+            for e in self._active
+        ]
+        with self._state_lock:
+            self._active_vectors = [
+                v for v, kept in zip(self._active_vectors, keep) if kept
+            ]
+            self._active = [e for e, kept in zip(self._active, keep) if kept]
+            self._reindex_active()
+        self._rewrite_active_log()
+        locations = []
+        for segment in self.segments:
+            mask = ~self._deleted_masks[segment.name]
+            if agent_id:
+                mask &= segment.agent_mask(agent_id)
+            locations.extend((segment.name, int(row)) for row in np.flatnonzero(mask))
+        self._add_tombstones(locations)
+
+    def _search_vectors(
+        self,
+        query_vectors: np.ndarray,
+        top_k: int,
+        filter: Optional[Dict[str, Any]],
+    ) -> List[List[MemoryRecord]]:
+        # Compaction and sealing swap these on another worker
+        with self._state_lock:
+            segments = list(self.segments)
+            deleted_masks = {s.name: self._deleted_masks[s.name] for s in segments}
+            active, active_vectors = list(self._active), list(self._active_vectors)
+
+        # agent_id equalities narrow rows via the per-segment agent column;
+        # anything else is checked on each candidate's metadata
+        agent_filters = [v for k, v in required_equalities(filter) if k == "agent_id"]
+        pushed_down = not filter or (set(filter) == {"agent_id"} and agent_filters)
+        residual = None if pushed_down else filter
+
+        candidates: List[List[Tuple[float, Any, int]]] = [[] for _ in query_vectors]
+        for segment in segments:
+            mask = ~deleted_masks[segment.name]
+            for agent_id in agent_filters:
+                mask &= segment.agent_mask(agent_id)
+            rows = np.flatnonzero(mask)
+            if len(rows) == 0:
+                continue
+            scores = query_vectors @ np.asarray(segment.vectors[rows]).T
+            for q, row_scores in enumerate(scores):
+                candidates[q].extend(
+                    (score, segment, row)
+                    for score, row in best_matches(
+                        row_scores, rows, top_k, residual, segment.metadata
+                    )
+                )
+
+        # The active buffer is in RAM, so filter it before scoring
+        active_rows = [
+            i for i, e in enumerate(active) if matches_filter(e["metadata"], filter)
+        ]
+        if active_rows:
+            vectors = np.stack([active_vectors[i] for i in active_rows])
+            scores = query_vectors @ vectors.T
+            for q, row_scores in enumerate(scores):
+                for i in top_k_indices(row_scores, top_k):
+                    candidates[q].append((float(row_scores[i]), None, active_rows[i]))
+
+        results = []
+        for query_candidates in candidates:
+            query_candidates.sort(key=lambda c: c[0], reverse=True)
+            results.append(
+                [
+                    (
+                        self._segment_record(segment, row)
+                        if segment is not None
+                        else self._entry_to_record(active[row])
+                    )
+                    for _, segment, row in query_candidates[:top_k]
+                ]
+            )
+        return results
+
+    def _add_tombstones(self, locations: List[Tuple[str, int]]) -> None:
+        if not locations:
+            return
+        with open(
+            os.path.join(self.directory, TOMBSTONES_FILE), "a", encoding="utf-8"
+        ) as f:
+            for name, row in locations:
+                f.write(f"{name} {row}\n")
+                self._tombstones.setdefault(name, set()).add(row)
+        for name in {name for name, _ in locations}:
+            segment = self._segment_by_name(name)
+            if segment:
+                self._refresh_deleted_mask(segment)
+
+    def _rewrite_tombstones(self) -> None:
+        path = os.path.join(self.directory, TOMBSTONES_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            for name, rows in self._tombstones.items():
+                for row in sorted(rows):
+                    f.write(f"{name} {row}\n")
+        os.replace(path + ".tmp", path)
+
+    def _rewrite_active_log(self) -> None:
+        path = os.path.join(self.directory, self._active_log)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            for entry, vector in zip(self._active, self._active_vectors):
+                f.write(json.dumps({**entry, "vector": vector.tolist()}) + "\n")
+        os.replace(path + ".tmp", path)
+
+    def _remove_log(self, name: str) -> None:
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _is_active_log(name: str) -> bool:
+        return name.startswith("active") and name.endswith(".jsonl")
+
+    def _write_manifest(self, segments: List[Segment], active_log: str) -> None:
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "segments": [s.name for s in segments],
+                    "sizes": [s.size for s in segments],
+                    "next_segment": self._next_segment,
+                    "active_log": active_log,
+                },
+                f,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        self._active_log = active_log
+
+    def _refresh_deleted_mask(self, segment: Segment) -> None:
+        mask = np.zeros(segment.size, dtype=bool)
+        rows = self._tombstones.get(segment.name)
+        if rows:
+            mask[list(rows)] = True
+        with self._state_lock:
+            self._deleted_masks[segment.name] = mask
+
+    def _delete_ids(self, record_ids: Set[str]) -> bool:
+        """Drop IDs from the active buffer and tombstone all their sealed rows"""
+        active_hits = [
+            self._active_rows[i] for i in record_ids if i in self._active_rows
+        ]
+        if active_hits:
+            with self._state_lock:
+                for row in sorted(active_hits, reverse=True):
+                    del self._active[row]
+                    del self._active_vectors[row]
+                self._reindex_active()
+            self._rewrite_active_log()
+        stale = [
+            (segment.name, row)
+            for locations in self._sealed_locations(record_ids).values()
+            for segment, row in locations
+        ]
+        self._add_tombstones(stale)
+        return bool(active_hits or stale)
+
+    def _sealed_locations(
+        self, record_ids: Iterable[str]
+    ) -> Dict[str, List[Tuple[Segment, int]]]:
+        """Live sealed rows of each ID, oldest segment first"""
+        record_ids = list(record_ids)
+        with self._state_lock:
+            segments = list(self.segments)
+            deleted_masks = {s.name: self._deleted_masks[s.name] for s in segments}
+        locations: Dict[str, List[Tuple[Segment, int]]] = {i: [] for i in record_ids}
+        if not record_ids:
+            return locations
+        for segment in segments:
+            deleted = deleted_masks[segment.name]
+            for record_id, rows in zip(record_ids, segment.rows_of(record_ids)):
+                locations[record_id].extend(
+                    (segment, int(row)) for row in rows if not deleted[row]
+                )
+        return locations
+
+    def _reindex_active(self) -> None:
+        self._active_rows = {e["id"]: row for row, e in enumerate(self._active)}
+
+    def _segment_by_name(self, name: str) -> Optional[Segment]:
+        return next((s for s in self.segments if s.name == name), None)
+
+    def _segment_record(self, segment: Segment, row: int) -> MemoryRecord:
+        metadata = segment.metadata(row)
+        timestamp = metadata.pop("timestamp")
+        record_id = metadata.pop("id")
+        agent_id = metadata.pop("agent_id", None)
+        return MemoryRecord(
+            id=record_id,
+            content=segment.blob("docs", row),
+            metadata=metadata,
+            timestamp=datetime.fromisoformat(timestamp),
+            agent_id=agent_id,
+        )
+
+    def _entry_to_record(self, entry: Dict[str, Any]) -> MemoryRecord:
+        metadata = dict(entry["metadata"])
+        agent_id = metadata.pop("agent_id", None)
+        return MemoryRecord(
+            id=entry["id"],
+            content=entry["content"],
+            metadata=metadata,
+            timestamp=datetime.fromisoformat(entry["timestamp"]),
+            agent_id=agent_id,
+        )
+
+    async def _compaction_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.compaction_interval)
+            try:
+                await self.compact()
+            except Exception as e:
+                logger.error(f"SegmentMemory compaction failed: {e}")
@@ -3,6 +3,24 @@ filepath: backend/orchestration/__init__.py
 Orchestration module initialization.
 """
 
-from .base import BaseOrchestrator
+from .base import BaseOrchestrator, FlowResult, Task
+from .cache import TaskResultCache, canonical_hash
+from .checkpoint import FlowCheckpoint, FlowCheckpointLog
+from .dag import LocalOrchestrator, orchestrator, topological_order
+from .state import FlowEvent, FlowStateStore, flow_state
 
-__all__ = ["BaseOrchestrator"]
+__all__ = [
+    "BaseOrchestrator",
+    "FlowResult",
+    "Task",
+    "LocalOrchestrator",
+    "topological_order",
+    "TaskResultCache",
+    "canonical_hash",
+    "FlowCheckpoint",
+    "FlowCheckpointLog",
+    "FlowEvent",
+    "FlowStateStore",
+    "flow_state",
+    "orchestrator",
+]
@@ -18,7 +18,9 @@ class Task(BaseModel):
     agent_id: str
     input_data: AgentInput
     dependencies: List[str] = []  # List of task_ids this task depends on
-    status: str = "pending"  # e.g., pending, running, completed, failed
+    status: str = (
+        "pending"  # e.g., pending, queued, running, completed, failed, skipped
+    )
 
 
 class FlowResult(BaseModel):
@@ -26,8 +28,10 @@ class FlowResult(BaseModel):
 
     flow_id: str
     outputs: Dict[str, AgentOutput]  # Map of task_id to AgentOutput
-    status: str = "completed"  # e.g., completed, failed, cancelled
+    status: str = "completed"  # e.g., completed, failed, cancelled, interrupted
     error_message: Optional[str] = None
+    task_status: Dict[str, str] = {}  # Map of task_id to final Task status
+    timings: Dict[str, Dict[str, float]] = {}  # Map of task_id to queued/run seconds
 
 
 class BaseOrchestrator(ABC):
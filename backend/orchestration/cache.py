@@ -0,0 +1,124 @@
+"""
+filepath: backend/orchestration/cache.py
+Memoization of task results keyed by agent, agent version and input hash.
+"""
+
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from ..agents import registry
+from ..llm import TieredCache
+
+
+def canonical_hash(value: Any) -> str:
+    """SHA-256 of a canonical JSON encoding (sorted keys, no whitespace)"""
+    if isinstance(value, BaseModel):
+        value = value.model_dump(mode="json")
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TaskResultCache:
+    """Bounded cache of task results that works without an orchestration server.
+
+    A result is keyed on the agent ID, the agent's version and a canonical
+    hash of the task's prompt and parameters (which carry upstream answers,
+    never timings), so bumping an agent's version invalidates its entries.
+    Results are JSON documents held in a ``TieredCache``: an in-memory LRU
+    and, when ``path`` is set, a SQLite file, so a retried flow can reuse the
+    outputs of tasks that already succeeded. Entries expire after ``ttl``
+    seconds.
+    """
+
+    # Bump when the key layout changes so entries written under an older
+    # layout are never served
+    key_schema = 2
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._cache = TieredCache(
+            max_entries=max_entries, path=path, table="task_result_cache"
+        )
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "TaskResultCache":
+        return cls(
+            max_entries=config.get("max_entries", 1024),
+            ttl=config.get("ttl"),
+            path=config.get("path"),
+        )
+
+    @classmethod
+    def key(
+        cls,
+        agent_id: str,
+        agent_version: Optional[str],
+        prompt: str,
+        parameters: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Cache key for running ``agent_id`` at ``agent_version`` on an input"""
+        digest = canonical_hash(
+            {
+                "schema": cls.key_schema,
+                "prompt": prompt,
+                "parameters": parameters or {},
+            }
+        )
+        return f"{agent_id}:{agent_version}:{digest}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for ``key`` or None"""
+        serialized = await self._cache.get(key)
+        return json.loads(serialized) if serialized is not None else None
+
+    async def set(self, key: str, result: Any) -> None:
+        """Cache a JSON-serializable result (or pydantic model) under ``key``"""
+        if isinstance(result, BaseModel):
+            result = result.model_dump(mode="json")
+        expires_at = time.time() + self.ttl if self.ttl else float("inf")
+        await self._cache.set(key, json.dumps(result, default=str), expires_at)
+
+    async def get_or_run(
+        self,
+        agent_id: str,
+        prompt: str,
+        parameters: Optional[Dict[str, Any]],
+        run: Callable[[], Awaitable[Any]],
+    ) -> Tuple[Any, bool]:
+        """Return ``(result, cached)`` for running ``agent_id`` on this input.
+
+        The cached result of the agent's current version is reused when there
+        is one; otherwise ``run()`` is awaited and its result cached.
+        """
+        version = (
+            registry.agent_version(agent_id) if registry.has_agent(agent_id) else None
+        )
+        key = self.key(agent_id, version, prompt, parameters)
+        cached = await self.get(key)
+        if cached is not None:
+            return cached, True
+        result = await run()
+        await self.set(key, result)
+        return result, False
+
+    def invalidate(self, agent_id: Optional[str] = None) -> None:
+        """Drop every entry, or only those for ``agent_id``"""
+        self._cache.invalidate(f"{agent_id}:" if agent_id else "")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit counters and the overall hit ratio"""
+        return self._cache.stats()
+
+    def close(self) -> None:
+        """Close the on-disk store"""
+        self._cache.close()
@@ -0,0 +1,270 @@
+"""
+filepath: backend/orchestration/checkpoint.py
+Append-only checkpoint log of flow task outputs for resuming after a crash.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from .base import Task
+
+logger = logging.getLogger(__name__)
+
+
+class FlowCheckpoint(BaseModel):
+    """What the log knows about one flow"""
+
+    flow_id: str
+    tasks: List[Task] = []
+    outputs: Dict[str, Any] = {}  # Map of task_id to serialized output
+    status: str = "running"
+
+
+class FlowCheckpointLog:
+    """JSONL log of flow starts, completed task outputs and flow outcomes.
+
+    Every record is one line appended to ``path`` and flushed to the OS at
+    once. ``fsync`` is batched: it runs once ``sync_every`` records or
+    ``sync_interval`` seconds have accumulated, when a flow finishes and
+    whenever ``sync()`` is called. A crash can therefore lose at most the last
+    unsynced batch, and a torn final line is skipped on load. The log is
+    replayed into an index when opened, so lookups never touch the disk.
+
+    Only flows that may still be resumed are kept: completed flows are
+    forgotten as soon as they finish, and at most ``max_flows`` failed,
+    cancelled or interrupted flows are retained, oldest evicted first. Once
+    the log holds at least ``compact_min_records`` records and more than half
+    of them are dead, it is rewritten with just the retained flows.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sync_every: int = 16,
+        sync_interval: float = 1.0,
+        max_flows: int = 1000,
+        compact_min_records: int = 1000,
+    ):
+        self.path = path
+        self.sync_every = max(1, sync_every)
+        self.sync_interval = sync_interval
+        self.max_flows = max_flows
+        self.compact_min_records = compact_min_records
+        self._flows: Dict[str, FlowCheckpoint] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()  # In finish order
+        self._records = 0  # Lines in the log file
+        self._lock = threading.Lock()
+        torn = self._load()
+        self._file = open(path, "a", encoding="utf-8")
+        if torn:
+            # Terminate a partially written last line so new records parse
+            self._file.write("\n")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._maybe_compact()
+
+    def begin_flow(self, flow_id: str, tasks: Optional[List[Task]] = None) -> None:
+        """Record that a flow started, with its task graph if it has one"""
+        tasks = tasks or []
+        self._append(
+            {
+                "type": "flow",
+                "flow_id": flow_id,
+                "tasks": [task.model_dump(mode="json") for task in tasks],
+            }
+        )
+        self._start(flow_id, tasks)
+
+    def record_output(self, flow_id: str, task_id: str, output: Any) -> None:
+        """Checkpoint a completed task's output"""
+        if isinstance(output, BaseModel):
+            output = output.model_dump(mode="json")
+        self._append(
+            {"type": "task", "flow_id": flow_id, "task_id": task_id, "output": output}
+        )
+        flow = self._flows.setdefault(flow_id, FlowCheckpoint(flow_id=flow_id))
+        flow.outputs[task_id] = output
+
+    def finish_flow(self, flow_id: str, status: str) -> None:
+        """Record a flow's outcome and sync the log"""
+        self._append({"type": "status", "flow_id": flow_id, "status": status})
+        self._finish(flow_id, status)
+        self.sync()
+        self._maybe_compact()
+
+    def get(self, flow_id: str) -> Optional[FlowCheckpoint]:
+        """Checkpointed state of a flow, or None if it was never logged"""
+        return self._flows.get(flow_id)
+
+    def output(self, flow_id: str, task_id: str) -> Optional[Any]:
+        """Checkpointed output of one task, or None if it did not complete"""
+        flow = self._flows.get(flow_id)
+        return flow.outputs.get(task_id) if flow else None
+
+    def incomplete_flows(self) -> List[str]:
+        """IDs of flows that never completed, e.g. because the process died"""
+        return [
+            flow_id
+            for flow_id, flow in self._flows.items()
+            if flow.status != "completed"
+        ]
+
+    def interrupted_flows(self) -> List[str]:
+        """IDs of flows cut off by a crash (still running) or by a shutdown"""
+        return [
+            flow_id
+            for flow_id, flow in self._flows.items()
+            if flow.status in ("running", "interrupted")
+        ]
+
+    def sync(self) -> None:
+        """Force buffered records to disk"""
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        """Sync and close the log file"""
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+    def compact(self) -> None:
+        """Rewrite the log with only the flows that are still retained"""
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in self._retained_records():
+                    f.write(json.dumps(record, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._records = sum(self._record_count(f) for f in self._flows.values())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+        logger.info(f"Compacted checkpoint log {self.path} to {self._records} records")
+
+    def _start(self, flow_id: str, tasks: List[Task]) -> None:
+        self._finished.pop(flow_id, None)
+        existing = self._flows.get(flow_id)
+        if existing is None:
+            self._flows[flow_id] = FlowCheckpoint(flow_id=flow_id, tasks=tasks)
+        else:
+            # A resumed flow keeps the outputs it already has
+            existing.status = "running"
+            if tasks:
+                existing.tasks = tasks
+
+    def _finish(self, flow_id: str, status: str) -> None:
+        if status == "completed":
+            # Nothing left to resume
+            self._flows.pop(flow_id, None)
+            self._finished.pop(flow_id, None)
+            return
+        flow = self._flows.setdefault(flow_id, FlowCheckpoint(flow_id=flow_id))
+        flow.status = status
+        self._finished.pop(flow_id, None)
+        self._finished[flow_id] = None
+        while len(self._finished) > self.max_flows:
+            evicted, _ = self._finished.popitem(last=False)
+            self._flows.pop(evicted, None)
+
+    def _maybe_compact(self) -> None:
+        live = sum(self._record_count(flow) for flow in self._flows.values())
+        if self._records >= self.compact_min_records and self._records > 2 * live:
+            self.compact()
+
+    @staticmethod
+    def _record_count(flow: FlowCheckpoint) -> int:
+        return 1 + len(flow.outputs) + (flow.status != "running")
+
+    def _retained_records(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        records = []
+        for flow in self._flows.values():
+            records.append(
+                {
+                    "type": "flow",
+                    "flow_id": flow.flow_id,
+                    "tasks": [task.model_dump(mode="json") for task in flow.tasks],
+                    "ts": now,
+                }
+            )
+            for task_id, output in flow.outputs.items():
+                records.append(
+                    {
+                        "type": "task",
+                        "flow_id": flow.flow_id,
+                        "task_id": task_id,
+                        "output": output,
+                        "ts": now,
+                    }
+                )
+            if flow.status != "running":
+                records.append(
+                    {
+                        "type": "status",
+                        "flow_id": flow.flow_id,
+                        "status": flow.status,
+                        "ts": now,
+                    }
+                )
+        return records
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        record["ts"] = time.time()
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._records += 1
+            self._unsynced += 1
+            if (
+                self._unsynced >= self.sync_every
+                or time.monotonic() - self._last_sync >= self.sync_interval
+            ):
+                self._sync()
+
+    def _sync(self) -> None:
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _load(self) -> bool:
+        """Replay the log; returns whether its last line is unterminated"""
+        if not os.path.exists(self.path):
+            return False
+        line = ""
+        with open(self.path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(
+                        f"Skipping unreadable checkpoint line {number} in {self.path}"
+                    )
+                    continue
+                self._records += 1
+                flow_id = record.get("flow_id")
+                kind = record.get("type")
+                if kind == "flow":
+                    tasks = [Task(**task) for task in record.get("tasks") or []]
+                    self._start(flow_id, tasks)
+                elif kind == "task":
+                    flow = self._flows.setdefault(
+                        flow_id, FlowCheckpoint(flow_id=flow_id)
+                    )
+                    flow.outputs[record["task_id"]] = record["output"]
+                elif kind == "status":
+                    self._finish(flow_id, record["status"])
+        return bool(line) and not line.endswith("\n")
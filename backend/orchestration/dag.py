@@ -0,0 +1,433 @@
+"""
+filepath: backend/orchestration/dag.py
+In-process orchestrator that runs Task graphs with bounded parallelism.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..agents import AgentInput, AgentOutput, registry
+from .base import BaseOrchestrator, FlowResult, Task
+from .cache import TaskResultCache
+from .checkpoint import FlowCheckpointLog
+from .state import FlowStateStore, flow_state
+
+logger = logging.getLogger(__name__)
+
+TaskRunner = Callable[[Task], Awaitable[AgentOutput]]
+
+
+def topological_order(tasks: List[Task]) -> List[str]:
+    """Task IDs in dependency order; raises ValueError on unknown IDs or cycles"""
+    by_id: Dict[str, Task] = {}
+    for task in tasks:
+        if task.task_id in by_id:
+            raise ValueError(f"Duplicate task_id: {task.task_id}")
+        by_id[task.task_id] = task
+    indegree = {task_id: 0 for task_id in by_id}
+    dependents: Dict[str, List[str]] = {task_id: [] for task_id in by_id}
+    for task in tasks:
+        for dependency in task.dependencies:
+            if dependency not in by_id:
+                raise ValueError(
+                    f"Task {task.task_id} depends on unknown task {dependency}"
+                )
+            indegree[task.task_id] += 1
+            dependents[dependency].append(task.task_id)
+
+    order = []
+    ready = [task_id for task_id, degree in indegree.items() if degree == 0]
+    while ready:
+        task_id = ready.pop()
+        order.append(task_id)
+        for dependent in dependents[task_id]:
+            indegree[dependent] -= 1
+            if indegree[dependent] == 0:
+                ready.append(dependent)
+    if len(order) != len(by_id):
+        cyclic = sorted(task_id for task_id, degree in indegree.items() if degree)
+        raise ValueError(f"Dependency cycle among tasks: {cyclic}")
+    return order
+
+
+class _FlowRun:
+    """Book-keeping for one flow while it runs and after it finishes"""
+
+    def __init__(self, flow_id: str, tasks: List[Task]):
+        self.flow_id = flow_id
+        self.tasks: Dict[str, Task] = {t.task_id: t.model_copy() for t in tasks}
+        self.outputs: Dict[str, AgentOutput] = {}
+        self.errors: Dict[str, str] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.status = "pending"
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.runner: Optional[asyncio.Task] = None
+        self.cancel_requested = False
+        self.interrupt_requested = False
+
+    def result(self) -> FlowResult:
+        error_message = None
+        if self.errors:
+            error_message = "; ".join(
+                f"{task_id}: {error}" for task_id, error in self.errors.items()
+            )
+        return FlowResult(
+            flow_id=self.flow_id,
+            outputs=dict(self.outputs),
+            status=self.status,
+            error_message=error_message,
+            task_status={t.task_id: t.status for t in self.tasks.values()},
+            timings=dict(self.timings),
+        )
+
+
+class LocalOrchestrator(BaseOrchestrator):
+    """Runs a flow's Tasks in-process as a DAG.
+
+    A task starts as soon as all of its dependencies have completed, with at
+    most ``max_parallelism`` tasks running at once. Each task sees its
+    dependencies' answers in ``parameters["upstream"]``. When a task fails,
+    every task downstream of it is skipped; with ``fail_fast`` the running
+    tasks are cancelled too. Per-task queue wait and run time are recorded.
+
+    With a ``result_cache``, successful outputs are memoized by agent, agent
+    version and input (including upstream answers), so re-running a failed or
+    interrupted flow only executes the tasks that did not finish.
+
+    With a ``checkpoint`` log, every completed task output is appended to disk
+    as it finishes, and ``resume_flow`` restarts a flow that failed, was
+    cancelled or died with the process, running only the unfinished tasks.
+    ``shutdown()`` stops running flows as "interrupted", so
+    ``resume_interrupted_flows()`` picks them up after a restart.
+
+    With a ``state_store``, every task and flow status change is published
+    there, so callers can look flows up or subscribe to their events.
+    """
+
+    def __init__(
+        self,
+        max_parallelism: int = 4,
+        fail_fast: bool = False,
+        task_runner: Optional[TaskRunner] = None,
+        max_flows: int = 1000,
+        result_cache: Optional[TaskResultCache] = None,
+        checkpoint: Optional[FlowCheckpointLog] = None,
+        state_store: Optional[FlowStateStore] = None,
+    ):
+        if max_parallelism < 1:
+            raise ValueError("max_parallelism must be at least 1")
+        self.max_parallelism = max_parallelism
+        self.fail_fast = fail_fast
+        self.task_runner = task_runner or self.run_agent_task
+        self.max_flows = max_flows
+        self.result_cache = result_cache
+        self.checkpoint = checkpoint
+        self.state_store = state_store
+        self._flows: Dict[str, _FlowRun] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()  # In finish order
+
+    async def run_flow(
+        self, tasks: List[Task], flow_id: Optional[str] = None
+    ) -> FlowResult:
+        """Run the tasks to completion and return their outputs"""
+        flow_id = self.start_flow(tasks, flow_id)
+        return await self._wait(self._flows[flow_id])
+
+    def start_flow(self, tasks: List[Task], flow_id: Optional[str] = None) -> str:
+        """Validate the graph and start running it in the background"""
+        topological_order(tasks)  # Fail fast on unknown IDs and cycles
+        flow_id = flow_id or str(uuid.uuid4())
+        if flow_id in self._flows:
+            raise ValueError(f"Flow {flow_id} already exists")
+        if self.checkpoint:
+            self.checkpoint.begin_flow(flow_id, tasks)
+        self._launch(_FlowRun(flow_id, tasks))
+        return flow_id
+
+    async def resume_flow(self, flow_id: str) -> FlowResult:
+        """Re-run a checkpointed flow, skipping tasks that already completed"""
+        self.restart_flow(flow_id)
+        return await self._wait(self._flows[flow_id])
+
+    def restart_flow(self, flow_id: str) -> str:
+        """Start resuming a checkpointed flow in the background"""
+        if self.checkpoint is None:
+            raise ValueError("Resuming flows requires a checkpoint log")
+        current = self._flows.get(flow_id)
+        if current is not None and current.runner and not current.runner.done():
+            raise ValueError(f"Flow {flow_id} is still running")
+        saved = self.checkpoint.get(flow_id)
+        if saved is None or not saved.tasks:
+            raise ValueError(f"No checkpoint for flow {flow_id}")
+
+        flow = _FlowRun(flow_id, saved.tasks)
+        for task_id, output in saved.outputs.items():
+            if task_id in flow.tasks:
+                flow.outputs[task_id] = AgentOutput.model_validate(output)
+                flow.tasks[task_id].status = "completed"
+        logger.info(
+            f"Resuming flow {flow_id}: {len(flow.outputs)}/{len(flow.tasks)} "
+            "tasks already completed"
+        )
+        self._flows.pop(flow_id, None)
+        self._finished.pop(flow_id, None)
+        self.checkpoint.begin_flow(flow_id)
+        self._launch(flow)
+        return flow_id
+
+    def resume_interrupted_flows(self) -> List[str]:
+        """Restart every checkpointed flow that was running when the process died"""
+        if self.checkpoint is None:
+            return []
+        resumed = []
+        for flow_id in self.checkpoint.interrupted_flows():
+            if flow_id in self._flows:
+                continue
+            if not self.checkpoint.get(flow_id).tasks:
+                # Workflow runs have no task graph; they resume when the
+                # workflow is called again with the same flow_id
+                logger.info(f"Flow {flow_id} was interrupted and has no task graph")
+                continue
+            try:
+                resumed.append(self.restart_flow(flow_id))
+            except ValueError as e:
+                logger.warning(f"Cannot resume flow {flow_id}: {e}")
+        return resumed
+
+    async def get_flow_status(self, flow_id: str) -> Optional[Dict[str, Any]]:
+        """Status, per-task state and timings of a running or finished flow"""
+        flow = self._flows.get(flow_id)
+        if flow is None:
+            # Forgotten here, but the state store may keep flows for longer
+            return self.state_store.get(flow_id) if self.state_store else None
+        result = flow.result()
+        return {
+            "flow_id": flow_id,
+            "status": flow.status,
+            "tasks": result.task_status,
+            "timings": result.timings,
+            "errors": dict(flow.errors),
+            "started_at": flow.started_at,
+            "finished_at": flow.finished_at,
+        }
+
+    async def cancel_flow(self, flow_id: str) -> bool:
+        """Cancel a running flow; its running tasks are cancelled"""
+        flow = self._flows.get(flow_id)
+        if flow is None or flow.runner is None or flow.runner.done():
+            return False
+        flow.cancel_requested = True
+        flow.runner.cancel()
+        return True
+
+    async def shutdown(self) -> List[str]:
+        """Interrupt every running flow and wait for it to stop.
+
+        Interrupted flows are checkpointed as resumable rather than
+        cancelled. Returns their IDs.
+        """
+        running = [
+            flow
+            for flow in self._flows.values()
+            if flow.runner is not None and not flow.runner.done()
+        ]
+        for flow in running:
+            flow.interrupt_requested = True
+            flow.runner.cancel()
+        if running:
+            await asyncio.gather(
+                *(flow.runner for flow in running), return_exceptions=True
+            )
+        return [flow.flow_id for flow in running]
+
+    async def run_agent_task(self, task: Task) -> AgentOutput:
+        """Default task runner: run the task's agent from the registry"""
+        async with registry.lease(task.agent_id) as agent:
+            return await agent.run(task.input_data)
+
+    def _launch(self, flow: _FlowRun) -> None:
+        self._flows[flow.flow_id] = flow
+        self._evict_finished()
+        if self.state_store:
+            self.state_store.start_flow(
+                flow.flow_id, {t.task_id: t.status for t in flow.tasks.values()}
+            )
+        flow.runner = asyncio.create_task(self._execute(flow))
+
+    async def _wait(self, flow: _FlowRun) -> FlowResult:
+        try:
+            await asyncio.shield(flow.runner)
+        except asyncio.CancelledError:
+            if not (flow.cancel_requested or flow.interrupt_requested):
+                # The caller was cancelled, not the flow: stop the flow too
+                flow.runner.cancel()
+                raise
+        return flow.result()
+
+    async def _execute(self, flow: _FlowRun) -> None:
+        flow.status = "running"
+        tasks = flow.tasks
+        # Tasks restored from a checkpoint are already satisfied
+        remaining = {
+            t.task_id: sum(tasks[d].status != "completed" for d in set(t.dependencies))
+            for t in tasks.values()
+        }
+        dependents: Dict[str, List[str]] = {task_id: [] for task_id in tasks}
+        for task in tasks.values():
+            for dependency in set(task.dependencies):
+                dependents[dependency].append(task.task_id)
+
+        slots = asyncio.Semaphore(self.max_parallelism)
+        running: Dict[asyncio.Task, str] = {}
+
+        def launch(task_id: str) -> None:
+            self._set_status(flow, tasks[task_id], "queued")
+            runner = asyncio.create_task(self._run_task(flow, tasks[task_id], slots))
+            running[runner] = task_id
+
+        def skip_downstream(task_id: str) -> None:
+            pending = list(dependents[task_id])
+            while pending:
+                dependent = pending.pop()
+                if tasks[dependent].status == "pending":
+                    self._set_status(
+                        flow, tasks[dependent], "skipped", f"{task_id} did not complete"
+                    )
+                    pending.extend(dependents[dependent])
+
+        try:
+            for task_id, count in remaining.items():
+                if count == 0 and tasks[task_id].status == "pending":
+                    launch(task_id)
+            while running:
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for runner in done:
+                    task_id = running.pop(runner)
+                    if tasks[task_id].status != "completed":
+                        skip_downstream(task_id)
+                        if self.fail_fast:
+                            raise _FlowFailed(task_id)
+                        continue
+                    for dependent in dependents[task_id]:
+                        remaining[dependent] -= 1
+                        if (
+                            remaining[dependent] == 0
+                            and tasks[dependent].status == "pending"
+                        ):
+                            launch(dependent)
+            flow.status = "failed" if flow.errors else "completed"
+        except _FlowFailed:
+            flow.status = "failed"
+        except asyncio.CancelledError:
+            flow.status = "interrupted" if flow.interrupt_requested else "cancelled"
+            if not (flow.cancel_requested or flow.interrupt_requested):
+                raise
+        finally:
+            for runner in running:
+                runner.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            for task in tasks.values():
+                if task.status in ("pending", "queued", "running"):
+                    self._set_status(flow, task, "cancelled")
+            flow.finished_at = time.time()
+            self._finished[flow.flow_id] = None
+            if self.checkpoint:
+                self.checkpoint.finish_flow(flow.flow_id, flow.status)
+            if self.state_store:
+                self.state_store.finish_flow(
+                    flow.flow_id, flow.status, flow.result().error_message
+                )
+            logger.info(
+                f"Flow {flow.flow_id} {flow.status} in "
+                f"{flow.finished_at - flow.started_at:.2f}s"
+            )
+
+    async def _run_task(
+        self, flow: _FlowRun, task: Task, slots: asyncio.Semaphore
+    ) -> None:
+        queued = time.monotonic()
+        async with slots:
+            started = time.monotonic()
+            self._set_status(flow, task, "running")
+            try:
+                output = await self._run_or_reuse(self._with_upstream(flow, task))
+                flow.outputs[task.task_id] = output
+                self._set_status(flow, task, "completed")
+                if self.checkpoint:
+                    self.checkpoint.record_output(flow.flow_id, task.task_id, output)
+            except asyncio.CancelledError:
+                self._set_status(flow, task, "cancelled")
+                raise
+            except Exception as e:
+                logger.error(f"Task {task.task_id} in flow {flow.flow_id} failed: {e}")
+                flow.errors[task.task_id] = str(e)
+                self._set_status(flow, task, "failed", str(e))
+            finally:
+                finished = time.monotonic()
+                flow.timings[task.task_id] = {
+                    "queued_seconds": started - queued,
+                    "run_seconds": finished - started,
+                }
+
+    def _set_status(
+        self, flow: _FlowRun, task: Task, status: str, detail: Optional[str] = None
+    ) -> None:
+        task.status = status
+        if self.state_store:
+            self.state_store.update_task(flow.flow_id, task.task_id, status, detail)
+
+    async def _run_or_reuse(self, task: Task) -> AgentOutput:
+        if self.result_cache is None:
+            return await self.task_runner(task)
+        output, cached = await self.result_cache.get_or_run(
+            task.agent_id,
+            task.input_data.prompt,
+            task.input_data.parameters,
+            lambda: self.task_runner(task),
+        )
+        if cached:
+            return AgentOutput.model_validate(output).model_copy(
+                update={"cached": True}
+            )
+        return output
+
+    @staticmethod
+    def _with_upstream(flow: _FlowRun, task: Task) -> Task:
+        """Copy of the task with its dependencies' answers in its parameters"""
+        if not task.dependencies:
+            return task
+        parameters = dict(task.input_data.parameters or {})
+        parameters["upstream"] = {
+            dependency: flow.outputs[dependency].answer
+            for dependency in task.dependencies
+        }
+        input_data = AgentInput(prompt=task.input_data.prompt, parameters=parameters)
+        return task.model_copy(update={"input_data": input_data})
+
+    def _evict_finished(self) -> None:
+        while len(self._flows) > self.max_flows and self._finished:
+            flow_id, _ = self._finished.popitem(last=False)
+            del self._flows[flow_id]
+
+
+class _FlowFailed(Exception):
+    """Raised inside a fail-fast flow when a task fails"""
+
+    def __init__(self, task_id: str):
+        super().__init__(task_id)
+        self.task_id = task_id
+
+
+# Global orchestrator instance. Its result cache is in-memory until main.py
+# configures a persistent one.
+orchestrator = LocalOrchestrator(
+    state_store=flow_state, result_cache=TaskResultCache(ttl=3600.0)
+)
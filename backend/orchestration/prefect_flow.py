@@ -5,8 +5,18 @@ Handles agent coordination, memory management, and task tracking.
 """
 
 import asyncio
+import logging
+import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..agents import AgentInput, registry
+from ..memory import BaseMemory, ChromaDBMemory, MemoryRecord
+from .cache import TaskResultCache
+from .checkpoint import FlowCheckpointLog
+
+logger = logging.getLogger(__name__)
 
 # These imports will be used when actually implementing
 # import prefect
@@ -27,46 +37,120 @@ def flow_placeholder(func):
 
 
 @task_placeholder
-async def agent_task(agent_id: str, input_data: Dict[str, Any], memory_interface=None):
+async def agent_task(agent_id: str, input_data: Dict[str, Any]):
     """
     Task for running an agent
 
     Parameters:
         agent_id: str - The ID of the agent to run
         input_data: Dict[str, Any] - The input data for the agent
-        memory_interface - The memory interface to use
 
     Returns:
         Dict[str, Any] - The agent's output
     """
-    # TODO: Implement actual agent execution
-    print(f"Running agent {agent_id} with input: {input_data}")
-
-    # For stub, return dummy data
-    return {
-        "answer": f"Response from {agent_id}",
-        "confidence": 0.8,
-        "execution_time": 1.2,
-    }
+    agent_input = AgentInput(
+        prompt=input_data["prompt"], parameters=input_data.get("parameters")
+    )
+    # Pooled agents (and their LLM/memory) are built on first use
+    async with registry.lease(agent_id) as agent:
+        output = await agent.run(agent_input)
+    return output.model_dump(mode="json")
 
 
 @task_placeholder
-async def store_result(result: Dict[str, Any], memory_interface=None):
+async def store_results(
+    results: List[Dict[str, Any]],
+    agent_ids: List[str],
+    memory_interface: BaseMemory,
+    flow_id: str,
+    task_ids: List[str],
+):
     """
-    Task for storing a result in memory
+    Task for storing a flow's results in memory with one batched write
+
+    Record IDs are derived from the flow and task IDs, so writing the same
+    flow again (e.g. after resuming it) replaces its records, not duplicates.
 
     Parameters:
-        result: Dict[str, Any] - The result to store
-        memory_interface - The memory interface to use
+        results: List[Dict[str, Any]] - The results to store
+        agent_ids: List[str] - The ID of the agent that produced each result
+        memory_interface: BaseMemory - The memory interface to use
+        flow_id: str - The ID of the flow the results belong to
+        task_ids: List[str] - The flow-local task ID of each result
+
+    Returns:
+        List[str] - The IDs of the stored records, in the order of ``results``
+    """
+    records = [
+        MemoryRecord(
+            id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"flow/{flow_id}/{task_id}")),
+            content=str(result.get("answer", "")),
+            metadata={
+                "confidence": result.get("confidence"),
+                "execution_time": result.get("execution_time"),
+                "flow_id": flow_id,
+                "task_id": task_id,
+            },
+            agent_id=agent_id,
+        )
+        for result, agent_id, task_id in zip(results, agent_ids, task_ids)
+    ]
+    await memory_interface.add_many(records)
+    return [record.id for record in records]
+
+
+async def _memory_interface(
+    memory_config: Optional[Dict[str, Any]],
+) -> Tuple[Optional[BaseMemory], bool]:
+    """The flow's memory and whether the flow owns (and must close) it"""
+    if memory_config:
+        return ChromaDBMemory(config=memory_config), True
+    try:
+        return await registry.get_dependency("memory"), False
+    except ValueError:
+        return None, False
+
+
+async def cached_agent_task(
+    agent_id: str,
+    input_data: Dict[str, Any],
+    result_cache: Optional[TaskResultCache] = None,
+):
+    """
+    Run an agent, reusing its cached result for an identical input
+
+    Parameters:
+        agent_id: str - The ID of the agent to run
+        input_data: Dict[str, Any] - The input data for the agent
+        result_cache: Optional[TaskResultCache] - Cache of prior task results
 
     Returns:
-        str - The ID of the stored record
+        Dict[str, Any] - The agent's output
     """
-    # TODO: Implement actual memory storage
-    print(f"Storing result in memory: {result}")
+    if result_cache is None:
+        return await agent_task(agent_id, input_data)
+    result, _ = await result_cache.get_or_run(
+        agent_id,
+        input_data["prompt"],
+        input_data.get("parameters"),
+        lambda: agent_task(agent_id, input_data),
+    )
+    return result
+
 
-    # For stub, return dummy record ID
-    return "record-12345"
+def _task_id(supporting_agent_id: str) -> str:
+    """Flow-local task ID of a supporting agent's run"""
+    return f"supporting:{supporting_agent_id}"
+
+
+async def _run_supporting_agent(
+    run: Callable[[], Awaitable[Dict[str, Any]]],
+    semaphore: asyncio.Semaphore,
+    timeout: Optional[float],
+):
+    """Run one supporting agent under the fan-out cap and timeout"""
+    async with semaphore:
+        return await asyncio.wait_for(run(), timeout)
 
 
 @flow_placeholder
@@ -75,47 +159,133 @@ async def agent_workflow(
     input_data: Dict[str, Any],
     supporting_agents: Optional[List[str]] = None,
     memory_config: Optional[Dict[str, Any]] = None,
+    max_concurrency: int = 4,
+    agent_timeout: Optional[float] = None,
+    result_cache: Optional[TaskResultCache] = None,
+    checkpoint: Optional[FlowCheckpointLog] = None,
+    flow_id: Optional[str] = None,
 ):
     """
     Workflow for orchestrating agent execution
 
+    Supporting agents run concurrently, at most ``max_concurrency`` at a time,
+    each bounded by ``agent_timeout`` seconds. Agents that fail or time out are
+    reported in ``errors`` and the remaining results are still returned. All
+    results are written to memory in one batch at the end of the flow, using
+    ``memory_config`` if given or else the registry's shared memory. With a
+    ``result_cache``, agents that already produced a result for the same input
+    are not run again, so a retried flow only recomputes what failed. With a
+    ``checkpoint`` log, each agent's result is persisted as soon as it
+    finishes; calling the workflow again with the same ``flow_id`` after a
+    crash reuses those results instead of running the agents again.
+
     Parameters:
         primary_agent_id: str - The ID of the primary agent
         input_data: Dict[str, Any] - The input data for the workflow
         supporting_agents: Optional[List[str]] - IDs of supporting agents
         memory_config: Optional[Dict[str, Any]] - Memory configuration
+        max_concurrency: int - Maximum number of supporting agents running at once
+        agent_timeout: Optional[float] - Per supporting agent timeout in seconds
+        result_cache: Optional[TaskResultCache] - Cache of prior task results
+        checkpoint: Optional[FlowCheckpointLog] - Log of completed agent results
+        flow_id: Optional[str] - ID of the flow, to resume from ``checkpoint``
 
     Returns:
         Dict[str, Any] - The workflow results
     """
-    # TODO: Initialize memory interface
-    memory_interface = None
-
-    # Run primary agent
-    primary_result = await agent_task(primary_agent_id, input_data, memory_interface)
-
-    # Store result in memory
-    record_id = await store_result(primary_result, memory_interface)
-
-    # Run supporting agents if needed
-    supporting_results = {}
-    if supporting_agents:
-        for agent_id in supporting_agents:
-            # Augment input with primary result
-            augmented_input = {**input_data, "primary_result": primary_result}
-
-            # Run supporting agent
-            result = await agent_task(agent_id, augmented_input, memory_interface)
-            supporting_results[agent_id] = result
-
-            # Store supporting result
-            await store_result(result, memory_interface)
+    flow_id = flow_id or str(uuid.uuid4())
+    if checkpoint:
+        checkpoint.begin_flow(flow_id)
+
+    async def run_agent(task_id: str, agent_id: str, data: Dict[str, Any]):
+        if checkpoint:
+            saved = checkpoint.output(flow_id, task_id)
+            if saved is not None:
+                return saved
+        result = await cached_agent_task(agent_id, data, result_cache)
+        if checkpoint:
+            checkpoint.record_output(flow_id, task_id, result)
+        return result
+
+    # The outcome is logged even when an agent raises, so the checkpoint never
+    # shows a failed flow as still running; its saved outputs are kept for a
+    # retry with the same flow_id
+    status = "failed"
+    try:
+        # Run primary agent
+        primary_result = await run_agent("primary", primary_agent_id, input_data)
+
+        # Run supporting agents concurrently
+        supporting_results = {}
+        errors = {}
+        if supporting_agents:
+            # Augment input with the primary answer, as the DAG passes upstream answers
+            parameters = dict(input_data.get("parameters") or {})
+            parameters["upstream"] = {primary_agent_id: primary_result["answer"]}
+            augmented_input = {**input_data, "parameters": parameters}
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+            outcomes = await asyncio.gather(
+                *(
+                    _run_supporting_agent(
+                        partial(
+                            run_agent, _task_id(agent_id), agent_id, augmented_input
+                        ),
+                        semaphore,
+                        agent_timeout,
+                    )
+                    for agent_id in supporting_agents
+                ),
+                return_exceptions=True,
+            )
+            for agent_id, outcome in zip(supporting_agents, outcomes):
+                if isinstance(outcome, asyncio.TimeoutError):
+                    errors[agent_id] = f"Timed out after {agent_timeout}s"
+                elif isinstance(outcome, BaseException):
+                    if isinstance(outcome, asyncio.CancelledError):
+                        raise outcome
+                    errors[agent_id] = str(outcome)
+                else:
+                    supporting_results[agent_id] = outcome
+
+        # Store all results in memory with one write
+        record_ids: List[str] = []
+        memory_interface, owns_memory = await _memory_interface(memory_config)
+        if memory_interface is None:
+            logger.warning(
+                f"No memory configured; results of flow {flow_id} not stored"
+            )
+        else:
+            try:
+                record_ids = await store_results(
+                    [primary_result, *supporting_results.values()],
+                    [primary_agent_id, *supporting_results],
+                    memory_interface,
+                    flow_id,
+                    [
+                        "primary",
+                        *(_task_id(agent_id) for agent_id in supporting_results),
+                    ],
+                )
+            finally:
+                if owns_memory:
+                    await memory_interface.close()
+        record_id = record_ids[0] if record_ids else None
+        status = "failed" if errors else "completed"
+    except asyncio.CancelledError:
+        status = "cancelled"
+        raise
+    finally:
+        if checkpoint:
+            checkpoint.finish_flow(flow_id, status)
 
     # Combine results
     workflow_result = {
         "primary": primary_result,
         "supporting": supporting_results,
+        "errors": errors,
+        "flow_id": flow_id,
         "record_id": record_id,
+        "record_ids": record_ids,
         "timestamp": datetime.now().isoformat(),
     }
 
@@ -128,6 +298,12 @@ async def run_workflow(
     prompt: str,
     parameters: Optional[Dict[str, Any]] = None,
     supporting_agents: Optional[List[str]] = None,
+    memory_config: Optional[Dict[str, Any]] = None,
+    max_concurrency: int = 4,
+    agent_timeout: Optional[float] = None,
+    result_cache: Optional[TaskResultCache] = None,
+    checkpoint: Optional[FlowCheckpointLog] = None,
+    flow_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Run an agent workflow with the given parameters
@@ -137,6 +313,12 @@ async def run_workflow(
         prompt: str - The prompt for the workflow
         parameters: Optional[Dict[str, Any]] - Additional parameters
         supporting_agents: Optional[List[str]] - IDs of supporting agents
+        memory_config: Optional[Dict[str, Any]] - Memory configuration
+        max_concurrency: int - Maximum number of supporting agents running at once
+        agent_timeout: Optional[float] - Per supporting agent timeout in seconds
+        result_cache: Optional[TaskResultCache] - Cache of prior task results
+        checkpoint: Optional[FlowCheckpointLog] - Log of completed agent results
+        flow_id: Optional[str] - ID of the flow, to resume from ``checkpoint``
 
     Returns:
         Dict[str, Any] - The workflow results
@@ -149,4 +331,10 @@ async def run_workflow(
         primary_agent_id=primary_agent_id,
         input_data=input_data,
         supporting_agents=supporting_agents,
+        memory_config=memory_config,
+        max_concurrency=max_concurrency,
+        agent_timeout=agent_timeout,
+        result_cache=result_cache,
+        checkpoint=checkpoint,
+        flow_id=flow_id,
     )
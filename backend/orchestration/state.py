@@ -0,0 +1,251 @@
+"""
+filepath: backend/orchestration/state.py
+In-memory flow and task state with bounded event logs and live subscriptions.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+class FlowEvent(BaseModel):
+    """One state change of a flow or one of its tasks"""
+
+    seq: int  # Store-wide, increasing
+    flow_id: str
+    kind: str  # flow_started, task_<status>, flow_finished
+    status: str
+    task_id: Optional[str] = None
+    detail: Optional[str] = None
+    timestamp: float
+
+
+class _FlowState:
+    __slots__ = (
+        "flow_id",
+        "status",
+        "tasks",
+        "counts",
+        "events",
+        "error",
+        "started_at",
+        "finished_at",
+        "updated_at",
+    )
+
+    def __init__(self, flow_id: str, max_events: int):
+        self.flow_id = flow_id
+        self.status = "running"
+        self.tasks: Dict[str, str] = {}
+        self.counts: Dict[str, int] = {}
+        self.events: Deque[FlowEvent] = deque(maxlen=max_events)
+        self.error: Optional[str] = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.updated_at = self.started_at
+
+    def set_task(self, task_id: str, status: str) -> None:
+        previous = self.tasks.get(task_id)
+        if previous is not None:
+            self.counts[previous] -= 1
+        self.tasks[task_id] = status
+        self.counts[status] = self.counts.get(status, 0) + 1
+
+
+class FlowStateStore:
+    """Status of every recent flow, keyed by flow ID.
+
+    Each flow keeps its task statuses, running per-status counts and the last
+    ``max_events`` events in a ring buffer, so status lookups are O(1) and
+    memory per flow is bounded. Once more than ``max_flows`` flows are
+    tracked, the oldest finished ones are forgotten. ``subscribe`` streams
+    events as they happen; a subscriber that falls ``queue_size`` events
+    behind loses the oldest ones rather than slowing down the flows.
+    """
+
+    def __init__(
+        self, max_flows: int = 10000, max_events: int = 256, queue_size: int = 256
+    ):
+        self.max_flows = max_flows
+        self.max_events = max_events
+        self.queue_size = queue_size
+        self._flows: Dict[str, _FlowState] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()  # In finish order
+        self._subscribers: Dict[Optional[str], Set[asyncio.Queue]] = {}
+        self._seq = itertools.count(1)
+        self.events_published = 0
+        self.events_dropped = 0
+
+    def start_flow(
+        self, flow_id: str, task_status: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Track a new (or resumed) flow and its tasks' initial statuses"""
+        self._finished.pop(flow_id, None)
+        state = _FlowState(flow_id, self.max_events)
+        for task_id, status in (task_status or {}).items():
+            state.set_task(task_id, status)
+        self._flows[flow_id] = state
+        self._evict()
+        self._publish(state, "flow_started", "running")
+
+    def update_task(
+        self, flow_id: str, task_id: str, status: str, detail: Optional[str] = None
+    ) -> None:
+        """Record a task's new status"""
+        state = self._flows.get(flow_id)
+        if state is None:
+            return
+        state.set_task(task_id, status)
+        self._publish(state, f"task_{status}", status, task_id, detail)
+
+    def finish_flow(
+        self, flow_id: str, status: str, detail: Optional[str] = None
+    ) -> None:
+        """Record a flow's outcome"""
+        state = self._flows.get(flow_id)
+        if state is None:
+            return
+        state.status = status
+        state.error = detail
+        state.finished_at = time.time()
+        self._finished[flow_id] = None
+        self._publish(state, "flow_finished", status, detail=detail)
+        self._evict()
+
+    def status(self, flow_id: str) -> Optional[str]:
+        """Status of a flow, or None if it is unknown or was evicted"""
+        state = self._flows.get(flow_id)
+        return state.status if state else None
+
+    def get(self, flow_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a flow's status and its tasks"""
+        state = self._flows.get(flow_id)
+        if state is None:
+            return None
+        return {
+            "flow_id": flow_id,
+            "status": state.status,
+            "tasks": dict(state.tasks),
+            "task_counts": {k: v for k, v in state.counts.items() if v},
+            "error": state.error,
+            "started_at": state.started_at,
+            "finished_at": state.finished_at,
+            "updated_at": state.updated_at,
+        }
+
+    def events(self, flow_id: str, since: int = 0) -> List[FlowEvent]:
+        """Buffered events of a flow with ``seq`` greater than ``since``"""
+        state = self._flows.get(flow_id)
+        if state is None:
+            return []
+        return [event for event in state.events if event.seq > since]
+
+    def list_flows(
+        self, status: Optional[str] = None, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Most recently started flows first, optionally filtered by status"""
+        flows = []
+        for flow_id in reversed(self._flows):
+            if len(flows) >= limit:
+                break
+            state = self._flows[flow_id]
+            if status is None or state.status == status:
+                flows.append(
+                    {
+                        "flow_id": flow_id,
+                        "status": state.status,
+                        "started_at": state.started_at,
+                        "updated_at": state.updated_at,
+                    }
+                )
+        return flows
+
+    async def subscribe(
+        self, flow_id: Optional[str] = None, replay: bool = True
+    ) -> AsyncIterator[FlowEvent]:
+        """Yield events of one flow (or of all flows when ``flow_id`` is None).
+
+        With ``replay``, a flow's buffered events are yielded first. A
+        subscription to one flow ends after its ``flow_finished`` event.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        # Register before taking the backlog so no event falls in between
+        self._subscribers.setdefault(flow_id, set()).add(queue)
+        try:
+            state = self._flows.get(flow_id) if flow_id else None
+            backlog = list(state.events) if state is not None and replay else []
+            finished = state is not None and state.status in FINISHED_STATUSES
+            for event in backlog:
+                yield event
+            if finished:
+                return
+            while True:
+                event = await queue.get()
+                yield event
+                if flow_id and event.kind == "flow_finished":
+                    return
+        finally:
+            subscribers = self._subscribers.get(flow_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[flow_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """Occupancy and event throughput"""
+        return {
+            "flows": len(self._flows),
+            "running": len(self._flows) - len(self._finished),
+            "max_flows": self.max_flows,
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "events_published": self.events_published,
+            "events_dropped": self.events_dropped,
+        }
+
+    def _publish(
+        self,
+        state: _FlowState,
+        kind: str,
+        status: str,
+        task_id: Optional[str] = None,
+        detail: Optional[str] = None,
+    ) -> None:
+        now = time.time()
+        # Fields are trusted here; skip validation on this hot path
+        event = FlowEvent.model_construct(
+            seq=next(self._seq),
+            flow_id=state.flow_id,
+            kind=kind,
+            status=status,
+            task_id=task_id,
+            detail=detail,
+            timestamp=now,
+        )
+        state.events.append(event)
+        state.updated_at = now
+        self.events_published += 1
+        for key in (state.flow_id, None):
+            for queue in self._subscribers.get(key, ()):
+                if queue.full():
+                    # A slow consumer loses its oldest event, not the newest
+                    queue.get_nowait()
+                    self.events_dropped += 1
+                queue.put_nowait(event)
+
+    def _evict(self) -> None:
+        while len(self._flows) > self.max_flows and self._finished:
+            flow_id, _ = self._finished.popitem(last=False)
+            del self._flows[flow_id]
+
+
+# Global flow state store
+flow_state = FlowStateStore()
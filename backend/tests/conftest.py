@@ -0,0 +1,11 @@
+"""
+filepath: backend/tests/conftest.py
+Shared pytest setup: make the ``backend`` package importable from any cwd.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
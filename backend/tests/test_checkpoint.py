@@ -0,0 +1,208 @@
+"""
+filepath: backend/tests/test_checkpoint.py
+Tests for replaying the flow checkpoint log after a crash.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from backend.agents import AgentInput, AgentOutput
+from backend.orchestration import checkpoint, dag, prefect_flow
+from backend.orchestration.base import Task
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / "checkpoints.jsonl")
+
+
+def write_interrupted_flow(path):
+    log = checkpoint.FlowCheckpointLog(path)
+    task = Task(task_id="t1", agent_id="agent", input_data=AgentInput(prompt="q"))
+    log.begin_flow("flow-1", [task])
+    log.record_output("flow-1", "t1", {"answer": "42"})
+    log.begin_flow("flow-2")
+    log.finish_flow("flow-2", "completed")
+    log.close()
+
+
+def test_replay_restores_outputs_and_status(log_path):
+    write_interrupted_flow(log_path)
+    log = checkpoint.FlowCheckpointLog(log_path)
+    try:
+        assert log.output("flow-1", "t1") == {"answer": "42"}
+        assert [task.task_id for task in log.get("flow-1").tasks] == ["t1"]
+        assert log.interrupted_flows() == ["flow-1"]
+        # Completed flows have nothing left to resume
+        assert log.get("flow-2") is None
+    finally:
+        log.close()
+
+
+def test_torn_last_line_is_skipped_and_terminated(log_path):
+    write_interrupted_flow(log_path)
+    torn = json.dumps(
+        {"type": "task", "flow_id": "flow-1", "task_id": "t2", "output": "x"}
+    )
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(torn[: len(torn) // 2])
+
+    log = checkpoint.FlowCheckpointLog(log_path)
+    try:
+        assert log.output("flow-1", "t1") == {"answer": "42"}
+        assert log.output("flow-1", "t2") is None
+        log.record_output("flow-1", "t3", "after crash")
+    finally:
+        log.close()
+
+    # The record appended after the torn line must land on its own line
+    reopened = checkpoint.FlowCheckpointLog(log_path)
+    try:
+        assert reopened.output("flow-1", "t1") == {"answer": "42"}
+        assert reopened.output("flow-1", "t3") == "after crash"
+        assert reopened.output("flow-1", "t2") is None
+    finally:
+        reopened.close()
+
+
+def test_unreadable_middle_line_does_not_stop_replay(log_path):
+    write_interrupted_flow(log_path)
+    with open(log_path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    lines.insert(1, "{not json\n")
+    with open(log_path, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+
+    log = checkpoint.FlowCheckpointLog(log_path)
+    try:
+        assert log.output("flow-1", "t1") == {"answer": "42"}
+        assert log.get("flow-2") is None
+    finally:
+        log.close()
+
+
+def test_finished_flows_are_bounded_and_the_log_is_compacted(log_path):
+    log = checkpoint.FlowCheckpointLog(log_path, max_flows=2, compact_min_records=20)
+    try:
+        for i in range(10):
+            log.begin_flow(f"done-{i}")
+            log.record_output(f"done-{i}", "t1", "x")
+            log.finish_flow(f"done-{i}", "completed")
+        for i in range(4):
+            log.begin_flow(f"failed-{i}")
+            log.finish_flow(f"failed-{i}", "failed")
+        log.begin_flow("live")
+        log.record_output("live", "t1", "partial")
+
+        assert log.get("done-0") is None
+        assert [f for f in ("failed-0", "failed-1") if log.get(f)] == []
+        assert log.get("failed-3").status == "failed"
+        assert sorted(log.incomplete_flows()) == ["failed-2", "failed-3", "live"]
+    finally:
+        log.close()
+
+    with open(log_path, encoding="utf-8") as f:
+        assert len(f.readlines()) < 20
+
+    reopened = checkpoint.FlowCheckpointLog(log_path, max_flows=2)
+    try:
+        assert sorted(reopened.incomplete_flows()) == ["failed-2", "failed-3", "live"]
+        assert reopened.output("live", "t1") == "partial"
+        assert reopened.interrupted_flows() == ["live"]
+    finally:
+        reopened.close()
+
+
+def test_shutdown_interrupted_flows_are_resumable(log_path):
+    log = checkpoint.FlowCheckpointLog(log_path)
+    log.begin_flow("flow-1")
+    log.finish_flow("flow-1", "interrupted")
+    log.begin_flow("flow-2")
+    log.finish_flow("flow-2", "cancelled")
+    log.close()
+
+    reopened = checkpoint.FlowCheckpointLog(log_path)
+    try:
+        assert reopened.interrupted_flows() == ["flow-1"]
+    finally:
+        reopened.close()
+
+
+def test_shutdown_interrupts_flows_and_restart_resumes_them(log_path):
+    release = {"slow": False}
+    runs = []
+
+    async def runner(task):
+        runs.append(task.task_id)
+        if task.task_id == "slow" and not release["slow"]:
+            await asyncio.Event().wait()
+        return AgentOutput(answer=task.task_id)
+
+    tasks = [
+        Task(task_id=i, agent_id="agent", input_data=AgentInput(prompt=i))
+        for i in ("fast", "slow")
+    ]
+
+    async def first_run():
+        log = checkpoint.FlowCheckpointLog(log_path)
+        orchestrator = dag.LocalOrchestrator(task_runner=runner, checkpoint=log)
+        flow_id = orchestrator.start_flow(tasks, "flow-1")
+        await asyncio.sleep(0.01)
+        assert await orchestrator.shutdown() == [flow_id]
+        status = await orchestrator.get_flow_status(flow_id)
+        log.close()
+        return status
+
+    async def second_run():
+        release["slow"] = True
+        log = checkpoint.FlowCheckpointLog(log_path)
+        orchestrator = dag.LocalOrchestrator(task_runner=runner, checkpoint=log)
+        assert orchestrator.resume_interrupted_flows() == ["flow-1"]
+        result = await orchestrator._wait(orchestrator._flows["flow-1"])
+        log.close()
+        return result
+
+    status = asyncio.run(first_run())
+    assert status["status"] == "interrupted"
+    assert status["tasks"] == {"fast": "completed", "slow": "cancelled"}
+
+    runs.clear()
+    result = asyncio.run(second_run())
+    assert result.status == "completed"
+    assert runs == ["slow"]
+    assert set(result.outputs) == {"fast", "slow"}
+
+
+def test_workflow_that_raises_is_checkpointed_as_failed(log_path, monkeypatch):
+    calls = []
+
+    async def agent_task(agent_id, input_data):
+        calls.append(agent_id)
+        if len(calls) == 1:
+            raise RuntimeError("primary broke")
+        return {"answer": "ok"}
+
+    monkeypatch.setattr(prefect_flow, "agent_task", agent_task)
+    log = checkpoint.FlowCheckpointLog(log_path)
+    try:
+        with pytest.raises(RuntimeError, match="primary broke"):
+            asyncio.run(
+                prefect_flow.agent_workflow(
+                    "agent", {"prompt": "q"}, checkpoint=log, flow_id="flow-1"
+                )
+            )
+        assert log.get("flow-1").status == "failed"
+        assert log.interrupted_flows() == []
+
+        # A retry with the same flow_id completes and is dropped from the log
+        result = asyncio.run(
+            prefect_flow.agent_workflow(
+                "agent", {"prompt": "q"}, checkpoint=log, flow_id="flow-1"
+            )
+        )
+        assert result["primary"] == {"answer": "ok"}
+        assert log.get("flow-1") is None
+    finally:
+        log.close()
@@ -0,0 +1,209 @@
+"""
+filepath: backend/tests/test_dag.py
+Tests for dependency ordering and DAG execution of flow tasks.
+"""
+
+import asyncio
+
+import pytest
+
+from backend.agents import AgentInput, AgentOutput
+from backend.orchestration import TaskResultCache, dag
+from backend.orchestration.base import Task
+
+
+def make_task(task_id, *dependencies):
+    return Task(
+        task_id=task_id,
+        agent_id="agent",
+        input_data=AgentInput(prompt=task_id),
+        dependencies=list(dependencies),
+    )
+
+
+def test_dependencies_come_first():
+    tasks = [make_task("c", "a", "b"), make_task("b", "a"), make_task("a")]
+    order = dag.topological_order(tasks)
+    assert sorted(order) == ["a", "b", "c"]
+    assert order.index("a") < order.index("b") < order.index("c")
+
+
+def test_cycle_is_rejected_and_named():
+    tasks = [
+        make_task("root"),
+        make_task("x", "root", "z"),
+        make_task("y", "x"),
+        make_task("z", "y"),
+    ]
+    with pytest.raises(ValueError, match="cycle") as excinfo:
+        dag.topological_order(tasks)
+    message = str(excinfo.value)
+    assert all(task_id in message for task_id in ("x", "y", "z"))
+    assert "root" not in message
+
+
+def test_self_dependency_is_a_cycle():
+    with pytest.raises(ValueError, match="cycle"):
+        dag.topological_order([make_task("a", "a")])
+
+
+def test_unknown_and_duplicate_ids_are_rejected():
+    with pytest.raises(ValueError, match="unknown task"):
+        dag.topological_order([make_task("a", "missing")])
+    with pytest.raises(ValueError, match="Duplicate"):
+        dag.topological_order([make_task("a"), make_task("a")])
+
+
+class RecordingRunner:
+    """Task runner that tracks concurrency and fails or blocks on request"""
+
+    def __init__(self, delay=0.01, fail=(), block=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.block = set(block)
+        self.running = 0
+        self.peak = 0
+        self.started = []
+        self.cancelled = []
+
+    async def __call__(self, task):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        self.started.append(task.task_id)
+        try:
+            if task.task_id in self.block:
+                await asyncio.Event().wait()
+            await asyncio.sleep(self.delay)
+            if task.task_id in self.fail:
+                raise RuntimeError(f"{task.task_id} broke")
+            upstream = (task.input_data.parameters or {}).get("upstream", {})
+            return AgentOutput(answer="+".join([task.task_id, *sorted(upstream)]))
+        except asyncio.CancelledError:
+            self.cancelled.append(task.task_id)
+            raise
+        finally:
+            self.running -= 1
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_parallelism_is_bounded():
+    runner = RecordingRunner()
+    orchestrator = dag.LocalOrchestrator(max_parallelism=2, task_runner=runner)
+    tasks = [make_task(f"t{i}") for i in range(6)]
+
+    result = run(orchestrator.run_flow(tasks))
+
+    assert result.status == "completed"
+    assert runner.peak == 2
+    assert sorted(runner.started) == sorted(t.task_id for t in tasks)
+
+
+def test_upstream_answers_reach_dependents():
+    runner = RecordingRunner()
+    orchestrator = dag.LocalOrchestrator(task_runner=runner)
+    tasks = [make_task("a"), make_task("b"), make_task("c", "a", "b")]
+
+    result = run(orchestrator.run_flow(tasks))
+
+    assert result.outputs["c"].answer == "c+a+b"
+
+
+def test_failure_skips_downstream_but_not_independent_tasks():
+    runner = RecordingRunner(fail={"a"})
+    orchestrator = dag.LocalOrchestrator(task_runner=runner)
+    tasks = [
+        make_task("a"),
+        make_task("b", "a"),
+        make_task("c", "b"),
+        make_task("d"),
+    ]
+
+    result = run(orchestrator.run_flow(tasks))
+
+    assert result.status == "failed"
+    assert result.task_status == {
+        "a": "failed",
+        "b": "skipped",
+        "c": "skipped",
+        "d": "completed",
+    }
+    assert "a broke" in result.error_message
+    assert "b" not in runner.started and "c" not in runner.started
+
+
+def test_fail_fast_cancels_running_tasks():
+    runner = RecordingRunner(fail={"a"}, block={"slow"})
+    orchestrator = dag.LocalOrchestrator(fail_fast=True, task_runner=runner)
+    tasks = [make_task("a"), make_task("slow"), make_task("after", "slow")]
+
+    result = run(orchestrator.run_flow(tasks))
+
+    assert result.status == "failed"
+    assert result.task_status["slow"] == "cancelled"
+    assert result.task_status["after"] == "cancelled"
+    assert runner.cancelled == ["slow"]
+
+
+def test_cancel_flow_stops_running_tasks():
+    async def scenario():
+        runner = RecordingRunner(block={"slow"})
+        orchestrator = dag.LocalOrchestrator(task_runner=runner)
+        flow_id = orchestrator.start_flow([make_task("slow"), make_task("b", "slow")])
+        await asyncio.sleep(0.01)
+        assert await orchestrator.cancel_flow(flow_id)
+        result = await orchestrator._wait(orchestrator._flows[flow_id])
+        assert not await orchestrator.cancel_flow(flow_id)
+        return runner, result
+
+    runner, result = run(scenario())
+
+    assert result.status == "cancelled"
+    assert result.task_status == {"slow": "cancelled", "b": "cancelled"}
+    assert runner.cancelled == ["slow"]
+
+
+def test_timings_are_recorded_per_task():
+    runner = RecordingRunner(delay=0.05)
+    orchestrator = dag.LocalOrchestrator(max_parallelism=1, task_runner=runner)
+    tasks = [make_task("a"), make_task("b")]
+
+    result = run(orchestrator.run_flow(tasks))
+
+    assert set(result.timings) == {"a", "b"}
+    for timing in result.timings.values():
+        assert timing["run_seconds"] >= 0.04
+    # With one slot, whichever task ran second waited for the first
+    assert max(t["queued_seconds"] for t in result.timings.values()) >= 0.04
+
+
+def test_retried_flow_reuses_cached_results_across_restarts(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    tasks = [make_task("a"), make_task("b"), make_task("c", "a", "b")]
+
+    first = RecordingRunner(fail={"b"})
+    cache = TaskResultCache(path=path)
+    result = run(
+        dag.LocalOrchestrator(task_runner=first, result_cache=cache).run_flow(tasks)
+    )
+    cache.close()
+    assert result.status == "failed"
+
+    retry = RecordingRunner()
+    cache = TaskResultCache(path=path)
+    result = run(
+        dag.LocalOrchestrator(task_runner=retry, result_cache=cache).run_flow(tasks)
+    )
+
+    assert result.status == "completed"
+    assert sorted(retry.started) == ["b", "c"]
+    assert result.outputs["a"].cached
+    assert not result.outputs["c"].cached
+    assert cache.stats()["disk_hits"] == 1
+
+    cache.invalidate("agent")
+    rerun = RecordingRunner()
+    run(dag.LocalOrchestrator(task_runner=rerun, result_cache=cache).run_flow(tasks))
+    assert sorted(rerun.started) == ["a", "b", "c"]
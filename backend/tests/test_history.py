@@ -0,0 +1,47 @@
+"""
+filepath: backend/tests/test_history.py
+Tests for the agent task history ring buffer and its on-disk answers.
+"""
+
+import asyncio
+
+from backend.agents import AgentOutput, AgentRegistry, ResearchAgent, TaskHistory
+
+
+def test_histories_sharing_a_file_keep_their_own_answers(tmp_path):
+    path = str(tmp_path / "history.sqlite3")
+    first = TaskHistory(capacity=2, spill_path=path, scope="a")
+    second = TaskHistory(capacity=2, spill_path=path, scope="b")
+    try:
+        for i in range(3):
+            first.append(AgentOutput(answer=f"a{i}"))
+        second.append(AgentOutput(answer="b0"))
+
+        assert [row["answer"] for row in first.recent()] == ["a2", "a1"]
+        assert [row["answer"] for row in second.recent()] == ["b0"]
+
+        first.clear()
+        assert [row["answer"] for row in second.recent()] == ["b0"]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_pooled_agents_get_distinct_history_scopes(tmp_path):
+    registry = AgentRegistry()
+    registry.register_agent_type("research", ResearchAgent)
+    agent_id = registry.register_pool(
+        "research",
+        name="Research Agent",
+        size=2,
+        config={"history_path": str(tmp_path / "history.sqlite3")},
+    )
+
+    async def lease_both():
+        async with registry.lease(agent_id) as first:
+            async with registry.lease(agent_id) as second:
+                return first, second
+
+    first, second = asyncio.run(lease_both())
+    assert first is not second
+    assert first._task_history.scope != second._task_history.scope
@@ -0,0 +1,80 @@
+"""
+filepath: backend/tests/test_numpy_memory.py
+Tests for NumpyMemory snapshots of a quantized store across reopen.
+"""
+
+import asyncio
+import os
+import zlib
+
+import numpy as np
+import pytest
+
+from backend.memory import numpy_memory
+from backend.memory.base import MemoryRecord
+
+
+def embed(texts):
+    """Deterministic random vectors per text, no model download"""
+    return np.stack(
+        [
+            np.random.default_rng(zlib.crc32(text.encode())).standard_normal(16)
+            for text in texts
+        ]
+    )
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {
+        "embedding_function": embed,
+        "persist_directory": str(tmp_path / "store"),
+        "persist_interval": 0,
+        "quantization": {"type": "int8", "train_size": 64},
+    }
+
+
+def records(prefix, n):
+    return [MemoryRecord(id=f"{prefix}{i}", content=f"{prefix} {i}") for i in range(n)]
+
+
+async def top_id(memory, query):
+    return (await memory.search(query, top_k=1))[0].id
+
+
+def test_snapshot_links_the_rerank_tier_instead_of_copying_it(config):
+    directory = config["persist_directory"]
+    snapshot = os.path.join(directory, numpy_memory.SNAPSHOT_DIR)
+    tier = os.path.join(directory, numpy_memory.RERANK_VECTORS_FILE)
+
+    async def first_run():
+        memory = numpy_memory.NumpyMemory(config)
+        await memory.add_many(records("doc", 200))
+        await memory.close()
+
+    async def second_run():
+        memory = numpy_memory.NumpyMemory(config)
+        assert await top_id(memory, "doc 7") == "doc7"
+        await memory.add_many(records("more", 20))
+        await memory.delete("doc7")
+        await memory.close()
+
+    async def third_run():
+        memory = numpy_memory.NumpyMemory(config)
+        try:
+            assert await top_id(memory, "more 3") == "more3"
+            assert await top_id(memory, "doc 100") == "doc100"
+            assert await memory.get("doc7") is None
+        finally:
+            await memory.close()
+
+    asyncio.run(first_run())
+    assert not os.path.exists(os.path.join(snapshot, numpy_memory.EMBEDDINGS_FILE))
+    # One float32 copy on disk, reachable from the store and its snapshot
+    assert os.path.samefile(
+        tier, os.path.join(snapshot, numpy_memory.RERANK_VECTORS_FILE)
+    )
+
+    asyncio.run(second_run())
+    asyncio.run(third_run())
+    assert os.stat(tier).st_nlink == 2
@@ -0,0 +1,233 @@
+"""
+filepath: backend/tests/test_segment_memory.py
+Tests for SegmentMemory add/delete/compact invariants across reopen.
+"""
+
+import asyncio
+import os
+import zlib
+
+import numpy as np
+import pytest
+
+from backend.memory import segment_memory
+from backend.memory.base import MemoryRecord
+
+
+def embed(texts):
+    """Deterministic bag-of-words vectors, no model download"""
+    vectors = np.zeros((len(texts), 64))
+    for i, text in enumerate(texts):
+        for word in text.lower().split():
+            vectors[i, zlib.crc32(word.encode()) % 64] += 1
+    return vectors
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {
+        "embedding_function": embed,
+        "persist_directory": str(tmp_path / "segments"),
+        "segment_size": 4,
+        "compaction_min_size": 5,
+    }
+
+
+def record(record_id, content="apple", agent_id="a", **metadata):
+    return MemoryRecord(
+        id=record_id, content=content, agent_id=agent_id, metadata=metadata
+    )
+
+
+async def ids_matching(memory, query="apple", **kwargs):
+    return sorted(r.id for r in await memory.search(query, top_k=100, **kwargs))
+
+
+def test_readding_an_id_keeps_one_live_copy(config):
+    async def scenario():
+        memory = segment_memory.SegmentMemory(config)
+        await memory.add_many([record(f"r{i}") for i in range(4)])  # sealed
+        await memory.add(record("r1", content="apple updated"))
+        await memory.flush()
+        await memory.add(record("r1", content="apple newest"))
+        assert await ids_matching(memory) == ["r0", "r1", "r2", "r3"]
+        assert (await memory.get("r1")).content == "apple newest"
+        await memory.close()
+
+        reopened = segment_memory.SegmentMemory(config)
+        assert await ids_matching(reopened) == ["r0", "r1", "r2", "r3"]
+        assert (await reopened.get("r1")).content == "apple newest"
+        await reopened.close()
+
+    asyncio.run(scenario())
+
+
+def test_delete_hides_every_copy_and_survives_reopen(config):
+    async def scenario():
+        memory = segment_memory.SegmentMemory(config)
+        await memory.add_many([record(f"r{i}") for i in range(4)])
+        await memory.add(record("r2", content="apple again"))
+        assert await memory.delete("r2")
+        assert not await memory.delete("missing")
+        assert await memory.get("r2") is None
+        assert await ids_matching(memory) == ["r0", "r1", "r3"]
+        await memory.close()
+
+        reopened = segment_memory.SegmentMemory(config)
+        assert await reopened.get("r2") is None
+        assert await ids_matching(reopened) == ["r0", "r1", "r3"]
+        await reopened.close()
+
+    asyncio.run(scenario())
+
+
+def test_compact_merges_small_segments_and_drops_deleted_rows(config):
+    async def scenario():
+        memory = segment_memory.SegmentMemory(config)
+        for start in range(0, 6, 2):
+            await memory.add_many([record(f"c{start}"), record(f"c{start + 1}")])
+            await memory.flush()
+        await memory.add(record("c1", content="apple replaced"))
+        await memory.flush()
+        await memory.delete("c2")
+        live = ["c0", "c1", "c3", "c4", "c5"]
+        assert len(memory.segments) == 4
+
+        merged = await memory.compact()
+        assert merged == 4
+        assert len(memory.segments) == 1
+        assert memory.segments[0].size == len(live)
+        assert await ids_matching(memory) == live
+        assert (await memory.get("c1")).content == "apple replaced"
+        locations = memory._sealed_locations(live)
+        assert all(len(locations[i]) == 1 for i in live)
+        await memory.close()
+
+        reopened = segment_memory.SegmentMemory(config)
+        assert await ids_matching(reopened) == live
+        assert await reopened.get("c2") is None
+        assert (await reopened.get("c1")).content == "apple replaced"
+        await reopened.close()
+
+    asyncio.run(scenario())
+
+
+def test_filters_and_clear_by_agent(config):
+    async def scenario():
+        memory = segment_memory.SegmentMemory(config)
+        await memory.add_many(
+            [record(f"r{i}", agent_id="a" if i < 3 else "b", k=i % 2) for i in range(6)]
+        )
+        assert await ids_matching(memory, filter={"agent_id": "a"}) == [
+            "r0",
+            "r1",
+            "r2",
+        ]
+        assert await ids_matching(
+            memory, filter={"$and": [{"agent_id": "b"}, {"k": {"$eq": 1}}]}
+        ) == ["r3", "r5"]
+        assert await ids_matching(memory, filter={"k": {"$gt": 0}}) == [
+            "r1",
+            "r3",
+            "r5",
+        ]
+        assert await ids_matching(
+            memory, filter={"$or": [{"agent_id": "a", "k": 0}, {"k": {"$in": [1]}}]}
+        ) == ["r0", "r1", "r2", "r3", "r5"]
+        with pytest.raises(ValueError):
+            await memory.search("apple", filter={"k": {"$regex": "1"}})
+
+        await memory.clear("a")
+        assert await ids_matching(memory) == ["r3", "r4", "r5"]
+        await memory.close()
+
+    asyncio.run(scenario())
+
+
+def test_reopen_maps_segments_without_reading_ids(config):
+    async def scenario():
+        memory = segment_memory.SegmentMemory(config)
+        await memory.add_many([record(f"r{i}") for i in range(1, 12)])
+        await memory.add(record("r100"))
+        await memory.close()
+
+        reopened = segment_memory.SegmentMemory(config)
+        assert len(reopened.segments) == 2
+        assert all(s._id_keys is None for s in reopened.segments)
+        # IDs that prefix each other resolve exactly
+        assert (await reopened.get("r1")).id == "r1"
+        assert (await reopened.get("r10")).id == "r10"
+        assert await reopened.get("r1000") is None
+        assert await reopened.get("r") is None
+        await reopened.close()
+
+    asyncio.run(scenario())
+
+
+def test_segments_without_an_id_index_are_indexed_on_lookup(config):
+    async def scenario():
+        memory = segment_memory.SegmentMemory(config)
+        await memory.add_many([record(f"r{i}") for i in range(4)])
+        await memory.close()
+        for segment in memory.segments:
+            for name in ("id_keys.npy", "id_rows.npy"):
+                os.remove(os.path.join(segment.path, name))
+
+        reopened = segment_memory.SegmentMemory(config)
+        assert (await reopened.get("r2")).id == "r2"
+        assert await reopened.delete("r2")
+        assert await reopened.get("r2") is None
+        await reopened.close()
+
+    asyncio.run(scenario())
+
+
+def test_crash_after_sealing_does_not_replay_sealed_records(config, monkeypatch):
+    async def scenario():
+        # Simulate dying after the manifest swap, before the old log is removed
+        monkeypatch.setattr(
+            segment_memory.SegmentMemory, "_remove_log", lambda self, name: None
+        )
+        memory = segment_memory.SegmentMemory(config)
+        await memory.add_many([record(f"r{i}") for i in range(4)])
+        memory.io.shutdown(wait=False)
+        assert os.path.exists(os.path.join(config["persist_directory"], "active.jsonl"))
+        monkeypatch.undo()
+
+        reopened = segment_memory.SegmentMemory(config)
+        assert reopened._active == []
+        assert await ids_matching(reopened) == ["r0", "r1", "r2", "r3"]
+        logs = [
+            name
+            for name in os.listdir(config["persist_directory"])
+            if name.endswith(".jsonl")
+        ]
+        assert logs == []
+        await reopened.close()
+
+    asyncio.run(scenario())
+
+
+def test_selective_filter_still_returns_top_k(config):
+    config["segment_size"] = 100
+
+    async def scenario():
+        memory = segment_memory.SegmentMemory(config)
+        await memory.add_many(
+            [record(f"hit{i}", content=f"pear {i}", k=1) for i in range(3)]
+            + [record(f"miss{i}", content="apple", k=0) for i in range(57)]
+        )
+        await memory.flush()
+        await memory.add(record("active-hit", content="pear", k=1))
+        assert len(memory.segments) == 1
+        assert await ids_matching(memory, query="apple", filter={"k": 1}) == [
+            "active-hit",
+            "hit0",
+            "hit1",
+            "hit2",
+        ]
+        top = await memory.search("apple", top_k=3, filter={"k": {"$gte": 1}})
+        assert len(top) == 3
+        await memory.close()
+
+    asyncio.run(scenario())